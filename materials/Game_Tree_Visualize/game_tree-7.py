@@ -1,111 +1,180 @@
+import argparse
 import csv
 import graphviz
 import hashlib
+import json
 import os
+import sys
+import time
 from PIL import Image, ImageDraw
 
+# 探索統計と途中経過の保存はアプリ (materials2/go_cgt_app) の logic を使う
+APP_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        os.pardir, os.pardir, "materials2", "go_cgt_app"))
+sys.path.insert(0, APP_DIR)
+from logic.search_stats import SearchStats  # noqa: E402
+from logic.checkpoint import Checkpoint  # noqa: E402
+from logic.life import LifeAnalysis  # noqa: E402
+
 EMPTY = 0
 BLACK = 1
 WHITE = -1
 
+# 盤面の bytes では交点の値に OFFSET を足して 0..4 の1バイトにする
+OFFSET = 2
+
+
+
 class GameState:
     """
     一つの囲碁の局面を管理するクラス。
-    board: tuple of tuples
+    board: 交点の値 + OFFSET を行の順に並べた bytes (cell(r, c) で元の値)
     turn: 1 = 黒, -1 = 白
     last_move: (r,c) or None
-    parent: 親 GameState
+    rows, cols: 盤面の行と列の数 (board が bytes のときは渡す)
+    empty_points: 石の無い交点 (0, 2, -2) のビット集合 (交点 r*cols+c のビット)
+        子局面では親の集合から着手点を除き、取った石の点を加えて作る
+    id: 盤面・手番・直前手のハッシュ (int)
+    親は持たない。同形反復は build_tree が渡す経路上の盤面の集合 (path) で調べる
+    __slots__ で __dict__ を持たないので、大きい木でも1局面あたりのメモリが小さい
     """
-    def __init__(self, board_data, turn=1, last_move=None, parent=None):
-        self.board = tuple(map(tuple, board_data))
+    __slots__ = ("board", "turn", "rows", "cols", "last_move", "empty_points", "id", "children")
+
+    def __init__(self, board_data, turn=1, last_move=None, empty_points=None, rows=None, cols=None):
+        if isinstance(board_data, bytes):
+            if rows is None or cols is None or rows * cols != len(board_data):
+                raise ValueError("rows and cols must be given for a bytes board")
+            self.board = board_data
+            self.rows, self.cols = rows, cols
+        else:
+            self.board = bytes(value + OFFSET for row in board_data for value in row)
+            self.rows = len(board_data)
+            self.cols = len(board_data[0]) if board_data else 0
         self.turn = turn
-        self.size = len(self.board)
         self.last_move = last_move
-        self.parent = parent
+        if empty_points is None:
+            empty_points = 0
+            for i, value in enumerate(self.board):
+                if value - OFFSET not in (1, -1):
+                    empty_points |= 1 << i
+        self.empty_points = empty_points
+        self.children = []
         self.id = self._generate_id()
 
     def _generate_id(self):
-        board_str = "".join(map(str, [item for row in self.board for item in row]))
-        turn_str = str(self.turn)
-        last_move_str = str(self.last_move)
-        return hashlib.sha1((board_str + turn_str + last_move_str).encode()).hexdigest()[:10]
-
-    def _tuple_board(self, board_list):
-        return tuple(map(tuple, board_list))
-
-    def _get_group_and_liberties(self, board_list, sr, sc):
-        n = self.size
-        color = board_list[sr][sc]
-        if color == 0:
+        # 実行をまたいで同じ値になるように (ノード画像のファイル名に使う) 組み込みの hash は使わない
+        data = self.board + bytes((self.turn + 1,)) + str(self.last_move).encode()
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+    def cell(self, r, c):
+        return self.board[r * self.cols + c] - OFFSET
+
+    def to_rows(self):
+        """盤面を行のリストにしたもの (logic の解析に渡す)"""
+        return [[self.cell(r, c) for c in range(self.cols)] for r in range(self.rows)]
+
+    def _get_group_and_liberties(self, board, start):
+        """board (bytearray) の交点 start の石を含む連と、その呼吸点 (どちらも交点の番号の集合)"""
+        rows, cols = self.rows, self.cols
+        color = board[start]
+        if color == OFFSET:
             return set(), set()
-        stack = [(sr, sc)]
+        stack = [start]
         group = set()
         liberties = set()
-        visited = set()
         while stack:
-            r, c = stack.pop()
-            if (r, c) in visited:
+            i = stack.pop()
+            if i in group:
                 continue
-            visited.add((r, c))
-            group.add((r, c))
+            group.add(i)
+            r, c = divmod(i, cols)
             for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
                 nr, nc = r + dr, c + dc
-                if 0 <= nr < n and 0 <= nc < n:
-                    val = board_list[nr][nc]
-                    if val == 0:
-                        liberties.add((nr, nc))
-                    elif val == color and (nr, nc) not in visited:
-                        stack.append((nr, nc))
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    j = nr * cols + nc
+                    val = board[j]
+                    if val == OFFSET:
+                        liberties.add(j)
+                    elif val == color and j not in group:
+                        stack.append(j)
         return group, liberties
 
-    def _is_same_board_as_ancestor(self, candidate_board_tuple):
-        p = self
-        while p is not None:
-            if p.board == candidate_board_tuple:
-                return True
-            p = p.parent
-        return False
-
-    def generate_moves(self):
+    def generate_moves(self, hooks=None, depth=0, path=None, settled=None):
+        """
+        hooks を渡すと、自殺手・同形反復・確定地で除いた手と石を取った手を通知する
+        (hooks が None のときは何も呼ばない)
+        path: 根からこの局面までの盤面 (bytes) の集合。その盤面に戻る手は同形反復として除く
+        (None ならこの局面の盤面だけ)
+        settled: 相手の確定地の交点の番号の集合。そこに打ち込む手は除く
+        (他に手が無ければ、手番を失わないよう残す)
+        """
+        if path is None:
+            path = {self.board}
         moves = []
+        inside = []  # 相手の確定地に打ち込む手
         player_color = self.turn
-        n = self.size
-
-        for r in range(n):
-            for c in range(n):
-                point = self.board[r][c]
-
-                can_play = (point == 0) or \
-                           (player_color == 1 and point == 2) or \
-                           (player_color == -1 and point == -2)
-                if not can_play:
-                    continue
-
-                new_board = [list(row) for row in self.board]
-                new_board[r][c] = player_color
-
-                opponent = -player_color
-                captured_any = False
-                for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
-                    nr, nc = r + dr, c + dc
-                    if 0 <= nr < n and 0 <= nc < n and new_board[nr][nc] == opponent:
-                        group, libs = self._get_group_and_liberties(new_board, nr, nc)
-                        if len(libs) == 0:
-                            captured_any = True
-                            for (gr, gc) in group:
-                                new_board[gr][gc] = 0
-
-                group_self, libs_self = self._get_group_and_liberties(new_board, r, c)
-                if len(libs_self) == 0 and not captured_any:
-                    continue
-
-                candidate_board_tuple = self._tuple_board(new_board)
-                if self._is_same_board_as_ancestor(candidate_board_tuple):
-                    continue
-
-                child_state = GameState(new_board, -player_color, last_move=(r, c), parent=self)
+        own = player_color + OFFSET
+        opponent = -player_color + OFFSET
+        rows, cols = self.rows, self.cols
+
+        # 盤面全体ではなく、石の無い交点だけを (行・列の順に) 調べる
+        bits = self.empty_points
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            i = low.bit_length() - 1
+            point = self.board[i] - OFFSET
+
+            can_play = (point == 0) or \
+                       (player_color == 1 and point == 2) or \
+                       (player_color == -1 and point == -2)
+            if not can_play:
+                continue
+
+            r, c = divmod(i, cols)
+            new_board = bytearray(self.board)
+            new_board[i] = own
+
+            captured = []
+            for dr, dc in ((1,0),(-1,0),(0,1),(0,-1)):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols and new_board[nr * cols + nc] == opponent:
+                    group, libs = self._get_group_and_liberties(new_board, nr * cols + nc)
+                    if len(libs) == 0:
+                        captured.extend(group)
+                        for j in group:
+                            new_board[j] = OFFSET
+
+            group_self, libs_self = self._get_group_and_liberties(new_board, i)
+            if len(libs_self) == 0 and not captured:
+                if hooks is not None:
+                    hooks.on_prune(depth, (r, c), "suicide")
+                continue
+
+            candidate_board = bytes(new_board)
+            if candidate_board in path:
+                if hooks is not None:
+                    hooks.on_prune(depth, (r, c), "ko")
+                continue
+
+            if captured and hooks is not None:
+                hooks.on_capture(depth, (r, c), len(captured))
+
+            empty_points = self.empty_points & ~low
+            for j in captured:
+                empty_points |= 1 << j
+            child_state = GameState(candidate_board, -player_color, last_move=(r, c),
+                                    empty_points=empty_points, rows=rows, cols=cols)
+            if settled and i in settled:
+                inside.append(child_state)
+            else:
                 moves.append(child_state)
 
+        if not moves:
+            return inside
+        if hooks is not None:
+            for child_state in inside:
+                hooks.on_prune(depth, child_state.last_move, "dominated")
         return moves
 
 def create_node_image(node, file_path):
@@ -115,23 +184,27 @@ def create_node_image(node, file_path):
     padding = 5
     cell_size = 15
     stone_radius = 6
-    img_size = cell_size * (node.size - 1) + 2 * padding
+    width = cell_size * (node.cols - 1) + 2 * padding
+    height = cell_size * (node.rows - 1) + 2 * padding
 
-    image = Image.new("RGB", (img_size, img_size), "#D1B48C")
+    image = Image.new("RGB", (width, height), "#D1B48C")
     drawer = ImageDraw.Draw(image)
 
     # 格子の描画
     start = padding
-    end = cell_size * (node.size - 1) + padding
-    for i in range(node.size):
-        pos = start + i * cell_size
-        drawer.line([(start, pos), (end, pos)], fill="black")
-        drawer.line([(pos, start), (pos, end)], fill="black")
+    right = cell_size * (node.cols - 1) + padding
+    bottom = cell_size * (node.rows - 1) + padding
+    for r in range(node.rows):
+        pos = start + r * cell_size
+        drawer.line([(start, pos), (right, pos)], fill="black")
+    for c in range(node.cols):
+        pos = start + c * cell_size
+        drawer.line([(pos, start), (pos, bottom)], fill="black")
 
     # 石の描画
-    for r in range(node.size):
-        for c in range(node.size):
-            point_data = node.board[r][c]
+    for r in range(node.rows):
+        for c in range(node.cols):
+            point_data = node.cell(r, c)
             x = padding + c * cell_size
             y = padding + r * cell_size
 
@@ -164,33 +237,172 @@ def create_node_image(node, file_path):
 
     image.save(file_path)
 
-def build_tree(start_node, max_depth, visited_ids):
-    if start_node.id in visited_ids or max_depth == 0:
-        return
-    visited_ids.add(start_node.id)
-    start_node.children = start_node.generate_moves()
-    for child in start_node.children:
-        build_tree(child, max_depth - 1, visited_ids)
+def build_tree(start_node, max_depth, visited_ids, hooks=None, depth=0, path=None,
+               checkpoint=None, stack=None, expanded=0, settled=False):
+    """
+    深さ優先で start_node から max_depth 手先まで children を作る
+    再帰の代わりに明示的なスタックを使う (長いコウや詰めの手順でも RecursionError にならない)
+    スタックの要素: (局面, 残りの深さ, 深さ, 位置) か、子を全て見終えた局面の盤面を path から除く印
+    (None, 盤面, 深さ, None)。位置は (親を展開した順番, 親の何番目の子か)。根は (None, 0)
+    path: 根からこの局面の親までの盤面の集合 (同形反復の判定に使う)
+    checkpoint (logic.checkpoint.Checkpoint) を渡すと、定期的に探索の先端 (スタック)・visited_ids・path を
+    保存し、前の保存から展開した局面の子をログに追記する (resume_search で続きから始められる)
+    stack, expanded: resume_search が返す続きのスタックと、それまでに展開した局面の数
+    settled: 相手の確定地 (logic.life.LifeAnalysis) に打ち込む手を除く
+    子の解析は親の解析を LifeAnalysis.apply_move で更新して求める (盤面全体を解析し直さない)
+    """
+    if path is None:
+        path = set()
+    if stack is None:
+        stack = [(start_node, max_depth, depth, (None, 0))]
+    pending = []  # 前の保存から展開した局面 (位置, 子)
+    lives = {}    # まだ展開していない子の盤面 -> (親の LifeAnalysis, 着手, 色)
+    while stack:
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save(_frontier(stack, visited_ids, path, expanded), pending)
+            pending = []
+        node, remaining, depth, position = stack.pop()
+        if node is None:
+            path.discard(remaining)
+            continue
+        if remaining == 0:
+            continue
+        if node.id in visited_ids:
+            if hooks is not None:
+                hooks.on_cache_hit(depth, node)
+            continue
+        visited_ids.add(node.id)
+        path.add(node.board)
+        territory = None
+        if settled:
+            parent = lives.pop(node.board, None)
+            life = LifeAnalysis(node.to_rows()) if parent is None else parent[0].apply_move(*parent[1:])
+            territory = {r * node.cols + c for r, c in life.territory[-node.turn]}
+        if hooks is None:
+            node.children = node.generate_moves(path=path, settled=territory)
+        else:
+            start = time.perf_counter()
+            node.children = node.generate_moves(hooks, depth, path, territory)
+            hooks.on_node(depth, node, len(node.children), time.perf_counter() - start)
+        if settled and remaining > 1:
+            for child in node.children:
+                lives.setdefault(child.board, (life, child.last_move, node.turn))
+        if checkpoint is not None:
+            pending.append((position, [(child.board, child.turn, child.last_move, child.empty_points)
+                                       for child in node.children]))
+        stack.append((None, node.board, depth, None))
+        for i in reversed(range(len(node.children))):
+            stack.append((node.children[i], remaining - 1, depth + 1, (expanded, i)))
+        expanded += 1
+
+
+def _frontier(stack, visited_ids, path, expanded):
+    """保存する探索の先端。局面は木の中の位置だけで持つ (ログから組み立て直した木で引く)"""
+    frames = [(position, remaining, depth) if node is not None else (None, remaining, depth)
+              for node, remaining, depth, position in stack]
+    return {"stack": frames, "visited_ids": visited_ids, "path": path, "expanded": expanded}
+
+
+def resume_search(root, checkpoint):
+    """
+    checkpoint のログから、保存までに作った木を root の下に組み立て直す
+    返り値: build_tree に渡す (スタック, visited_ids, path, 展開した局面の数)。保存が無ければ None
+    """
+    loaded = checkpoint.load()
+    if loaded is None:
+        return None
+    state, records = loaded
+    expanded = []  # 展開した順の局面
+
+    def node_at(position):
+        parent, index = position
+        return root if parent is None else expanded[parent].children[index]
+
+    for position, children in records:
+        node = node_at(position)
+        node.children = [GameState(board, turn, last_move=last_move, empty_points=empty_points,
+                                   rows=root.rows, cols=root.cols)
+                         for board, turn, last_move, empty_points in children]
+        expanded.append(node)
+    stack = [(node_at(position), remaining, depth, position) if position is not None
+             else (None, remaining, depth, None)
+             for position, remaining, depth in state["stack"]]
+    return stack, state["visited_ids"], state["path"], state["expanded"]
 
 def visualize_tree(root_node, dot, node_img_dir, visited_ids_viz):
-    if root_node.id in visited_ids_viz:
+    """木を深さ優先でたどって dot にノードと辺を加える (明示的なスタックを使う)"""
+    def add_node(node):
+        if node.id in visited_ids_viz:
+            return False
+        visited_ids_viz.add(node.id)
+        name = f"{node.id:016x}"
+        image_path = os.path.join(node_img_dir, f"{name}.png")
+        if not os.path.exists(image_path):
+            create_node_image(node, image_path)
+        dot.node(name, label='', image=image_path, shape='box')
+        return True
+
+    if not add_node(root_node):
         return
-    visited_ids_viz.add(root_node.id)
-    image_path = os.path.join(node_img_dir, f"{root_node.id}.png")
-    if not os.path.exists(image_path):
-        create_node_image(root_node, image_path)
-    dot.node(root_node.id, label='', image=image_path, shape='box')
-    if hasattr(root_node, 'children'):
-        for child in root_node.children:
-            edge_color = "black" if root_node.turn == 1 else "gray"
-            dot.edge(root_node.id, child.id, color=edge_color)
-            visualize_tree(child, dot, node_img_dir, visited_ids_viz)
+    stack = [(root_node, iter(root_node.children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            edge_color = "black" if node.turn == 1 else "gray"
+            dot.edge(f"{node.id:016x}", f"{child.id:016x}", color=edge_color)
+            if add_node(child):
+                stack.append((child, iter(child.children)))
+                break
+        else:
+            stack.pop()
+
+def build_with_checkpoint(board_data, turn, max_depth, checkpoint_path=None, resume=False, hooks=None,
+                          settled=False):
+    """
+    木を作って根を返す
+    checkpoint_path を渡すと途中経過を保存し、終わったら消す
+    resume なら保存したところから続ける (保存が無ければ最初から。違う盤面・手番・深さの保存なら ValueError)
+    settled なら相手の確定地に打ち込む手を除く (build_tree と同じ)
+    """
+    root = GameState(board_data, turn=turn)
+    if checkpoint_path is None:
+        build_tree(root, max_depth, set(), hooks, settled=settled)
+        return root
+    checkpoint = Checkpoint(checkpoint_path, ("game_tree-7", root.board, root.rows, root.cols, turn, max_depth,
+                                              settled))
+    resumed = resume_search(root, checkpoint) if resume else None
+    if resumed is None:
+        checkpoint.remove()
+        build_tree(root, max_depth, set(), hooks, checkpoint=checkpoint, settled=settled)
+    else:
+        stack, visited_ids, path, expanded = resumed
+        build_tree(root, max_depth, visited_ids, hooks, path=path, checkpoint=checkpoint,
+                   stack=stack, expanded=expanded, settled=settled)
+    checkpoint.remove()
+    return root
 
 def main():
     CSV_FILE_PATH = 'board_simple.csv'
     MAX_DEPTH = 3
     NODE_IMAGE_DIR = 'game_tree_nodes'
 
+    parser = argparse.ArgumentParser(description="ゲーム木を作って画像にする")
+    parser.add_argument("--stats", action="store_true",
+                        help="print per-depth search statistics (after --resume, only the resumed part)")
+    parser.add_argument("--stats-json",
+                        help="write the search statistics and event trace of both trees to this JSON file")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save the search progress periodically to PATH.black / PATH.white "
+                             "(removed when the build finishes)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the --checkpoint files saved by an interrupted run")
+    parser.add_argument("--settled", action="store_true",
+                        help="drop moves into the opponent's settled territory (Benson's unconditional life)")
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    show_stats = args.stats or args.stats_json
+
     try:
         with open(CSV_FILE_PATH, 'r') as f:
             reader = csv.reader(f)
@@ -205,8 +417,17 @@ def main():
     dot_black = graphviz.Digraph(comment='Black to Play First')
     dot_black.attr(bgcolor='lightgray', rankdir='TB')
     dot_black.attr('node', style='filled', fillcolor='white')
-    start_node_black = GameState(board_data, turn=1)
-    build_tree(start_node_black, MAX_DEPTH, set())
+    stats_black = SearchStats(trace=bool(args.stats_json)) if show_stats else None
+    try:
+        start_node_black = build_with_checkpoint(board_data, 1, MAX_DEPTH,
+                                                args.checkpoint and args.checkpoint + ".black",
+                                                args.resume, stats_black, args.settled)
+    except ValueError as e:
+        print(f"エラー: {e}")
+        return
+    if stats_black is not None:
+        print("黒先手の探索統計")
+        print(stats_black.report())
     visualize_tree(start_node_black, dot_black, NODE_IMAGE_DIR, set())
     dot_black.render('black_first', format='png', view=False, cleanup=True)
 
@@ -214,10 +435,25 @@ def main():
     dot_white = graphviz.Digraph(comment='White to Play First')
     dot_white.attr(bgcolor='lightgray', rankdir='TB')
     dot_white.attr('node', style='filled', fillcolor='white')
-    start_node_white = GameState(board_data, turn=-1)
-    build_tree(start_node_white, MAX_DEPTH, set())
+    stats_white = SearchStats(trace=bool(args.stats_json)) if show_stats else None
+    try:
+        start_node_white = build_with_checkpoint(board_data, -1, MAX_DEPTH,
+                                                args.checkpoint and args.checkpoint + ".white",
+                                                args.resume, stats_white, args.settled)
+    except ValueError as e:
+        print(f"エラー: {e}")
+        return
+    if stats_white is not None:
+        print("白先手の探索統計")
+        print(stats_white.report())
     visualize_tree(start_node_white, dot_white, NODE_IMAGE_DIR, set())
     dot_white.render('white_first', format='png', view=True, cleanup=True)
 
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump({"black_first": stats_black.as_dict(), "white_first": stats_white.as_dict()},
+                      f, indent=2)
+        print(f"Stats saved to {args.stats_json}")
+
 if __name__ == "__main__":
     main()
@@ -1,11 +1,22 @@
 # --- 盤面画像を保存する関数 ---
 from PIL import Image, ImageDraw
+import argparse
 import csv
 import hashlib
+import itertools
 import os
+import sys
 from PIL import Image, ImageDraw
 
+# 途中経過の保存はアプリ (materials2/go_cgt_app) の logic.checkpoint を使う
+APP_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        os.pardir, os.pardir, os.pardir, "materials2", "go_cgt_app"))
+sys.path.insert(0, APP_DIR)
+from logic.checkpoint import Checkpoint  # noqa: E402
+
 class GameValue:
+    __slots__ = ("type", "value")
+
     def __init__(self, value_type='UNKNOWN', value=None):
         self.type = value_type
         self.value = value
@@ -15,10 +26,25 @@ class GameValue:
         return '?'
 
 
+# 同じ値の GameValue は1つだけ作って使い回す (等しい値は同じオブジェクトになる)
+_value_table = {}
+
+def make_value(value_type='UNKNOWN', value=None):
+    key = (value_type, value)
+    if key not in _value_table:
+        _value_table[key] = GameValue(value_type, value)
+    return _value_table[key]
+
+
 class GameState:
-    def __init__(self, board_data):
+    def __init__(self, board_data, empty_points=None):
         self.board = tuple(map(tuple, board_data))
         self.size = len(self.board)
+        # 石の無い交点 (0, 2, -2)。子局面は着手点を除くだけで作れる (この版は石を取らない)
+        if empty_points is None:
+            empty_points = frozenset((r, c) for r in range(self.size) for c in range(self.size)
+                                     if self.board[r][c] not in (1, -1))
+        self.empty_points = empty_points
         self.id = self._generate_id()
 
     def _generate_id(self):
@@ -28,51 +54,69 @@ class GameState:
     def generate_moves_for_player(self, player_color):
         moves = []
         allowed_empty_points = [0, player_color * 2]
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.board[r][c] in allowed_empty_points:
-                    new_board_list = [list(row) for row in self.board]
-                    new_board_list[r][c] = player_color
-                    moves.append(GameState(new_board_list))
+        for r, c in sorted(self.empty_points):
+            if self.board[r][c] in allowed_empty_points:
+                new_board_list = [list(row) for row in self.board]
+                new_board_list[r][c] = player_color
+                moves.append(GameState(new_board_list, self.empty_points - {(r, c)}))
         return moves
 
 
 # --- 値計算ロジック ---
 memoization_cache = {}
 
-def calculate_value(node):
+def calculate_value(node, checkpoint=None):
+    """
+    局面の値 (子の値が先に決まるように、明示的なスタックで帰りがけ順にたどる)
+    スタックの要素: (局面, None) はまだ子を生成していない局面、(局面, (黒の選択肢の ID, 白の選択肢の ID)) は
+    子を積み終えて、子の値が揃ったら値を決める局面
+    checkpoint (logic.checkpoint.Checkpoint) を渡すと、途中経過を定期的に保存する (save_checkpoint)
+    (このスタックは保存しない。再開したら求めた値はキャッシュから引くので、残りだけ計算し直す)
+    """
     if node.id in memoization_cache:
         return memoization_cache[node.id]
 
-    left_options = node.generate_moves_for_player(1)
-    right_options = node.generate_moves_for_player(-1)
-    
-    left_values = {calculate_value(child) for child in left_options}
-    right_values = {calculate_value(child) for child in right_options}
+    stack = [(node, None)]
+    while stack:
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint(checkpoint)
+        current, options = stack.pop()
+        if current.id in memoization_cache:
+            continue
+        if options is None:
+            left_options = current.generate_moves_for_player(1)
+            right_options = current.generate_moves_for_player(-1)
+            # 子の局面そのものではなく ID だけ持っておく (スタックが深くなってもメモリが増えにくい)
+            stack.append((current, ([child.id for child in left_options],
+                                    [child.id for child in right_options])))
+            for child in reversed(left_options + right_options):
+                if child.id not in memoization_cache:
+                    stack.append((child, None))
+        else:
+            memoization_cache[current.id] = _combine(*options)
+    return memoization_cache[node.id]
+
+
+def _combine(left_options, right_options):
+    """子の ID (値は memoization_cache にある) から局面の値を決める"""
+    left_values = {memoization_cache[child_id] for child_id in left_options}
+    right_values = {memoization_cache[child_id] for child_id in right_options}
 
     if not left_options and not right_options:
-        result = GameValue('INTEGER', 0)
-        memoization_cache[node.id] = result
-        return result
+        return make_value('INTEGER', 0)
 
     all_children_are_integers = all(v.type == 'INTEGER' for v in left_values | right_values)
 
     if all_children_are_integers:
         if len(left_values) == 1 and not right_values:
             child_value = list(left_values)[0].value
-            result = GameValue('INTEGER', child_value + 1)
-            memoization_cache[node.id] = result
-            return result
-            
+            return make_value('INTEGER', child_value + 1)
+
         if not left_values and len(right_values) == 1:
             child_value = list(right_values)[0].value
-            result = GameValue('INTEGER', child_value - 1)
-            memoization_cache[node.id] = result
-            return result
+            return make_value('INTEGER', child_value - 1)
 
-    result = GameValue('UNKNOWN')
-    memoization_cache[node.id] = result
-    return result
+    return make_value('UNKNOWN')
 
 
 # --- 盤面描画関数 (Pillow) ---
@@ -116,31 +160,99 @@ def draw_board_image(board_data, filename):
 
 
 # --- 値と盤面を出力 ---
-def dump_game_values(node, max_depth, f, depth=0, visited=None, outdir="output_images"):
+def dump_game_values(node, max_depth, f, depth=0, visited=None, outdir="output_images",
+                     checkpoint=None, stack=None):
+    """
+    行きがけ順に値と盤面を出力する (明示的なスタックを使う。子は逆順に積む)
+    checkpoint (logic.checkpoint.Checkpoint) を渡すと、途中経過を定期的に保存する (save_checkpoint)
+    stack: resume_checkpoint が返すスタック (保存したところから続ける)
+    """
+    global _dump
     if visited is None:
         visited = set()
-    if node.id in visited or depth > max_depth:
-        return
-    visited.add(node.id)
-
-    value = calculate_value(node)
-    f.write(f"Depth {depth}, ID {node.id}, Value: {value}\n")
-
-    # 盤面画像を保存
-    os.makedirs(outdir, exist_ok=True)
-    img_path = os.path.join(outdir, f"{node.id}_d{depth}.png")
-    draw_board_image(node.board, img_path)
-
-    for child in node.generate_moves_for_player(1):
-        dump_game_values(child, max_depth, f, depth+1, visited, outdir)
-    for child in node.generate_moves_for_player(-1):
-        dump_game_values(child, max_depth, f, depth+1, visited, outdir)
+    if stack is None:
+        stack = [(node, depth)]
+    _dump = (stack, visited, f)
+    while stack:
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint(checkpoint)
+        # 値を求める間に保存してもこの局面が残るように、値を出力してからスタックから除く
+        node, depth = stack[-1]
+        if node.id in visited or depth > max_depth:
+            stack.pop()
+            continue
+
+        value = calculate_value(node, checkpoint)
+        stack.pop()
+        visited.add(node.id)
+        f.write(f"Depth {depth}, ID {node.id}, Value: {value}\n")
+
+        # 盤面画像を保存
+        os.makedirs(outdir, exist_ok=True)
+        img_path = os.path.join(outdir, f"{node.id}_d{depth}.png")
+        draw_board_image(node.board, img_path)
+
+        children = node.generate_moves_for_player(1) + node.generate_moves_for_player(-1)
+        for child in reversed(children):
+            stack.append((child, depth + 1))
+    _dump = None
+
+
+# --- 途中経過の保存と再開 ---
+_dump = None        # dump_game_values の途中の (スタック, visited, 出力ファイル)
+_saved_values = 0   # memoization_cache のうちログに書いた数 (辞書は追加した順に並ぶ)
+
+def save_checkpoint(checkpoint):
+    """
+    前の保存から増えた値を (ID, 種類, 値) でログに追記し、dump_game_values の途中なら
+    その先端 (スタックの盤面と深さ)・visited・出力した位置をスナップショットにする
+    """
+    global _saved_values
+    records = [(key, value.type, value.value)
+               for key, value in itertools.islice(memoization_cache.items(), _saved_values, None)]
+    state = None
+    if _dump is not None:
+        stack, visited, f = _dump
+        f.flush()
+        state = ([(node.board, depth) for node, depth in stack], visited, f.tell())
+    checkpoint.save(state, records)
+    _saved_values += len(records)
+
+
+def resume_checkpoint(checkpoint):
+    """
+    保存した値を memoization_cache に戻し、dump_game_values の途中なら
+    (スタック, visited, 出力した位置) を返す (保存が無いか、値の計算の途中なら None)
+    違う盤面・深さの保存なら ValueError
+    """
+    global _saved_values
+    loaded = checkpoint.load()
+    if loaded is None:
+        return None
+    state, records = loaded
+    for key, value_type, value in records:
+        memoization_cache[key] = make_value(value_type, value)
+    _saved_values = len(memoization_cache)
+    if state is None:
+        return None
+    stack, visited, position = state
+    return [(GameState(board), depth) for board, depth in stack], visited, position
 
 
 def main():
     CSV_FILE_PATH = 'test2.csv'
     MAX_DEPTH = 3
 
+    parser = argparse.ArgumentParser(description="ゲーム木の値と盤面を出力する")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save the values and the output progress periodically to PATH "
+                             "(removed when the run finishes)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the --checkpoint file saved by an interrupted run")
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+
     try:
         with open(CSV_FILE_PATH, 'r') as f:
             reader = csv.reader(f)
@@ -154,9 +266,32 @@ def main():
     base_name = os.path.splitext(CSV_FILE_PATH)[0]
     OUTPUT_FILE_PATH = f"{base_name}_value.txt"
 
+    checkpoint = None
+    resumed = None
+    if args.checkpoint:
+        checkpoint = Checkpoint(args.checkpoint, ("integer4", start_node.board, MAX_DEPTH))
+        if args.resume:
+            try:
+                resumed = resume_checkpoint(checkpoint)
+            except ValueError as e:
+                print(f"エラー: {e}")
+                return
+        else:
+            checkpoint.remove()
+
     print("ゲーム木を構築し、値と画像を保存中...")
-    with open(OUTPUT_FILE_PATH, "w") as f:
-        dump_game_values(start_node, MAX_DEPTH, f)
+    if resumed is None:
+        with open(OUTPUT_FILE_PATH, "w") as f:
+            dump_game_values(start_node, MAX_DEPTH, f, checkpoint=checkpoint)
+    else:
+        # 保存したときまでに出力した行だけ残して続ける
+        stack, visited, position = resumed
+        with open(OUTPUT_FILE_PATH, "r+") as f:
+            f.seek(position)
+            f.truncate()
+            dump_game_values(start_node, MAX_DEPTH, f, visited=visited, checkpoint=checkpoint, stack=stack)
+    if checkpoint is not None:
+        checkpoint.remove()
     print(f"計算完了。値は {OUTPUT_FILE_PATH}、画像は output_images フォルダに保存しました。")
 
 
@@ -10,6 +10,74 @@ except ImportError:
     print("コマンドプロンプトで pip install Pillow を実行してください。")
     exit()
 
+# NumPyライブラリのインポート
+try:
+    import numpy as np
+except ImportError:
+    print("エラー: NumPyライブラリが見つかりません。")
+    print("コマンドプロンプトで pip install numpy を実行してください。")
+    exit()
+
+
+def _neighbor_arrays(a, fill):
+    """上下左右にずらした配列 (盤外は fill で埋める)"""
+    padded = np.pad(a, 1, constant_values=fill)
+    return padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]
+
+
+def _label_empty_regions(empty):
+    """
+    空点の連結成分にラベルを付ける
+    各空点のラベルは成分内で最小の通し番号になる (石の点は -1)
+    """
+    rows, cols = empty.shape
+    big = rows * cols
+    flat_empty = empty.ravel()
+    labels = np.where(empty, np.arange(big).reshape(rows, cols), big)
+    while True:
+        # 隣の空点と最小のラベルを共有する
+        new_labels = np.minimum.reduce([labels, *_neighbor_arrays(labels, big)])
+        new_labels = np.where(empty, new_labels, big)
+        # ラベルが指す点のラベルを辿って収束を早める
+        flat = new_labels.ravel()
+        flat = np.where(flat_empty, flat[np.where(flat_empty, flat, 0)], big)
+        new_labels = flat.reshape(rows, cols)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+    return np.where(empty, labels, -1)
+
+
+def analyze_board_for_export(board_data):
+    """
+    盤面を分析し、片方の色の石だけに囲まれた空点の領域を
+    全て専用点(2, -2)に変換したエクスポート用の新しい盤面データを返す。
+    """
+    board = np.asarray(board_data, dtype=np.int8)
+    empty = board == 0
+    if not empty.any():
+        return board.tolist()
+
+    labels = _label_empty_regions(empty)
+    neighbors = _neighbor_arrays(board, 0)
+    touches_black = empty & np.logical_or.reduce([nb == 1 for nb in neighbors])
+    touches_white = empty & np.logical_or.reduce([nb == -1 for nb in neighbors])
+
+    # 領域ごとに、黒石・白石に接しているかを集計する
+    region_ids = labels[empty]
+    minlength = board.size
+    black_border = np.bincount(region_ids, weights=touches_black[empty], minlength=minlength) > 0
+    white_border = np.bincount(region_ids, weights=touches_white[empty], minlength=minlength) > 0
+
+    safe_labels = np.where(empty, labels, 0)
+    black_region = empty & black_border[safe_labels] & ~white_border[safe_labels]
+    white_region = empty & white_border[safe_labels] & ~black_border[safe_labels]
+
+    export_data = board.copy()
+    export_data[black_region] = 2   # 黒の専用点に変換
+    export_data[white_region] = -2  # 白の専用点に変換
+    return export_data.tolist()
+
 class GoBoardApp:
     def __init__(self, root, size):
         self.root = root
@@ -92,30 +160,7 @@ class GoBoardApp:
         現在の盤面を分析し、囲まれた空点を専用点(2, -2)に変換した
         エクスポート用の新しい盤面データを返す。
         """
-        # 元のデータを変更しないようにディープコピーを作成
-        export_data = [row[:] for row in self.board_data]
-        
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.board_data[r][c] == 0: # 空点のみをチェック
-                    neighbors = []
-                    # 上下左右の隣接点をチェック
-                    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                        nr, nc = r + dr, c + dc
-                        # 盤面の範囲内か確認
-                        if 0 <= nr < self.size and 0 <= nc < self.size:
-                            neighbor_stone = self.board_data[nr][nc]
-                            # 隣が石であればリストに追加
-                            if neighbor_stone == 1 or neighbor_stone == -1:
-                                neighbors.append(neighbor_stone)
-                    
-                    # 隣接する石が1つ以上あり、かつ全て同じ色かチェック
-                    if neighbors and all(s == 1 for s in neighbors):
-                        export_data[r][c] = 2 # 黒の専用点に変換
-                    elif neighbors and all(s == -1 for s in neighbors):
-                        export_data[r][c] = -2 # 白の専用点に変換
-        
-        return export_data
+        return analyze_board_for_export(self.board_data)
 
     def save_to_csv(self):
         filename = filedialog.asksaveasfilename(
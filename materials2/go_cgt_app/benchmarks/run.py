@@ -0,0 +1,278 @@
+"""
+着手生成・局面ID・ゲーム木構築・値計算・描画のベンチマーク
+
+    python -m benchmarks.run                                   # 計測して表示
+    python -m benchmarks.run --save benchmarks/baseline.json   # 基準値として保存
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+アプリ (logic/) と materials/ 以下のスクリプト (game_tree-7.py, integer4.py) の
+両方を、benchmarks/boards の固定された終盤局面で計測する
+"""
+import argparse
+import csv
+import functools
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(os.path.dirname(APP_DIR))
+BOARD_DIR = os.path.join(APP_DIR, "benchmarks", "boards")
+sys.path.insert(0, APP_DIR)
+from logic import evaluator  # noqa: E402
+from logic.game_state import GameState, BLACK, WHITE  # noqa: E402
+from logic.regions import split_regions, region_state  # noqa: E402
+from logic.tree_builder import build_tree  # noqa: E402
+from logic.batch_expand import build_tree_batched  # noqa: E402
+from logic.endgame import SumPlayer  # noqa: E402
+from logic.analysis import MAX_REGION_POINTS  # noqa: E402
+
+GAME_TREE_SCRIPT = os.path.join(REPO_DIR, "materials", "Game_Tree_Visualize", "game_tree-7.py")
+INTEGER_SCRIPT = os.path.join(REPO_DIR, "materials", "Game_value", "integer", "integer4.py")
+
+BOARD_SIZES = (4, 6, 9, 19)
+TREE_DEPTHS = (1, 2, 3)
+# integer4.py は盤面全体を1つのゲームとして探索するので、開いた領域がいくつもある
+# 9路・19路の終盤では終わらない (アプリは領域ごとに探索する)
+WHOLE_BOARD_SIZES = (4, 6)
+
+
+def load_board(size):
+    path = os.path.join(BOARD_DIR, f"endgame_{size}x{size}.csv")
+    with open(path, newline="") as f:
+        return [[int(cell) for cell in row] for row in csv.reader(f)]
+
+
+_scripts = {}
+
+
+def load_script(path):
+    """ハイフン付きのファイル名のスクリプトをモジュールとして読み込む (1プロセス1回)"""
+    if path not in _scripts:
+        name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _scripts[path] = module
+    return _scripts[path]
+
+
+# --- 計測対象 ---
+# 各関数は盤面を受け取って1回分の処理を行い、処理したノード数を返す
+
+def app_options(board):
+    state = GameState(board)
+    return len(state.options(BLACK)) + len(state.options(WHITE))
+
+
+def app_key(board):
+    hash(GameState(board).key())
+    return 1
+
+
+def _count_tree(tree):
+    return 1 + sum(_count_tree(child) for child in tree.values())
+
+
+def app_build_tree(board, depth):
+    return _count_tree(build_tree(GameState(board), depth=depth))
+
+
+def app_build_tree_batched(board, depth):
+    return _count_tree(build_tree_batched(GameState(board), depth=depth))
+
+
+def app_evaluate(board):
+    """アプリと同じく、領域ごとに評価する"""
+    evaluator.memoization_cache.clear()
+    for region in split_regions(board):
+        evaluator.evaluate(region_state(board, region))
+    return len(evaluator.memoization_cache)
+
+
+def app_sum_play(board):
+    """終盤を hotstrat で最後まで打つ (領域の解析とサーモグラフの計算を含む)"""
+    moves, _ = SumPlayer(board, max_points=MAX_REGION_POINTS).play_out()
+    return len(moves)
+
+
+def gt7_generate_moves(board):
+    gt7 = load_script(GAME_TREE_SCRIPT)
+    return len(gt7.GameState(board).generate_moves())
+
+
+def gt7_generate_id(board):
+    gt7 = load_script(GAME_TREE_SCRIPT)
+    gt7.GameState(board)._generate_id()
+    return 1
+
+
+def gt7_build_tree(board, depth):
+    gt7 = load_script(GAME_TREE_SCRIPT)
+    visited = set()
+    gt7.build_tree(gt7.GameState(board, turn=1), depth, visited)
+    return len(visited)
+
+
+def int4_calculate_value(board):
+    int4 = load_script(INTEGER_SCRIPT)
+    int4.memoization_cache.clear()
+    int4.calculate_value(int4.GameState(board))
+    return len(int4.memoization_cache)
+
+
+def gt7_render(board):
+    gt7 = load_script(GAME_TREE_SCRIPT)
+    with tempfile.TemporaryDirectory() as tmp:
+        gt7.create_node_image(gt7.GameState(board), os.path.join(tmp, "node.png"))
+    return 1
+
+
+def cases():
+    """(ケース名, 関数, 盤面サイズ) の一覧"""
+    result = []
+    for size in BOARD_SIZES:
+        result.append((f"app.options/{size}", app_options, size))
+        result.append((f"app.key/{size}", app_key, size))
+        for depth in TREE_DEPTHS:
+            result.append((f"app.build_tree/d{depth}/{size}",
+                           functools.partial(app_build_tree, depth=depth), size))
+            result.append((f"app.build_tree_batched/d{depth}/{size}",
+                           functools.partial(app_build_tree_batched, depth=depth), size))
+        result.append((f"app.evaluate/{size}", app_evaluate, size))
+        result.append((f"app.sum_play/{size}", app_sum_play, size))
+        result.append((f"game_tree-7.generate_moves/{size}", gt7_generate_moves, size))
+        result.append((f"game_tree-7._generate_id/{size}", gt7_generate_id, size))
+        for depth in TREE_DEPTHS:
+            result.append((f"game_tree-7.build_tree/d{depth}/{size}",
+                           functools.partial(gt7_build_tree, depth=depth), size))
+        if size in WHOLE_BOARD_SIZES:
+            result.append((f"integer4.calculate_value/{size}", int4_calculate_value, size))
+        result.append((f"game_tree-7.render/{size}", gt7_render, size))
+    return result
+
+
+# --- 計測 ---
+
+def _time_case(func, size, min_time, repeat):
+    """
+    子プロセス内で実行される
+    1回あたりの時間は repeat 回の計測の最小値を使う
+    """
+    board = load_board(size)
+    nodes = func(board)  # 1回目はモジュールの読み込みなどを含むので捨てる
+    best = None
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            func(board)
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        per_loop = elapsed / loops
+        best = per_loop if best is None else min(best, per_loop)
+    peak_rss_kb = None
+    if resource is not None:
+        peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":  # macOS はバイト単位
+            peak_rss_kb //= 1024
+    return {
+        "seconds": best,
+        "nodes": nodes,
+        "nodes_per_sec": nodes / best if best > 0 else None,
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+
+def run_cases(selected, min_time, repeat):
+    results = {}
+    for name, func, size in selected:
+        # ピークRSSをケースごとに分けるため、1ケースにつき1プロセスで計測する
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                result = executor.submit(_time_case, func, size, min_time, repeat).result()
+            except Exception as e:
+                print(f"{name:45s} skipped ({type(e).__name__}: {e})")
+                continue
+        results[name] = result
+        print(format_result(name, result))
+    return results
+
+
+def format_result(name, result):
+    rss = "-" if result["peak_rss_kb"] is None else f"{result['peak_rss_kb'] / 1024:.1f}MB"
+    nps = "-" if result["nodes_per_sec"] is None else f"{result['nodes_per_sec']:,.0f}"
+    return (f"{name:45s} {result['seconds'] * 1e6:12.1f} us  "
+            f"nodes={result['nodes']:<7d} nodes/s={nps:>12s}  rss={rss}")
+
+
+def metadata():
+    """計測した環境 (基準値のファイルは自分を含むコミットを指せないので、コミットの SHA は入れない)"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """基準値と比べて遅くなったケースの数を返す"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    meta = baseline["meta"]
+    print(f"\n基準値: {baseline_path} ({meta.get('time')}, Python {meta.get('python')}, {meta.get('platform')})")
+    regressions = 0
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + tolerance:
+            mark = "SLOWER"
+            regressions += 1
+        elif ratio < 1 - tolerance:
+            mark = "faster"
+        else:
+            mark = ""
+        print(f"{name:45s} x{ratio:6.2f} {mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="ケース名にこの文字列を含むものだけ実行")
+    parser.add_argument("--min-time", type=float, default=0.2, help="1回の計測の最低時間 (秒)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="結果を JSON で保存するパス")
+    parser.add_argument("--compare", help="比較する基準値の JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="遅くなったとみなす割合")
+    args = parser.parse_args()
+
+    selected = [case for case in cases() if args.filter in case[0]]
+    results = run_cases(selected, args.min_time, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2, sort_keys=True)
+        print(f"\n結果を {args.save} に保存しました。")
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"{regressions} 件のケースが遅くなりました。")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
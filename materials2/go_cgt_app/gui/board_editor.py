@@ -1,6 +1,8 @@
+import queue
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import filedialog, ttk
 import csv
+from logic.analysis import LiveAnalyzer, total_value
 
 # Pillow(PIL)ライブラリのインポート
 try:
@@ -27,6 +29,7 @@ class GoBoardApp:
         self.board_image = Image.new("RGB", (canvas_total_size, canvas_total_size), "#D1B48C")
         self.drawer = ImageDraw.Draw(self.board_image)
         self.photo_image = None
+        self.point_items = {}  # (row, col) -> キャンバス上の石・専用点のアイテム
 
         # --- GUIコンポーネント ---
         self.stone_color_var = tk.IntVar(value=1)
@@ -40,8 +43,24 @@ class GoBoardApp:
         tk.Radiobutton(control_frame, text="白専用点", variable=self.stone_color_var, value=-2).pack(side=tk.LEFT)
         tk.Radiobutton(control_frame, text="消去", variable=self.stone_color_var, value=0).pack(side=tk.LEFT)
         
-        self.canvas = tk.Canvas(self.root, width=canvas_total_size, height=canvas_total_size)
-        self.canvas.pack()
+        board_frame = tk.Frame(self.root)
+        board_frame.pack()
+        self.canvas = tk.Canvas(board_frame, width=canvas_total_size, height=canvas_total_size)
+        self.canvas.pack(side=tk.LEFT)
+
+        # 解析結果パネル (領域ごとの値・温度・勝敗クラス)
+        panel_frame = tk.Frame(board_frame)
+        panel_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
+        self.analysis_status_var = tk.StringVar()
+        tk.Label(panel_frame, textvariable=self.analysis_status_var, anchor=tk.W).pack(fill=tk.X)
+        self.analysis_view = ttk.Treeview(
+            panel_frame, columns=("points", "value", "temperature", "outcome"), show="headings"
+        )
+        for column, text, width in (("points", "点数", 50), ("value", "値", 80),
+                                    ("temperature", "温度", 60), ("outcome", "結果", 50)):
+            self.analysis_view.heading(column, text=text)
+            self.analysis_view.column(column, width=width, anchor=tk.CENTER)
+        self.analysis_view.pack(fill=tk.BOTH, expand=True)
 
         # 操作ボタン
         action_frame = tk.Frame(self.root)
@@ -53,8 +72,14 @@ class GoBoardApp:
         self.canvas.bind("<Button-1>", self.handle_click)
         self.draw_board()
 
+        self.analyzer = LiveAnalyzer()
+        self.analysis_job = None
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.request_analysis()
+        self.poll_analysis()
+
     def draw_board(self):
-        """メモリ上の画像に盤面、石、専用点を描画し、キャンバスに表示する"""
+        """メモリ上の画像に盤面全体を描き直す (起動時とクリア時のみ)"""
         self.drawer.rectangle([0, 0, self.board_image.width, self.board_image.height], fill="#D1B48C")
 
         start = self.padding
@@ -64,26 +89,47 @@ class GoBoardApp:
             self.drawer.line([(start, pos), (end, pos)], fill="black")
             self.drawer.line([(pos, start), (pos, end)], fill="black")
 
+        # 格子だけの背景は変化しないので、PhotoImage とキャンバスアイテムは1つだけ作る
+        if self.photo_image is None:
+            self.photo_image = ImageTk.PhotoImage(self.board_image)
+            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_image)
+
         for r in range(self.size):
             for c in range(self.size):
-                point_data = self.board_data[r][c]
-                x = self.padding + c * self.cell_size
-                y = self.padding + r * self.cell_size
-
-                if point_data == 1 or point_data == -1:  # 石
-                    color = "black" if point_data == 1 else "white"
-                    bbox = (x - self.stone_radius, y - self.stone_radius,
-                            x + self.stone_radius, y + self.stone_radius)
-                    self.drawer.ellipse(bbox, fill=color, outline="black")
-                elif point_data == 2 or point_data == -2:  # 専用点
-                    marker_size = 6
-                    color = "black" if point_data == 2 else "white"
-                    bbox = (x - marker_size, y - marker_size,
-                            x + marker_size, y + marker_size)
-                    self.drawer.rectangle(bbox, fill=color, outline="black")
-
-        self.photo_image = ImageTk.PhotoImage(self.board_image)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_image)
+                self.draw_point(r, c)
+
+    def draw_point(self, r, c):
+        """1つの交点だけを描き直す (保存用の画像とキャンバス上の石・専用点)"""
+        point_data = self.board_data[r][c]
+        x = self.padding + c * self.cell_size
+        y = self.padding + r * self.cell_size
+
+        # 保存用の画像: 交点の周りだけ背景で塗り直し、格子線を引き直す
+        half = self.stone_radius + 1
+        start = self.padding
+        end = self.cell_size * (self.size - 1) + self.padding
+        self.drawer.rectangle([x - half, y - half, x + half, y + half], fill="#D1B48C")
+        self.drawer.line([(max(start, x - half), y), (min(end, x + half), y)], fill="black")
+        self.drawer.line([(x, max(start, y - half)), (x, min(end, y + half))], fill="black")
+
+        # キャンバス: 交点ごとのアイテムは高々1つ
+        old_item = self.point_items.pop((r, c), None)
+        if old_item is not None:
+            self.canvas.delete(old_item)
+
+        if point_data == 1 or point_data == -1:  # 石
+            color = "black" if point_data == 1 else "white"
+            bbox = (x - self.stone_radius, y - self.stone_radius,
+                    x + self.stone_radius, y + self.stone_radius)
+            self.drawer.ellipse(bbox, fill=color, outline="black")
+            self.point_items[(r, c)] = self.canvas.create_oval(*bbox, fill=color, outline="black")
+        elif point_data == 2 or point_data == -2:  # 専用点
+            marker_size = 6
+            color = "black" if point_data == 2 else "white"
+            bbox = (x - marker_size, y - marker_size,
+                    x + marker_size, y + marker_size)
+            self.drawer.rectangle(bbox, fill=color, outline="black")
+            self.point_items[(r, c)] = self.canvas.create_rectangle(*bbox, fill=color, outline="black")
 
     def handle_click(self, event):
         col = round((event.x - self.padding) / self.cell_size)
@@ -92,8 +138,55 @@ class GoBoardApp:
         if not (0 <= row < self.size and 0 <= col < self.size):
             return
 
-        self.board_data[row][col] = self.stone_color_var.get()
-        self.draw_board()
+        value = self.stone_color_var.get()
+        if self.board_data[row][col] == value:
+            return
+        self.board_data[row][col] = value
+        self.draw_point(row, col)
+        self.request_analysis()
+
+    def request_analysis(self):
+        """連続したクリックはまとめて、最後の盤面だけを解析に回す"""
+        if self.analysis_job is not None:
+            self.root.after_cancel(self.analysis_job)
+        self.analysis_job = self.root.after(150, self.start_analysis)
+        self.analysis_status_var.set("解析待ち…")
+
+    def start_analysis(self):
+        self.analysis_job = None
+        self.analyzer.submit(self.board_data)
+        self.analysis_status_var.set("解析中…")
+
+    def poll_analysis(self):
+        """ワーカーの結果を Tk のイベントループ側で反映する"""
+        latest = None
+        while True:
+            try:
+                latest = self.analyzer.results.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            self.show_analysis(latest[1])
+        self.root.after(50, self.poll_analysis)
+
+    def show_analysis(self, results):
+        self.analysis_view.delete(*self.analysis_view.get_children())
+        for result in results:
+            if result.skipped:
+                row = (len(result.region), "未解析", "-", "-")
+            else:
+                value = "?" if result.value is None else str(result.value)
+                temperature = "?" if result.temperature is None else str(result.temperature)
+                row = (len(result.region), value, temperature, result.outcome)
+            self.analysis_view.insert("", tk.END, values=row)
+        if self.analysis_job is None:
+            total = total_value(results)
+            total = "?" if total is None else str(total)
+            self.analysis_status_var.set(f"領域数: {len(results)}  合計: {total}")
+
+    def close(self):
+        self.analyzer.shutdown()
+        self.root.destroy()
 
     def save_to_csv(self):
         filename = filedialog.asksaveasfilename(
@@ -127,6 +220,7 @@ class GoBoardApp:
         self.board_data = [[0 for _ in range(self.size)] for _ in range(self.size)]
         self.stone_color_var.set(1)
         self.draw_board()
+        self.request_analysis()
 
 
 class SizeSelectionDialog:
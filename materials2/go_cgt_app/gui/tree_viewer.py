@@ -0,0 +1,149 @@
+import queue
+import tkinter as tk
+from tkinter import ttk
+from logic.lazy_tree import LazyTree
+
+PLACEHOLDER = "…"
+
+
+class TreeViewerApp:
+    """
+    ゲーム木を対話的に展開するビューア
+    ノードを開いたときにだけ子局面を生成し、値はバックグラウンドで計算する
+    """
+    def __init__(self, root, state):
+        self.root = root
+        self.tree = LazyTree(state)
+        self.nodes = {}  # Treeview の item id -> LazyNode
+        self.items = {}  # LazyNode -> Treeview の item id
+        self.padding = 20
+        self.cell_size = 24
+        self.stone_radius = 10
+
+        self.root.title("ゲーム木ビューア")
+
+        main_frame = tk.Frame(self.root)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.view = ttk.Treeview(main_frame, columns=("player", "value"), height=25)
+        self.view.heading("#0", text="着手")
+        self.view.heading("player", text="手番")
+        self.view.heading("value", text="値")
+        self.view.column("player", width=60, anchor=tk.CENTER)
+        self.view.column("value", width=120, anchor=tk.CENTER)
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.view.yview)
+        self.view.configure(yscrollcommand=scrollbar.set)
+        self.view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+        size = len(state.board)
+        canvas_total_size = self.cell_size * (size - 1) + 2 * self.padding
+        self.canvas = tk.Canvas(main_frame, width=canvas_total_size, height=canvas_total_size,
+                                bg="#D1B48C")
+        self.canvas.pack(side=tk.LEFT, padx=10, pady=10, anchor=tk.N)
+
+        self.status_var = tk.StringVar()
+        tk.Label(self.root, textvariable=self.status_var, anchor=tk.W).pack(fill=tk.X)
+
+        self.view.bind("<<TreeviewOpen>>", self.handle_open)
+        self.view.bind("<<TreeviewSelect>>", self.handle_select)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        root_item = self.insert_node("", self.tree.root)
+        self.view.selection_set(root_item)
+        self.update_status()
+        self.poll_results()
+
+    def insert_node(self, parent_item, node):
+        label = "root" if node.move is None else str(node.move)
+        item = self.view.insert(parent_item, tk.END, text=label,
+                                values=(self.player_name(node.state.turn), "計算中"))
+        self.nodes[item] = node
+        self.items[node] = item
+        # 展開ボタンを出すためのダミーの子
+        self.view.insert(item, tk.END, text=PLACEHOLDER)
+        self.tree.request_value(node)
+        return item
+
+    def player_name(self, turn):
+        return "黒" if turn == 1 else "白"
+
+    def handle_open(self, event):
+        item = self.view.focus()
+        node = self.nodes.get(item)
+        if node is None:
+            return
+        children = self.view.get_children(item)
+        if len(children) == 1 and self.view.item(children[0], "text") == PLACEHOLDER:
+            self.view.delete(children[0])
+            for child in self.tree.expand(node):
+                self.insert_node(item, child)
+        self.update_status()
+
+    def handle_select(self, event):
+        selection = self.view.selection()
+        if selection and selection[0] in self.nodes:
+            self.draw_board(self.nodes[selection[0]])
+
+    def poll_results(self):
+        """ワーカーが計算した値を Tk のイベントループ側で反映する"""
+        while True:
+            try:
+                node, value = self.tree.results.get_nowait()
+            except queue.Empty:
+                break
+            self.view.set(self.items[node], "value", "?" if value is None else str(value))
+        self.root.after(50, self.poll_results)
+
+    def update_status(self):
+        self.status_var.set(
+            f"表示ノード数: {len(self.nodes)}  展開済み局面数: {self.tree.expanded_count}"
+        )
+
+    def draw_board(self, node):
+        self.canvas.delete("all")
+        board = node.state.board
+        size = len(board)
+        start = self.padding
+        end = self.cell_size * (size - 1) + self.padding
+        for i in range(size):
+            pos = start + i * self.cell_size
+            self.canvas.create_line(start, pos, end, pos, fill="black")
+            self.canvas.create_line(pos, start, pos, end, fill="black")
+
+        for r in range(size):
+            for c in range(size):
+                point_data = board[r][c]
+                x = self.padding + c * self.cell_size
+                y = self.padding + r * self.cell_size
+                if point_data == 1 or point_data == -1:
+                    color = "black" if point_data == 1 else "white"
+                    self.canvas.create_oval(x - self.stone_radius, y - self.stone_radius,
+                                            x + self.stone_radius, y + self.stone_radius,
+                                            fill=color, outline="black")
+                elif point_data == 2 or point_data == -2:
+                    marker_size = 4
+                    color = "black" if point_data == 2 else "white"
+                    self.canvas.create_rectangle(x - marker_size, y - marker_size,
+                                                 x + marker_size, y + marker_size,
+                                                 fill=color, outline="black")
+
+        # 直前手ハイライト
+        if node.move is not None:
+            r, c = node.move
+            x = self.padding + c * self.cell_size
+            y = self.padding + r * self.cell_size
+            offset = self.stone_radius + 2
+            self.canvas.create_rectangle(x - offset, y - offset, x + offset, y + offset,
+                                         outline="red", width=2)
+
+    def close(self):
+        self.tree.shutdown()
+        self.root.destroy()
+
+
+def launch_tree_viewer(state):
+    """ビューアモード起動用のエントリーポイント"""
+    main_root = tk.Tk()
+    TreeViewerApp(main_root, state)
+    main_root.mainloop()
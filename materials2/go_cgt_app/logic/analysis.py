@@ -0,0 +1,288 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .game_state import GameState
+from .regions import split_regions, region_state, crop_region, settled_regions, split_area
+from .evaluator import game_value, temperature, outcome, sum_values, value_temperature, SearchCancelled
+from .game_store import GameStore
+from .patterns import default_patterns
+from .life import LifeAnalysis
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# これより空点の多い領域は探索しない (GUI の応答性を優先)
+MAX_REGION_POINTS = 8
+
+
+class RegionResult:
+    """領域ごとの解析結果"""
+    def __init__(self, region, value=None, temperature=None, outcome=None, skipped=False):
+        self.region = region
+        self.value = value
+        self.temperature = temperature
+        self.outcome = outcome
+        self.skipped = skipped  # 大きすぎて解析しなかった
+
+    def __repr__(self):
+        if self.skipped:
+            return f"Region({len(self.region)}点: 未解析)"
+        value = "?" if self.value is None else self.value
+        return (f"Region({len(self.region)}点: 値={value}, "
+                f"温度={self.temperature}, 結果={self.outcome})")
+
+
+def analyze_board(board, cancelled=None, life=None):
+    """
+    盤面を領域に分割し、各領域の値・温度・勝敗クラスを求める
+    確定地は中の死に石ごと1つの領域にする (life: 盤面の LifeAnalysis。無ければここで求める)
+    cancelled() が True を返したら (領域の探索の途中でも) 打ち切って None を返す
+    """
+    life = LifeAnalysis(board) if life is None else life
+    results = []
+    try:
+        for region in split_regions(board, life):
+            results.append(analyze_region(board, region, cancelled))
+    except SearchCancelled:
+        return None
+    return results
+
+
+def analyze_region(board, region, cancelled=None):
+    """
+    1つの領域の値・温度・勝敗クラス (大きすぎる領域は解析しない)
+    局所形のデータベースに載っている形は探索せずにその値を使う
+    cancelled() が True を返したら探索の途中で SearchCancelled を投げる
+    """
+    value = default_patterns().lookup(board, region)
+    if value is not None:
+        return RegionResult(region, value=value, temperature=value_temperature(value),
+                            outcome=value.outcome())
+    if len(region) > MAX_REGION_POINTS:
+        return RegionResult(region, skipped=True)
+    state = search_state(board, region)
+    return RegionResult(
+        region,
+        value=game_value(state, cancelled),
+        temperature=temperature(state, cancelled),
+        outcome=outcome(state, cancelled=cancelled),
+    )
+
+
+def search_state(board, region):
+    """
+    領域を探索する局面
+    切り出した小さい盤面で探索する (同じ形は盤上の位置によらず同じキャッシュを使う)
+    """
+    cropped = crop_region(board, region)
+    return region_state(board, region) if cropped is None else cropped.state()
+
+
+def board_value(board, store=None, max_points=MAX_REGION_POINTS, life=None):
+    """
+    盤面全体の値を、領域ごとの値の和として求める (盤面全体を1つのゲームとして探索しない)
+    返り値: (GameStore の ID, 探索しなかった領域のリスト)
+    max_points より空点の多い領域があれば探索せず、ID は None
+    CGTValue で表せない領域は標準形のまま GameStore で足す
+    確定地は中の死に石ごと1つの領域にする (life: 盤面の LifeAnalysis。無ければここで求める)
+    """
+    store = GameStore() if store is None else store
+    life = LifeAnalysis(board) if life is None else life
+    games, skipped = [], []
+    for region in split_regions(board, life):
+        value = default_patterns().lookup(board, region)
+        if value is None:
+            if len(region) > max_points:
+                skipped.append(region)
+                continue
+            state = search_state(board, region)
+            value = game_value(state)
+            if value is None:
+                games.append(store.from_state(state))
+                continue
+        games.append(store.from_value(value))
+    if skipped:
+        return None, skipped
+    total = store.zero
+    for game in games:
+        total = store.add(total, game)
+    return total, skipped
+
+
+def region_value(state, max_points=MAX_REGION_POINTS):
+    """
+    局面の値 (CGTValue) を領域ごとの値の和 (board_value) として求める
+    max_points より空点の多い領域があるか、和が CGTValue で表せなければ None
+    """
+    store = GameStore()
+    game, skipped = board_value(state.board, store, max_points)
+    return None if skipped else store.to_value(game)
+
+
+def region_sum_value(state):
+    """
+    局面の値を領域ごとの値の和 (board_value) として求め、表示用の文字列にする
+    MAX_REGION_POINTS より空点の多い領域があれば探索せず None
+    """
+    store = GameStore()
+    game, skipped = board_value(state.board, store)
+    return None if skipped else store.format(game)
+
+
+def total_value(results):
+    """領域の値の和 (盤面全体の値)。未解析や値の分からない領域があれば None"""
+    if any(result.skipped for result in results):
+        return None
+    return sum_values(result.value for result in results)
+
+
+def _neighbors(board, r, c):
+    rows, cols = len(board), len(board[0])
+    return [(r + dr, c + dc) for dr, dc in NEIGHBORS
+            if 0 <= r + dr < rows and 0 <= c + dc < cols]
+
+
+def touched_points(new_board, move, captured):
+    """
+    着手 (move に打って captured を取った) で値が変わりうる点
+    - 着手点と取られた石の点、およびそれらの隣の点
+    - 呼吸点の数が変わった連 (着手点か取られた石の点に隣接する連) に接する点
+    """
+    changed = {move, *captured}
+    touched = set()
+    for (pr, pc) in changed:
+        touched.add((pr, pc))
+        touched.update(_neighbors(new_board, pr, pc))
+    after = GameState(new_board)
+    for nr, nc in {move, *(n for p in changed for n in _neighbors(new_board, *p))}:
+        if new_board[nr][nc] in (1, -1):
+            group, _ = after._get_group_and_liberties(new_board, nr, nc)
+            for gr, gc in group:
+                touched.update(_neighbors(new_board, gr, gc))
+    return touched
+
+
+def stale_regions(regions, touched, before, afters, changed=()):
+    """
+    着手のあとに分け直す領域と、分け直す点の集合
+    regions: 着手前の領域、touched: 着手で値が変わりうる点、changed: 着手点と取られた石の点
+    before / afters: 着手前と (1つ以上の) 着手後の LifeAnalysis
+    - touched に触れる領域に加え、確定地かどうかが変わった点 (死に石の点を含む) と
+      それに触れる領域も分け直す
+    - 着手後の確定地が一部だけ分け直す点に入るなら、その確定地に触れる領域も加える
+      (分け直した結果が split_regions で盤面全体を分けたものと一致するように)
+    """
+    old = set(settled_regions(before))
+    changed = set(changed)
+    for after in afters:
+        changed.update(*(old ^ set(settled_regions(after))))
+    marks = set(touched) | changed
+    while True:
+        stale = [region for region in regions if region & marks]
+        points = changed.union(*stale)
+        extra = set()
+        for after in afters:
+            for settled in settled_regions(after):
+                if settled & points:
+                    extra |= settled - points
+        if not extra:
+            return stale, points
+        marks |= extra
+
+
+class BoardAnalysis:
+    """
+    盤面の領域分割・領域ごとの解析結果・値の合計を持ち続け、着手ごとに更新する
+
+    apply_move では着手で変わった領域だけを解析し直す
+    - 着手点と取られた石の点、およびそれらに隣接する領域は分割し直す
+    - 呼吸点の数が変わった連 (着手点・取られた石の点に隣接する連) に接する領域も
+      値が変わりうるので解析し直す
+    - 確定地 (life: LifeAnalysis。着手ごとに apply_move で更新する) かどうかが変わった領域も
+      分割し直す (盤面から解析し直したときと同じ領域になる)
+    合計は変わった領域の値を引いて新しい値を足すだけで求める
+    """
+    def __init__(self, board):
+        self.board = [list(row) for row in board]
+        self.life = LifeAnalysis(self.board)
+        self.results = analyze_board(self.board, life=self.life)
+        self._known = sum_values(r.value for r in self.results if r.value is not None)
+        self._unknown = sum(1 for r in self.results if r.value is None)
+
+    @property
+    def total(self):
+        """盤面全体の値 (値の分からない領域があれば None)"""
+        return None if self._unknown else self._known
+
+    def apply_move(self, move, color):
+        """color が move に打つ。合法でなければ ValueError"""
+        r, c = move
+        state = GameState(self.board, color)
+        if not state.can_play(r, c, color):
+            raise ValueError(f"illegal move: {move}")
+        new_board, captured = state._play(r, c, color)
+        if new_board is None:
+            raise ValueError(f"illegal move: {move}")
+
+        life = self.life.apply_move(move, color)
+        touched = touched_points(new_board, move, captured)
+        stale, points = stale_regions([result.region for result in self.results], touched,
+                                      self.life, [life], {move, *captured})
+        self.board = new_board
+        self.life = life
+        stale = set(stale)
+        kept = [result for result in self.results if result.region not in stale]
+        fresh = [analyze_region(new_board, region) for region in split_area(new_board, points, life)]
+        for result in self.results:
+            if result.region in stale:
+                self._remove(result)
+        for result in fresh:
+            self._add(result)
+        self.results = sorted(kept + fresh, key=lambda result: min(result.region))
+        return fresh
+
+    def _add(self, result):
+        if result.value is None:
+            self._unknown += 1
+        else:
+            self._known = self._known + result.value
+
+    def _remove(self, result):
+        if result.value is None:
+            self._unknown -= 1
+        else:
+            self._known = self._known - result.value
+
+
+class LiveAnalyzer:
+    """
+    編集のたびに盤面の解析をワーカースレッドへ依頼する
+    新しい依頼が来たら古い依頼は取り消し、その結果は捨てる
+    結果は (世代番号, [RegionResult, ...]) として results キューに積む
+    """
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._future = None
+        self.results = queue.Queue()
+
+    def submit(self, board):
+        board = tuple(map(tuple, board))
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._future is not None:
+                self._future.cancel()
+            self._future = self._executor.submit(self._run, generation, board)
+        return generation
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    def _run(self, generation, board):
+        results = analyze_board(board, cancelled=lambda: self._is_stale(generation))
+        if results is not None and not self._is_stale(generation):
+            self.results.put((generation, results))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,161 @@
+from .game_state import EMPTY, BLACK, WHITE, WALL
+
+# NumPyライブラリのインポート
+try:
+    import numpy as np
+except ImportError:
+    print("エラー: NumPyライブラリが見つかりません。")
+    print("コマンドプロンプトで pip install numpy を実行してください。")
+    exit()
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def build_tree_batched(state, depth=2, chunk_size=512):
+    """
+    build_tree と同じ木を幅優先で構築する
+    各深さの局面 (フロンティア) を (F, N, N) の int8 配列に積み、子局面をまとめて生成する
+    同じ盤面はフロンティアの中で1回だけ展開し、祖先と同じ盤面に戻る手は経路ごとに除く
+    hooks と pruning には対応しない
+    """
+    root = {}
+    area = _area_mask(state)
+    frontier = [(root, state.board, frozenset([state.board]))]
+    color = state.turn
+    for _ in range(depth):
+        if not frontier:
+            break
+        index = {}  # 盤面 -> フロンティア内の番号
+        for _, board, _ in frontier:
+            index.setdefault(board, len(index))
+        children_of = expand_frontier(list(index), color, area, chunk_size)
+        next_frontier = []
+        for tree, board, path in frontier:
+            for move, child in children_of[index[board]]:
+                if child in path:
+                    continue
+                subtree = tree[move] = {}
+                next_frontier.append((subtree, child, path | {child}))
+        frontier = next_frontier
+        color = -color
+    return root
+
+
+def expand_frontier(boards, color, area=None, chunk_size=512):
+    """
+    盤面 (tuple of tuples) のリストの全てで color が打つ子局面を生成する
+    返り値: 盤面ごとの [(着手, 子の盤面), ...] (着手は行・列の順)
+    chunk_size 局面ずつ配列にして処理する (メモリを抑えるため)
+    """
+    result = [[] for _ in boards]
+    seen = {}  # 子の盤面の重複を除いて tuple に変換するのは1回だけ
+    for start in range(0, len(boards), chunk_size):
+        array = np.array(boards[start:start + chunk_size], dtype=np.int8)
+        parents, moves, children = expand_boards(array, color, area)
+        if not len(children):
+            continue
+        first, inverse = unique_rows(children)
+        keys = [tuple(map(tuple, children[i].tolist())) for i in first]
+        keys = [seen.setdefault(key, key) for key in keys]
+        for parent, move, k in zip(parents.tolist(), moves.tolist(), inverse.tolist()):
+            result[start + parent].append((tuple(move), keys[k]))
+    return result
+
+
+def expand_boards(boards, color, area=None):
+    """
+    boards: (F, R, C) の int8 配列。全ての盤面で color が打つ合法手を一度に生成する
+    area: (R, C) の bool 配列 (None なら盤面全体)
+    返り値: (parents, moves, children)
+        parents (K,) 元の盤面の番号, moves (K, 2) 着手, children (K, R, C) 着手後の盤面
+        並びは盤面の番号 → 行 → 列 の順
+    """
+    _, rows, cols = boards.shape
+    playable = (boards == EMPTY) | (boards == 2 * color)
+    if area is not None:
+        playable &= area
+    parents, rs, cs = np.nonzero(playable)
+    count = len(parents)
+    if count == 0:
+        return parents, np.zeros((0, 2), dtype=np.intp), boards[:0]
+
+    placed = boards[parents]
+    rows_index = np.arange(count)
+    placed[rows_index, rs, cs] = color
+
+    # 連ごとの番号 (盤面ごとに重ならないようずらす) と呼吸点の有無
+    labels, has_liberty = label_groups(placed)
+    stride = rows * cols + 1
+    group = labels + (rows_index * stride)[:, None, None]
+    stones = labels < rows * cols
+    group_liberty = np.bincount(group[stones], weights=has_liberty[stones],
+                                minlength=count * stride) > 0
+
+    # 着手点に隣接する相手の連のうち、呼吸点がなくなったものを取る
+    adjacent = np.zeros(count * stride, dtype=bool)
+    for dr, dc in NEIGHBORS:
+        nr, nc = rs + dr, cs + dc
+        inside = (0 <= nr) & (nr < rows) & (0 <= nc) & (nc < cols)
+        m, nr, nc = rows_index[inside], nr[inside], nc[inside]
+        opponent = placed[m, nr, nc] == -color
+        adjacent[group[m[opponent], nr[opponent], nc[opponent]]] = True
+    captured = stones & (placed == -color) & adjacent[group] & ~group_liberty[group]
+    children = np.where(captured, np.int8(EMPTY), placed)
+
+    # 自殺手: 石を取らず、打った石の連に呼吸点がない
+    legal = captured.reshape(count, -1).any(axis=1) | group_liberty[group[rows_index, rs, cs]]
+    return parents[legal], np.stack([rs, cs], axis=1)[legal], children[legal]
+
+
+def label_groups(boards):
+    """
+    (M, R, C) の盤面の石を連ごとに番号付けする (番号は連の中で最小の交点の通し番号)
+    石の無い交点は R*C
+    返り値: (labels, has_liberty)  has_liberty は隣に石の無い交点 (0, 2, -2。壁は除く) がある石
+    """
+    _, rows, cols = boards.shape
+    none = rows * cols
+    stones = (boards == BLACK) | (boards == WHITE)
+    labels = np.where(stones, np.arange(none, dtype=np.int32).reshape(rows, cols), none)
+    same = [stones & (_shift(boards, dr, dc, EMPTY) == boards) for dr, dc in NEIGHBORS]
+    while True:
+        new = labels
+        for (dr, dc), mask in zip(NEIGHBORS, same):
+            new = np.where(mask, np.minimum(new, _shift(labels, dr, dc, none)), new)
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    has_liberty = np.zeros_like(stones)
+    open_points = ~stones & (boards != WALL)
+    for dr, dc in NEIGHBORS:
+        has_liberty |= _shift(open_points, dr, dc, False)
+    return labels, has_liberty & stones
+
+
+def unique_rows(children):
+    """
+    盤面を行ごとのバイト列として比べ、重複を除く
+    返り値: (first, inverse)  first: 各盤面の最初の位置, inverse: 各行が何番目の盤面か
+    """
+    flat = np.ascontiguousarray(children.reshape(len(children), -1))
+    keys = flat.view(np.dtype((np.void, flat.shape[1])))[:, 0]
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def _shift(a, dr, dc, fill):
+    """out[..., r, c] = a[..., r + dr, c + dc] (盤外は fill)"""
+    rows, cols = a.shape[-2:]
+    out = np.full_like(a, fill)
+    out[..., max(0, -dr):rows - max(0, dr), max(0, -dc):cols - max(0, dc)] = \
+        a[..., max(0, dr):rows - max(0, -dr), max(0, dc):cols - max(0, -dc)]
+    return out
+
+
+def _area_mask(state):
+    if state.area is None:
+        return None
+    mask = np.zeros((state.rows, state.cols), dtype=bool)
+    for r, c in state.area:
+        mask[r, c] = True
+    return mask
@@ -0,0 +1,187 @@
+import csv
+import itertools
+from .game_state import GameState, EMPTY, BLACK, WHITE
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# evaluate_shapes が探索する領域の空点の数の上限 (大量の形を流すので小さくする)
+# 同形反復のある探索は経路ごとに調べ直すので、4点以上の開いた領域は1つで数分かかることがある
+SHAPE_MAX_POINTS = 3
+
+
+class Board:
+    """
+    GUI を使わずに盤面を組み立てるためのビルダー
+    値は CSV の規則に従う (1=黒, -1=白, 2/-2=専用点, 0=空点)
+    place / remove / mark_exclusive は自身を書き換えて self を返すので連鎖できる
+    mirror / crop は新しい Board を返す
+    """
+    def __init__(self, rows, cols=None, data=None):
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        if data is None:
+            self.data = [[EMPTY] * self.cols for _ in range(self.rows)]
+        else:
+            self.data = [list(row) for row in data]
+
+    @classmethod
+    def from_rows(cls, data):
+        data = [list(row) for row in data]
+        return cls(len(data), len(data[0]) if data else 0, data)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            return cls.from_rows([[int(cell) for cell in row] for row in reader])
+
+    def _check(self, r, c):
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(f"({r}, {c}) is outside the {self.rows}x{self.cols} board")
+
+    def place(self, r, c, color):
+        self._check(r, c)
+        if color not in (BLACK, WHITE, 2, -2):
+            raise ValueError("color must be 1, -1, 2 or -2")
+        self.data[r][c] = color
+        return self
+
+    def remove(self, r, c):
+        self._check(r, c)
+        self.data[r][c] = EMPTY
+        return self
+
+    def mark_exclusive(self):
+        """片方の色の石だけに囲まれた空点の領域を専用点 (2, -2) にする"""
+        seen = set()
+        for sr in range(self.rows):
+            for sc in range(self.cols):
+                if (sr, sc) in seen or self.data[sr][sc] != EMPTY:
+                    continue
+                region, border = self._empty_region(sr, sc)
+                seen |= region
+                if len(border) == 1:
+                    marker = 2 * border.pop()
+                    for r, c in region:
+                        self.data[r][c] = marker
+        return self
+
+    def _empty_region(self, sr, sc):
+        """(sr, sc) を含む空点の連結成分と、それに接する石の色の集合"""
+        stack = [(sr, sc)]
+        region = set()
+        border = set()
+        while stack:
+            r, c = stack.pop()
+            if (r, c) in region:
+                continue
+            region.add((r, c))
+            for dr, dc in NEIGHBORS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    val = self.data[nr][nc]
+                    if val == EMPTY:
+                        stack.append((nr, nc))
+                    elif val in (BLACK, WHITE):
+                        border.add(val)
+        return region, border
+
+    def mirror(self, axis="horizontal"):
+        """horizontal: 左右反転, vertical: 上下反転"""
+        if axis == "horizontal":
+            return Board(self.rows, self.cols, [row[::-1] for row in self.data])
+        if axis == "vertical":
+            return Board(self.rows, self.cols, self.data[::-1])
+        raise ValueError("axis must be 'horizontal' or 'vertical'")
+
+    def crop(self, top, left, bottom, right):
+        """行 top..bottom, 列 left..right (両端を含む) を切り出す"""
+        self._check(top, left)
+        self._check(bottom, right)
+        return Board.from_rows([row[left:right + 1] for row in self.data[top:bottom + 1]])
+
+    def is_legal(self):
+        """呼吸点のない連が無ければ合法"""
+        state = GameState(self.data)
+        seen = set()
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if self.data[r][c] in (BLACK, WHITE) and (r, c) not in seen:
+                    group, liberties = state._get_group_and_liberties(state.board, r, c)
+                    if not liberties:
+                        return False
+                    seen |= group
+        return True
+
+    def symmetries(self):
+        """対称変換した盤面 (正方形なら8通り、長方形なら4通り)"""
+        return [Board.from_rows(data) for data in _symmetric_rows(self.to_tuple())]
+
+    def canonical(self):
+        """対称変換の中で辞書順最小のもの (tuple of tuples)"""
+        return min(_symmetric_rows(self.to_tuple()))
+
+    def to_tuple(self):
+        return tuple(map(tuple, self.data))
+
+    def to_rows(self):
+        return [row[:] for row in self.data]
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerows(self.data)
+
+    def state(self, turn=BLACK):
+        return GameState(self.data, turn)
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.data == other.data
+
+    def __repr__(self):
+        return "Board(" + "/".join(",".join(str(v) for v in row) for row in self.data) + ")"
+
+
+def _symmetric_rows(data):
+    rotated = tuple(zip(*data[::-1]))  # 90度回転
+    images = [
+        data,
+        tuple(row[::-1] for row in data),
+        data[::-1],
+        tuple(row[::-1] for row in data[::-1]),
+    ]
+    if len(data) == len(data[0]):
+        images += [
+            rotated,
+            tuple(row[::-1] for row in rotated),
+            rotated[::-1],
+            tuple(row[::-1] for row in rotated[::-1]),
+        ]
+    return images
+
+
+def enumerate_shapes(rows, cols=None, values=(EMPTY, BLACK, WHITE)):
+    """
+    rows x cols の合法な局所形を、対称なものを除いて全て列挙するジェネレータ
+    対称変換の中で辞書順最小の代表だけを返す
+    """
+    cols = rows if cols is None else cols
+    for cells in itertools.product(values, repeat=rows * cols):
+        data = tuple(cells[r * cols:(r + 1) * cols] for r in range(rows))
+        if min(_symmetric_rows(data)) != data:
+            continue
+        board = Board(rows, cols, data)
+        if board.is_legal():
+            yield board
+
+
+def evaluate_shapes(shapes, evaluator=None, turn=BLACK, max_points=SHAPE_MAX_POINTS):
+    """
+    盤面を1つずつ評価して (Board, 値) を返すジェネレータ
+    evaluator を渡さなければ領域ごとの値の和 (analysis.region_value)。盤面全体は探索せず、
+    局所形のデータベースに無い max_points より空点の多い領域があれば値は None
+    """
+    if evaluator is None:
+        from .analysis import region_value
+        evaluator = lambda state: region_value(state, max_points)
+    for board in shapes:
+        yield board, evaluator(board.state(turn))
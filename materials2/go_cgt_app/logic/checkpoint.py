@@ -0,0 +1,81 @@
+"""
+長い探索 (ゲーム木の構築・値の計算) の途中経過の保存と再開
+
+- スナップショット (path): 探索の先端 (スタック) と訪れた局面など、続けるのに要る状態だけを持つ。
+  一時ファイルに書いてから os.replace で置き換えるので、書き込み中に止められても前の保存が残る
+- 追記ログ (path + ".log"): 前の保存から増えた結果 (展開した局面の子・求めた値) だけを追記する。
+  スナップショットにはその時点のログの長さを入れておき、再開するときはそこまで切り詰める
+- どちらも pickle を zlib で圧縮したもの
+- 探索の条件 (盤面・手番・深さなど) の fingerprint を入れておき、違う探索の保存からは再開しない
+"""
+import os
+import pickle
+import time
+import zlib
+
+# 途中経過を保存する間隔 (秒)
+CHECKPOINT_INTERVAL = 60
+
+
+class Checkpoint:
+    """
+    path: スナップショットのファイル (ログは path + ".log")
+    fingerprint: 探索の条件 (pickle できて == で比べられる値)
+    """
+    def __init__(self, path, fingerprint, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.log_path = path + ".log"
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.last = time.monotonic()
+
+    def due(self):
+        """前に保存してから interval 秒たったか"""
+        return time.monotonic() - self.last >= self.interval
+
+    def save(self, state, records=()):
+        """records をログに追記してから、state をスナップショットにする"""
+        with open(self.log_path, "ab") as log:
+            if records:
+                pickle.dump(zlib.compress(pickle.dumps(list(records), pickle.HIGHEST_PROTOCOL)), log)
+            log.flush()
+            os.fsync(log.fileno())
+            log_size = log.tell()
+        data = {"fingerprint": self.fingerprint, "state": state, "log_size": log_size}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.last = time.monotonic()
+
+    def load(self):
+        """
+        (state, ログに追記した records を順に並べたリスト)。保存が無ければ None
+        違う探索の保存や、スナップショットの時点より短いログなら ValueError
+        (ログが無くても、スナップショットの時点で空だったなら records は空)
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            data = pickle.loads(zlib.decompress(f.read()))
+        if data["fingerprint"] != self.fingerprint:
+            raise ValueError(f"{self.path} was saved for a different board or depth")
+        records = []
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if log_size < data["log_size"]:
+            raise ValueError(f"{self.log_path} is missing or shorter than when {self.path} was saved")
+        if not os.path.exists(self.log_path):
+            return data["state"], records
+        with open(self.log_path, "r+b") as log:
+            log.truncate(data["log_size"])
+            while log.tell() < data["log_size"]:
+                records.extend(pickle.loads(zlib.decompress(pickle.load(log))))
+        return data["state"], records
+
+    def remove(self):
+        """保存を消す (最初から探索するとき・探索が終わったとき)"""
+        for path in (self.path, self.log_path, self.path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,110 @@
+from .evaluator import CGTValue, combine, sum_values
+from .game_store import GameStore
+from .regions import split_regions, region_state
+from .life import LifeAnalysis
+
+
+class Chiller:
+    """
+    冷却 (chilling) と加熱 (warming) の演算子 (Berlekamp の囲碁の終盤の理論)
+
+    - 冷却: 整数ならそのまま、それ以外は {G^L を冷却 - 1 | G^R を冷却 + 1}
+    - 加熱: 整数ならそのまま、それ以外は {G^L を加熱 + 1 | G^R を加熱 - 1}
+      (冷却の式を逆にたどるだけ。Berlekamp の加熱 ∫ のように整数の偶奇で * を付けることはしない)
+
+    冷却は整数 + 無限小 (* や ↑ など) と整数でない数を整数にしてしまうので、それらを部分局面に持つ
+    ゲームは冷却してから加熱しても元に戻らない (例: chill(*) = 0, warm(0) = 0, chill(1/2) = 0)。
+    部分局面が整数と温度の高いゲームだけ ({3 | -1}, {{4 | 2} | -2} など) なら元に戻る
+
+    ゲームは GameStore の ID で扱い、結果は ID ごとと局面ごとにキャッシュする
+    冷却した値が数や無限小 (CGTValue) になる場合は、フォームを作らずに値だけで計算する
+    """
+    def __init__(self, store=None):
+        self.store = GameStore() if store is None else store
+        self._chilled = {}
+        self._warmed = {}
+        self._states = {}  # (盤面, 着手範囲) -> 冷却した ID
+        one = self.store.from_value(CGTValue(1))
+        self._one, self._minus_one = one, self.store.neg(one)
+
+    def chill(self, g):
+        """g を冷却した ID"""
+        result = self._chilled.get(g)
+        if result is not None:
+            return result
+        store = self.store
+        value = store.to_value(g)
+        if value is not None and value.base.exponent == 0:
+            # 整数 + 無限小 (選択肢も全て同じ整数 + 無限小) は、冷却するとその整数
+            result = store.from_value(CGTValue(value.base))
+        else:
+            node = store.nodes[g]
+            lefts = [self.chill(l) for l in node.lefts]
+            rights = [self.chill(r) for r in node.rights]
+            result = self._shifted(lefts, rights, -1)
+        self._chilled[g] = result
+        return result
+
+    def warm(self, g):
+        """g を加熱した ID"""
+        result = self._warmed.get(g)
+        if result is not None:
+            return result
+        store = self.store
+        value = store.to_value(g)
+        if value is not None and value.is_number and value.base.exponent == 0:
+            result = g
+        else:
+            node = store.nodes[g]
+            lefts = [self.warm(l) for l in node.lefts]
+            rights = [self.warm(r) for r in node.rights]
+            result = self._shifted(lefts, rights, 1)
+        self._warmed[g] = result
+        return result
+
+    def _shifted(self, lefts, rights, shift):
+        """{lefts + shift | rights - shift} の ID"""
+        store = self.store
+        left_values = [store.to_value(l) for l in lefts]
+        right_values = [store.to_value(r) for r in rights]
+        if all(v is not None for v in left_values + right_values):
+            # 選択肢が全て CGTValue なら、値の足し算と combine だけで求まることが多い
+            delta = CGTValue(shift)
+            value = combine([v + delta for v in left_values], [v - delta for v in right_values])
+            if value is not None:
+                return store.from_value(value)
+        plus, minus = (self._one, self._minus_one) if shift > 0 else (self._minus_one, self._one)
+        return store.game([store.add(l, plus) for l in lefts],
+                          [store.add(r, minus) for r in rights])
+
+    def chill_state(self, state):
+        """局面を冷却した ID (局面ごとにキャッシュ)"""
+        key = (state.board, state.area)
+        result = self._states.get(key)
+        if result is None:
+            result = self._states[key] = self.chill(self.store.from_state(state))
+        return result
+
+    def chilled_value(self, state):
+        """局面を冷却した値 (CGTValue で表せなければ None)"""
+        return self.store.to_value(self.chill_state(state))
+
+
+def chilled_regions(board, chiller=None, max_points=None):
+    """
+    盤面を領域に分け、各領域を冷却した値のリスト [(領域, CGTValue or None), ...]
+    max_points より空点の多い領域は解析せず None にする。確定地は中の死に石ごと1つの領域にする
+    """
+    chiller = Chiller() if chiller is None else chiller
+    result = []
+    for region in split_regions(board, LifeAnalysis(board)):
+        if max_points is not None and len(region) > max_points:
+            result.append((region, None))
+            continue
+        result.append((region, chiller.chilled_value(region_state(board, region))))
+    return result
+
+
+def chilled_total(board, chiller=None, max_points=None):
+    """冷却した値の領域ごとの和 (分からない領域があれば None)"""
+    return sum_values(value for _, value in chilled_regions(board, chiller, max_points))
@@ -0,0 +1,102 @@
+from collections import OrderedDict
+
+# 比較結果のキャッシュの既定の上限 (件数)
+DEFAULT_MAX_ENTRIES = 200000
+
+
+class GameComparator:
+    """
+    GameStore のゲーム (ID) の比較 (<=, >=, ||) と勝敗クラスをメモ化して求める
+
+    - 結果は上限 max_entries 件のキャッシュに入れ、あふれたら古く使われていないものから捨てる
+    - 両方が CGTValue (数 + ↑ の倍数 + nimber) で表せるなら、差の符号だけで O(1) で決める
+    - 0 との比較は勝敗クラス (キャッシュする) で決める: G >= 0 ⇔ L か P
+    - それ以外は G <= H ⇔ H - G >= 0 を選択肢で展開した形
+      (H - G の右の選択肢 H^R - G, H - G^L のどれも <= 0 でない) で再帰的に調べる
+    """
+    def __init__(self, store, max_entries=DEFAULT_MAX_ENTRIES):
+        self.store = store
+        self.max_entries = max_entries
+        self._le = OrderedDict()        # (g, h) -> g <= h
+        self._outcomes = OrderedDict()  # g -> "L" / "R" / "P" / "N"
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, cache, key):
+        result = cache.get(key)
+        if result is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def _put(self, cache, key, result):
+        self.misses += 1
+        cache[key] = result
+        if len(cache) > self.max_entries:
+            cache.popitem(last=False)
+
+    def le(self, g, h):
+        """g <= h"""
+        if g == h:
+            return True
+        store = self.store
+        if h == store.zero:
+            return self.outcome(g) in ("R", "P")
+        if g == store.zero:
+            return self.outcome(h) in ("L", "P")
+        result = self._get(self._le, (g, h))
+        if result is not None:
+            return result
+        a, b = store.to_value(g), store.to_value(h)
+        if a is not None and b is not None:
+            result = a <= b
+        else:
+            result = (not any(self.le(h, gl) for gl in store.nodes[g].lefts)
+                      and not any(self.le(hr, g) for hr in store.nodes[h].rights))
+        self._put(self._le, (g, h), result)
+        return result
+
+    def ge(self, g, h):
+        """g >= h"""
+        return self.le(h, g)
+
+    def fuzzy(self, g, h):
+        """g || h (どちらとも比べられない)"""
+        return not self.le(g, h) and not self.le(h, g)
+
+    def compare(self, g, h):
+        """"<", ">", "=", "||" のどれか"""
+        le, ge = self.le(g, h), self.le(h, g)
+        if le and ge:
+            return "="
+        if le:
+            return "<"
+        if ge:
+            return ">"
+        return "||"
+
+    def outcome(self, g):
+        """
+        勝敗クラス (L: 黒の勝ち, R: 白の勝ち, N: 先手の勝ち, P: 後手の勝ち)
+        黒が先に打って勝つ ⇔ G^L >= 0 となる G^L がある
+        """
+        result = self._get(self._outcomes, g)
+        if result is not None:
+            return result
+        store = self.store
+        value = store.to_value(g)
+        if value is not None:
+            result = value.outcome()
+        else:
+            zero = store.zero
+            node = store.nodes[g]
+            left_first = any(self.le(zero, gl) for gl in node.lefts)
+            right_first = any(self.le(gr, zero) for gr in node.rights)
+            result = {(True, True): "N", (True, False): "L",
+                      (False, True): "R", (False, False): "P"}[(left_first, right_first)]
+        self._put(self._outcomes, g, result)
+        return result
+
+    def compare_states(self, a, b):
+        """2つの局面 (GameState) の値を比べる"""
+        return self.compare(self.store.from_state(a), self.store.from_state(b))
@@ -0,0 +1,281 @@
+import math
+import numbers
+import sys
+from fractions import Fraction
+
+# 数値のハッシュを Fraction / int と揃えるための定数 (Fraction.__hash__ と同じ計算)
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INV2 = pow(2, _HASH_MODULUS - 2, _HASH_MODULUS)
+
+
+class Dyadic:
+    """
+    2進有理数 numerator / 2**exponent
+    有限のゲームに現れる数は全てこの形なので、gcd を使う Fraction の代わりに値の計算で使う
+
+    - 常に正規化する (exponent >= 0 で、exponent > 0 なら numerator は奇数)
+    - int, Fraction と足し算・比較ができ、等しい値ならハッシュも同じ
+      (辞書のキーとして混ぜて使える)
+    - Fraction(d) や d.to_fraction() で Fraction に変換できる
+    """
+    __slots__ = ("numerator", "exponent")
+
+    def __init__(self, numerator=0, exponent=0):
+        if exponent < 0:
+            numerator <<= -exponent
+            exponent = 0
+        elif numerator == 0:
+            exponent = 0
+        else:
+            shift = min((numerator & -numerator).bit_length() - 1, exponent)
+            numerator >>= shift
+            exponent -= shift
+        self.numerator = numerator
+        self.exponent = exponent
+
+    @classmethod
+    def coerce(cls, value):
+        """int, Fraction (分母が2の冪), Dyadic を Dyadic にする"""
+        if isinstance(value, Dyadic):
+            return value
+        if isinstance(value, int):
+            return cls(value)
+        if isinstance(value, Fraction):
+            result = _operand(value)
+            if not isinstance(result, Dyadic):
+                raise ValueError(f"{value} is not a dyadic rational")
+            return result
+        raise TypeError(f"cannot convert {type(value).__name__} to Dyadic")
+
+    @property
+    def denominator(self):
+        return 1 << self.exponent
+
+    def to_fraction(self):
+        return Fraction(self.numerator, self.denominator)
+
+    def half(self):
+        """self / 2"""
+        return Dyadic(self.numerator, self.exponent + 1)
+
+    # --- 算術 ---
+
+    def __add__(self, other):
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if not isinstance(other, Dyadic):
+            return self.to_fraction() + other
+        if self.exponent >= other.exponent:
+            shift = self.exponent - other.exponent
+            return Dyadic(self.numerator + (other.numerator << shift), self.exponent)
+        shift = other.exponent - self.exponent
+        return Dyadic((self.numerator << shift) + other.numerator, other.exponent)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if not isinstance(other, Dyadic):
+            return self.to_fraction() - other
+        return self + (-other)
+
+    def __rsub__(self, other):
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if not isinstance(other, Dyadic):
+            return other - self.to_fraction()
+        return other + (-self)
+
+    def __mul__(self, other):
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if not isinstance(other, Dyadic):
+            return self.to_fraction() * other
+        return Dyadic(self.numerator * other.numerator, self.exponent + other.exponent)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """商が2進有理数なら Dyadic、そうでなければ Fraction を返す (2の冪で割るときは gcd を使わない)"""
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if isinstance(other, Dyadic):
+            n = abs(other.numerator)
+            if n and not n & (n - 1):
+                result = Dyadic(self.numerator << other.exponent, self.exponent + n.bit_length() - 1)
+                return -result if other.numerator < 0 else result
+            other = other.to_fraction()
+        return _operand(self.to_fraction() / other)
+
+    def __rtruediv__(self, other):
+        other = _operand(other)
+        if other is None:
+            return NotImplemented
+        if isinstance(other, Dyadic):
+            return other / self
+        return _operand(other / self.to_fraction())
+
+    def __neg__(self):
+        result = Dyadic.__new__(Dyadic)
+        result.numerator = -self.numerator
+        result.exponent = self.exponent
+        return result
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self.numerator >= 0 else -self
+
+    def __floor__(self):
+        return self.numerator >> self.exponent
+
+    def __ceil__(self):
+        return -((-self.numerator) >> self.exponent)
+
+    def __bool__(self):
+        return self.numerator != 0
+
+    def __float__(self):
+        return math.ldexp(self.numerator, -self.exponent) if self.exponent < 1000 \
+            else float(self.to_fraction())
+
+    # --- 比較 ---
+
+    def _cmp(self, other):
+        """self - other の符号 (比べられない型なら None)"""
+        other = _operand(other)
+        if other is None:
+            return None
+        if not isinstance(other, Dyadic):
+            a = self.numerator * other.denominator
+            b = other.numerator << self.exponent
+            return (a > b) - (a < b)
+        if self.exponent == other.exponent:
+            a, b = self.numerator, other.numerator
+        elif self.exponent > other.exponent:
+            a, b = self.numerator, other.numerator << (self.exponent - other.exponent)
+        else:
+            a, b = self.numerator << (other.exponent - self.exponent), other.numerator
+        return (a > b) - (a < b)
+
+    def __eq__(self, other):
+        if isinstance(other, Dyadic):
+            return self.numerator == other.numerator and self.exponent == other.exponent
+        c = self._cmp(other)
+        return NotImplemented if c is None else c == 0
+
+    def __lt__(self, other):
+        c = self._cmp(other)
+        return NotImplemented if c is None else c < 0
+
+    def __le__(self, other):
+        c = self._cmp(other)
+        return NotImplemented if c is None else c <= 0
+
+    def __gt__(self, other):
+        c = self._cmp(other)
+        return NotImplemented if c is None else c > 0
+
+    def __ge__(self, other):
+        c = self._cmp(other)
+        return NotImplemented if c is None else c >= 0
+
+    def __hash__(self):
+        if self.exponent == 0:
+            return hash(self.numerator)
+        h = abs(self.numerator) % _HASH_MODULUS * pow(_HASH_INV2, self.exponent, _HASH_MODULUS)
+        h %= _HASH_MODULUS
+        if self.numerator < 0:
+            h = -h
+        return -2 if h == -1 else h
+
+    def __str__(self):
+        if self.exponent == 0:
+            return str(self.numerator)
+        return f"{self.numerator}/{self.denominator}"
+
+    def __repr__(self):
+        return f"Dyadic({self.numerator}, {self.exponent})"
+
+
+# Fraction(d) や isinstance(d, numbers.Rational) が使えるように登録する
+numbers.Rational.register(Dyadic)
+
+
+def _operand(value):
+    """
+    演算の相手を Dyadic にする
+    分母が2の冪でない Fraction はそのまま返し (Fraction で計算する)、それ以外の型は None
+    """
+    if isinstance(value, Dyadic):
+        return value
+    if isinstance(value, int):
+        return Dyadic(value)
+    if isinstance(value, Fraction):
+        denominator = value.denominator
+        if denominator & (denominator - 1):
+            return value
+        return Dyadic(value.numerator, denominator.bit_length() - 1)
+    return None
+
+
+def simplest_between(low, high):
+    """
+    low < x < high を満たす最も単純な数 (simplicity rule) を Dyadic で返す
+    None は制限なし (それぞれ -∞, +∞) を表す。low >= high なら間に数が無いので ValueError
+    """
+    low = None if low is None else Dyadic.coerce(low)
+    high = None if high is None else Dyadic.coerce(high)
+    if low is not None and high is not None and low >= high:
+        raise ValueError(f"no number strictly between {low} and {high}")
+    if (low is None or low.numerator < 0) and (high is None or high.numerator > 0):
+        return Dyadic(0)
+    if high is not None and high.numerator <= 0:
+        return -simplest_between(-high, None if low is None else -low)
+    # ここでは 0 <= low
+    n = Dyadic(math.floor(low) + 1)
+    if high is None or n < high:
+        return n
+    exponent = 1
+    while True:
+        if exponent >= low.exponent:
+            m = (low.numerator << (exponent - low.exponent)) + 1
+        else:
+            m = (low.numerator >> (low.exponent - exponent)) + 1
+        candidate = Dyadic(m, exponent)
+        if candidate < high:
+            return candidate
+        exponent += 1
+
+
+def birthday(x):
+    """数 x が生まれる日 (整数 n は |n| 日目、m/2^k は floor(|x|) + 1 + k 日目)"""
+    x = Dyadic.coerce(x)
+    if x.exponent == 0:
+        return abs(x.numerator)
+    return (abs(x.numerator) >> x.exponent) + 1 + x.exponent
+
+
+def simplest_in(low, high, low_closed=False, high_closed=False):
+    """
+    low と high の間の最も単純な数 (端を含むかは low_closed, high_closed で指定)
+    None は制限なし。間に数が無ければ None
+    """
+    if low is not None and high is not None:
+        if low > high or (low == high and not (low_closed and high_closed)):
+            return None
+        if low == high:
+            return Dyadic.coerce(low)
+    candidates = [simplest_between(low, high)]
+    if low_closed and low is not None:
+        candidates.append(Dyadic.coerce(low))
+    if high_closed and high is not None:
+        candidates.append(Dyadic.coerce(high))
+    return min(candidates, key=birthday)
@@ -0,0 +1,196 @@
+from .game_state import BLACK, WHITE
+from .dyadic import Dyadic
+from .game_store import GameStore
+from .regions import split_regions, region_state
+from .thermograph import ThermographCache
+from .life import LifeAnalysis
+
+STRATEGIES = ("hotstrat", "thermostrat")
+
+
+class Component:
+    """和の1つの成分 (領域・その局面・標準形の ID・この領域で現れた盤面)"""
+    __slots__ = ("region", "state", "game", "history")
+
+    def __init__(self, region, state, game):
+        self.region = region
+        self.state = state
+        self.game = game
+        self.history = {state.board}
+
+
+class SumPlayer:
+    """
+    盤面を領域の和として、温度を見て終盤を打ち進める
+
+    - hotstrat: 着手できる成分のうち最も温度の高い成分に打つ
+    - thermostrat: 成分のサーモグラフを合成し、自分の側の合成した壁が最も有利になる温度 T で
+      幅 (左の壁 - 右の壁) が最大の成分に打つ (Berlekamp)
+    - 成分の中では、その温度で相手の側の壁が自分に最も有利になる手を選ぶ
+    - サーモグラフは GameStore の ID ごとにキャッシュし、1手打つと打った成分だけを
+      選んだ選択肢の ID に置き換える (他の成分は計算し直さない)
+    - 成分ごとにそれまでに現れた盤面を覚えておき、同じ盤面に戻る手は打たない
+      (evaluator の探索経路と同じ規則。打ち進めが同形反復で終わらなくなることはない)
+    - max_points より空点の多い領域は和に入れない (打たない)
+    - 確定地は中の死に石ごと1つの成分にする (life: 盤面の LifeAnalysis。無ければここで求める)
+    """
+    def __init__(self, board, strategy="hotstrat", store=None, max_points=None, life=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy: {strategy}")
+        self.strategy = strategy
+        self.store = GameStore() if store is None else store
+        self.thermograph = ThermographCache(self.store)
+        self.board = tuple(tuple(row) for row in board)
+        self.components = []
+        life = LifeAnalysis(board) if life is None else life
+        for region in split_regions(board, life):
+            if max_points is not None and len(region) > max_points:
+                continue
+            state = region_state(board, region)
+            self.components.append(Component(region, state, self.store.from_state(state)))
+        self._children = {}  # (盤面, 着手範囲, 色) -> [(着手, 子の局面, 子の ID), ...] (反復を除く前)
+
+    def games(self):
+        return [component.game for component in self.components]
+
+    def _moves(self, component, color):
+        """成分で color が打てる手 [(着手, 子の局面, 子の ID), ...] (この領域で現れた盤面に戻る手を除く)"""
+        state = component.state
+        key = (state.board, state.area, color)
+        moves = self._children.get(key)
+        if moves is None:
+            moves = [(child.last_move, child, self.store.from_state(child))
+                     for child in state.options(color)]
+            self._children[key] = moves
+        history = component.history
+        return [move for move in moves if move[1].board not in history]
+
+    def choose(self, color):
+        """(成分の番号, 着手, 子の局面, 子の ID)。どこにも打てなければ None"""
+        playable = [(i, self._moves(component, color)) for i, component in enumerate(self.components)]
+        playable = [(i, moves) for i, moves in playable if moves]
+        if not playable:
+            return None
+        thermograph = self.thermograph
+        if self.strategy == "hotstrat":
+            index, moves = max(playable,
+                               key=lambda item: thermograph(self.components[item[0]].game).temperature)
+            t = thermograph(self.components[index].game).temperature
+        else:
+            t = self._ambient_temperature(color)
+            # 幅が同じなら (どれも幅0なら) 温度の高い成分
+            index, moves = max(playable, key=lambda item: (
+                thermograph(self.components[item[0]].game).width(t),
+                thermograph(self.components[item[0]].game).temperature))
+        if color == BLACK:
+            best = max(moves, key=lambda move: thermograph(move[2]).right(t))
+        else:
+            best = min(moves, key=lambda move: thermograph(move[2]).left(t))
+        return (index,) + best
+
+    def _ambient_temperature(self, color):
+        """
+        thermostrat の温度 T
+        黒は (右の壁の和 + 最大の幅) が最大、白は (左の壁の和 - 最大の幅) が最小になる温度
+        """
+        graphs = [self.thermograph(component.game) for component in self.components]
+        ts = sorted({t for graph in graphs for wall in (graph.left, graph.right)
+                     for t in wall.breakpoints() if t >= 0} | {Dyadic(0)})
+
+        def compound(t):
+            width = max(graph.width(t) for graph in graphs)
+            if color == BLACK:
+                return sum(graph.right(t) for graph in graphs) + width
+            return -(sum(graph.left(t) for graph in graphs) - width)
+
+        return max(ts, key=compound)
+
+    def play(self, color):
+        """color の手を選んで打ち、その着手を返す (打てなければ None)"""
+        choice = self.choose(color)
+        if choice is None:
+            return None
+        index, move, child, game = choice
+        component = self.components[index]
+        # 着手と取った石 (領域の外の石も含む) だけを盤面に反映する
+        board = [list(row) for row in self.board]
+        for r, (before, after) in enumerate(zip(component.state.board, child.board)):
+            for c, (a, b) in enumerate(zip(before, after)):
+                if a != b:
+                    board[r][c] = b
+        component.state, component.game = child, game
+        component.history.add(child.board)
+        self.board = tuple(tuple(row) for row in board)
+        return move
+
+    def play_out(self, color=BLACK, max_moves=1000):
+        """
+        打てなくなるまで交互に打つ。返り値: ([(色, 着手), ...], 勝った色)
+        最後に打った側の勝ち (max_moves 手で打ち切ったら勝者は None)
+        """
+        moves = []
+        winner = None
+        for _ in range(max_moves):
+            move = self.play(color)
+            if move is None:
+                winner = -color
+                break
+            moves.append((color, move))
+            color = -color
+        return moves, winner
+
+
+def accuracy_report(boards, strategy="hotstrat", max_points=8):
+    """
+    小さい盤面で、戦略の手を和の完全探索と比べる
+
+    各盤面・各手番について、完全探索で手番側が勝てる局面のうち
+    戦略の選んだ手のあとも勝ちが保たれる割合と、
+    両者が戦略どおりに打ち切ったときの勝者が完全探索の結果と一致する割合を返す
+    max_points より空点の多い領域がある盤面は和が盤面全体にならないので数えず、skipped に数だけ入れる
+    """
+    store = GameStore()
+    comparator = store.comparator
+    winning = kept = agreed = total = skipped = 0
+    for board in boards:
+        life = LifeAnalysis(board)
+        if max_points is not None and any(len(region) > max_points
+                                          for region in split_regions(board, life)):
+            skipped += 1
+            continue
+        for color in (BLACK, WHITE):
+            player = SumPlayer(board, strategy, store, max_points, life)
+            game = _total(store, player.games())
+            outcome = comparator.outcome(game)
+            first = "L" if color == BLACK else "R"
+            exact_winner = color if outcome in ("N", first) else -color
+            total += 1
+            choice = player.choose(color)
+            if exact_winner == color and choice is not None:
+                winning += 1
+                index = choice[0]
+                games = player.games()
+                games[index] = choice[3]
+                after = comparator.outcome(_total(store, games))
+                # 相手の手番で、自分の勝ちのままか
+                if after in (first, "P"):
+                    kept += 1
+            _, winner = player.play_out(color)
+            if winner == exact_winner:
+                agreed += 1
+    return {
+        "positions": total,
+        "skipped": skipped,
+        "winning": winning,
+        "kept": kept,
+        "agreed": agreed,
+        "move_accuracy": kept / winning if winning else None,
+        "playout_accuracy": agreed / total if total else None,
+    }
+
+
+def _total(store, games):
+    result = store.zero
+    for game in games:
+        result = store.add(result, game)
+    return result
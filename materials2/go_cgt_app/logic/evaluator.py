@@ -1,28 +1,470 @@
+from collections import OrderedDict
 from fractions import Fraction
+from .game_state import BLACK, WHITE
+from .dyadic import Dyadic, simplest_between, simplest_in
 
 class CGTValue:
-    def __init__(self, base=0, star=False, up=False, down=False):
-        if isinstance(base, int):
-            self.base = Fraction(base, 1)
-        elif isinstance(base, Fraction):
-            self.base = base
+    """
+    数 + ↑ の倍数 + nimber の形の値 (base + ups·↑ + *nim)
+    例: 0* = CGTValue(0, nim=1), ⇑* = CGTValue(0, ups=2, nim=1)
+    足し算 (nimber は XOR)・符号反転・比較はどれも O(1)
+    star / up / down は *, ↑, ↓ を1つ足す指定 (古い呼び方)
+    """
+    def __init__(self, base=0, star=False, up=False, down=False, ups=0, nim=0):
+        if isinstance(base, (int, Fraction, Dyadic)):
+            try:
+                self.base = Dyadic.coerce(base)
+            except ValueError:
+                raise ValueError("base must be a dyadic rational") from None
         else:
-            raise ValueError("base must be int or Fraction")
-        self.star = star
-        self.up = up
-        self.down = down
+            raise ValueError("base must be int, Fraction or Dyadic")
+        self.ups = ups + up - down
+        self.nim = nim ^ star
+
+    @property
+    def is_number(self):
+        return self.ups == 0 and self.nim == 0
+
+    def _key(self):
+        return self.base, self.ups, self.nim
+
+    def __eq__(self, other):
+        return isinstance(other, CGTValue) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __add__(self, other):
+        return CGTValue(self.base + other.base, ups=self.ups + other.ups, nim=self.nim ^ other.nim)
+
+    def __neg__(self):
+        return CGTValue(-self.base, ups=-self.ups, nim=self.nim)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def sign(self):
+        """
+        0 との大小: 1 (> 0), -1 (< 0), 0 (= 0), None (0 と比べられない)
+        ↑ の倍数は nimber より大きい。ただし ↑* と ↓* は 0 と比べられない
+        """
+        if self.base:
+            return 1 if self.base > 0 else -1
+        if self.ups > 0:
+            return None if (self.ups, self.nim) == (1, 1) else 1
+        if self.ups < 0:
+            return None if (self.ups, self.nim) == (-1, 1) else -1
+        return 0 if self.nim == 0 else None
+
+    def compare(self, other):
+        """self - other の sign()"""
+        return (self - other).sign()
+
+    def outcome(self):
+        """勝敗クラス (L: 正, R: 負, P: 0, N: 0 と比べられない)"""
+        return {1: "L", -1: "R", 0: "P", None: "N"}[self.sign()]
+
+    def __le__(self, other):
+        return self.compare(other) in (-1, 0)
+
+    def __ge__(self, other):
+        return self.compare(other) in (1, 0)
+
+    def __lt__(self, other):
+        return self.compare(other) == -1
+
+    def __gt__(self, other):
+        return self.compare(other) == 1
+
+    def left_options(self):
+        """標準形での黒 (Left) の選択肢"""
+        return self._options(left=True)
+
+    def right_options(self):
+        """標準形での白 (Right) の選択肢"""
+        return self._options(left=False)
+
+    def _options(self, left):
+        x = self.base
+        if self.is_number:
+            if x.exponent > 0:  # m/2^k = {(m-1)/2^k | (m+1)/2^k}
+                step = -1 if left else 1
+                return [CGTValue(Dyadic(x.numerator + step, x.exponent))]
+            if left:
+                return [CGTValue(x - 1)] if x > 0 else []
+            return [CGTValue(x + 1)] if x < 0 else []
+        if self.ups < 0:
+            # 負の値は符号を反転した値の選択肢を入れ替えたもの
+            return [-v for v in (-self)._options(not left)]
+        # 数の平行移動: x + G = {x + G^L | x + G^R}
+        shift = CGTValue(x)
+        if self.ups == 0:  # *n = {0, *, ..., *(n-1) | 同じ}
+            return [shift + CGTValue(0, nim=k) for k in range(self.nim)]
+        if (self.ups, self.nim) == (1, 1):  # ↑* = {0, * | 0}
+            return [shift, shift + CGTValue(0, nim=1)] if left else [shift]
+        # u↑*n = {0 | (u-1)↑*(n^1)}
+        if left:
+            return [shift]
+        return [shift + CGTValue(0, ups=self.ups - 1, nim=self.nim ^ 1)]
 
     def __repr__(self):
         s = str(self.base)
-        if self.star: s += "*"
-        if self.up: s += "↑"
-        if self.down: s += "↓"
+        if self.nim == 1: s += "*"
+        elif self.nim > 1: s += f"*{self.nim}"
+        arrows = {1: "↑", -1: "↓", 2: "⇑", -2: "⇓"}
+        if self.ups in arrows: s += arrows[self.ups]
+        elif self.ups > 0: s += f"↑{self.ups}"
+        elif self.ups < 0: s += f"↓{-self.ups}"
         return s
 
-def evaluate(state):
+
+def sum_values(values):
+    """
+    値の和 (領域ごとの値を足し合わせる)。どれかが None なら None
+    数・↑ の倍数・nimber をそれぞれ足すだけなので、探索はしない
+    """
+    base, ups, nim = Dyadic(0), 0, 0
+    for v in values:
+        if v is None:
+            return None
+        base += v.base
+        ups += v.ups
+        nim ^= v.nim
+    return CGTValue(base, ups=ups, nim=nim)
+
+
+def simplest_number_between(low, high):
+    """
+    low < x < high を満たす最も単純な数 (simplicity rule)
+    None は制限なし (それぞれ -∞, +∞) を表す。low >= high なら ValueError
+    """
+    return simplest_between(low, high)
+
+
+# --- 値計算ロジック ---
+
+# 値のキャッシュの上限 (件数)。GUI で長く編集を続けても増え続けないようにする
+MAX_CACHE_ENTRIES = 200000
+
+
+class BoundedCache:
+    """
+    上限付きの辞書。あふれたら古く使われていないものから捨てる
+    (GameComparator のキャッシュと同じ方式。値が None でもよい)
+    """
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+# 盤面 (と着手可能な範囲) -> CGTValue or None
+memoization_cache = BoundedCache()
+
+
+class SearchCancelled(Exception):
+    """探索の途中で cancelled() が True を返した (探索し終えた局面の値だけがキャッシュに残る)"""
+
+
+def _check(cancelled):
+    if cancelled is not None and cancelled():
+        raise SearchCancelled()
+
+
+def option_values(state, path=None, cancelled=None):
+    """黒 (Left) と白 (Right) の選択肢の値のリスト"""
+    lefts, rights, _ = _option_values(state, set() if path is None else path, cancelled)
+    return lefts, rights
+
+
+def _option_values(state, path, cancelled=None):
+    """
+    選択肢の値と、祖先と同じ盤面に戻る手を除いたかどうか
+    除いた場合はその値が探索の経路に依存するので、キャッシュしない
+    再帰せず、探索中の局面を明示的なスタックに積む (深い局面でも再帰の上限に当たらない)
+    スタックの要素: [局面, [(色, 子の局面), ...], 次に見る子の番号, {色: 子の値のリスト}, 除いたか]
+    cancelled() が True を返したら SearchCancelled を投げる (局面を1つ進めるごとに調べる)
+    """
+    path.add(state.board)
+    stack = [[state, _colored_options(state), 0, {BLACK: [], WHITE: []}, False]]
+    while True:
+        _check(cancelled)
+        frame = stack[-1]
+        current, options, index, values, truncated = frame
+        if index < len(options):
+            frame[2] += 1
+            color, child = options[index]
+            if child.board in path:
+                frame[4] = True
+                continue
+            key = (child.board, child.area)
+            if key in memoization_cache:
+                values[color].append(memoization_cache[key])
+                continue
+            path.add(child.board)
+            stack.append([child, _colored_options(child), 0, {BLACK: [], WHITE: []}, False])
+            continue
+        stack.pop()
+        path.discard(current.board)
+        if not stack:
+            return values[BLACK], values[WHITE], truncated
+        value = combine(values[BLACK], values[WHITE])
+        if not truncated:
+            memoization_cache[(current.board, current.area)] = value
+        parent = stack[-1]
+        parent[3][parent[1][parent[2] - 1][0]].append(value)
+        parent[4] = parent[4] or truncated
+
+
+def _colored_options(state):
+    """[(色, 子の局面), ...] (黒の選択肢、白の選択肢の順)"""
+    return [(color, child) for color in (BLACK, WHITE) for child in state.options(color)]
+
+
+def _value(state, path, cancelled=None):
+    key = (state.board, state.area)
+    if key in memoization_cache:
+        return memoization_cache[key], False
+    lefts, rights, truncated = _option_values(state, path, cancelled)
+    result = combine(lefts, rights)
+    if not truncated:
+        memoization_cache[key] = result
+    return result, truncated
+
+
+def combine(lefts, rights):
+    """
+    選択肢の値から { lefts | rights } の値を求める
+    選択肢が全て CGTValue (数 + ↑ の倍数 + nimber) なら、劣った選択肢と逆行する選択肢を
+    除いて標準形にし、数か CGTValue の標準形と一致すればその値を返す
+    それ以外 (温度の高いゲームなど) は None
+    """
+    if any(v is None for v in lefts) or any(v is None for v in rights):
+        return None
+    if all(v.is_number for v in lefts) and all(v.is_number for v in rights):
+        # 選択肢が全て数なら比較だけで決まる (よくある場合なので先に処理する)
+        left = max((v.base for v in lefts), default=None)
+        right = min((v.base for v in rights), default=None)
+        if left is None or right is None or left < right:
+            return CGTValue(simplest_between(left, right))
+        if left == right:
+            return CGTValue(left, nim=1)  # {n|n} = n*
+        return None  # {a|b} (a > b) は温度の高いゲーム
+    lefts, rights = _canonical_options(lefts, rights)
+    number = _simplest_number(lefts, rights)
+    if number is not None:
+        return CGTValue(number)
+    return _match_canonical(lefts, rights)
+
+
+def _canonical_options(lefts, rights):
+    while True:
+        lefts = _undominated(lefts, lambda a, b: a <= b)
+        rights = _undominated(rights, lambda a, b: a >= b)
+        # G^L の右の選択肢 G^LR が G^LR <= G なら、G^L を G^LR の左の選択肢で置き換える
+        for i, v in enumerate(lefts):
+            reversing = next((r for r in v.right_options() if _ge_form(lefts, rights, r)), None)
+            if reversing is not None:
+                lefts = lefts[:i] + lefts[i + 1:] + reversing.left_options()
+                break
+        else:
+            for i, v in enumerate(rights):
+                reversing = next((l for l in v.left_options() if _le_form(lefts, rights, l)), None)
+                if reversing is not None:
+                    rights = rights[:i] + rights[i + 1:] + reversing.right_options()
+                    break
+            else:
+                return lefts, rights
+
+
+def _undominated(values, dominated_by):
+    """他の選択肢以下 (dominated_by) のものと重複を除く"""
+    kept = []
+    for v in values:
+        if v in kept or any(dominated_by(v, w) for w in kept):
+            continue
+        kept = [w for w in kept if not dominated_by(w, v)]
+        kept.append(v)
+    return kept
+
+
+def _le_form(lefts, rights, value):
+    """{ lefts | rights } <= value (value の選択肢をたどって判定する)"""
+    if any(v >= value for v in lefts):
+        return False
+    return not any(_ge_form(lefts, rights, r) for r in value.right_options())
+
+
+def _ge_form(lefts, rights, value):
+    """{ lefts | rights } >= value"""
+    if any(v <= value for v in rights):
+        return False
+    return not any(_le_form(lefts, rights, l) for l in value.left_options())
+
+
+def _simplest_number(lefts, rights):
+    """
+    全ての G^L ◁ x ◁ G^R を満たす最も単純な数 x (無ければ None)
+    G^L = a + (無限小) のとき、無限小の部分が 0 以上でなければ x = a でもよい
+    """
+    low = high = None
+    low_closed = high_closed = False
+    for v in lefts:
+        closed = not v.is_number and (v - CGTValue(v.base)).sign() in (-1, None)
+        if low is None or v.base > low or (v.base == low and not closed):
+            low, low_closed = v.base, closed
+    for v in rights:
+        closed = not v.is_number and (v - CGTValue(v.base)).sign() in (1, None)
+        if high is None or v.base < high or (v.base == high and not closed):
+            high, high_closed = v.base, closed
+    return simplest_in(low, high, low_closed, high_closed)
+
+
+def _match_canonical(lefts, rights):
+    """標準形の選択肢が x + (↑ の倍数 + nimber) の標準形と一致すれば、その値"""
+    bases = {v.base for v in lefts + rights}
+    if len(bases) != 1:
+        return None
+    shift = CGTValue(bases.pop())
+    left_set = {v - shift for v in lefts}
+    right_set = {v - shift for v in rights}
+    zero, star = CGTValue(0), CGTValue(0, nim=1)
+
+    nimbers = {CGTValue(0, nim=k) for k in range(len(left_set))}
+    if left_set == right_set == nimbers:
+        return shift + CGTValue(0, nim=len(left_set))   # *n
+    if left_set == {zero, star} and right_set == {zero}:
+        return shift + CGTValue(0, ups=1, nim=1)         # ↑*
+    if left_set == {zero} and right_set == {zero, star}:
+        return shift + CGTValue(0, ups=-1, nim=1)        # ↓*
+    if left_set == {zero} and len(right_set) == 1:
+        value = _up_multiple_from_option(next(iter(right_set)))
+        if value is not None:
+            return shift + value                         # u↑*n = {0 | (u-1)↑*(n^1)}
+    if right_set == {zero} and len(left_set) == 1:
+        value = _up_multiple_from_option(-next(iter(left_set)))
+        if value is not None:
+            return shift - value
+    return None
+
+
+def _up_multiple_from_option(option):
+    """{0 | option} = u↑*n となる u↑*n (option = (u-1)↑*(n^1), u >= 1)"""
+    if option.base or option.ups < 0 or option.is_number:
+        return None
+    return CGTValue(0, ups=option.ups + 1, nim=option.nim ^ 1)
+
+
+def game_value(state, cancelled=None):
+    """局面の値 (表せない場合は None)。cancelled() が True を返したら SearchCancelled"""
+    return _value(state, set(), cancelled)[0]
+
+
+def temperature(state, cancelled=None):
+    """
+    局面の温度
+    - 整数は -1, m/2^k は -1/2^k
+    - *, ↑, ↓ を含む値は 0
+    - 選択肢が全て数の {a|b} (a > b) は (a - b) / 2
+    それ以外は None
+    """
+    value = game_value(state, cancelled)
+    if value is not None:
+        return value_temperature(value)
+    lefts, rights = option_values(state, cancelled=cancelled)
+    if not lefts or not rights:
+        return None
+    if any(v is None or not v.is_number for v in lefts + rights):
+        return None
+    left = max(v.base for v in lefts)
+    right = min(v.base for v in rights)
+    return (left - right).half()
+
+
+def value_temperature(value):
+    """CGTValue の温度 (整数は -1, m/2^k は -1/2^k, 数でなければ 0)"""
+    if not value.is_number:
+        return Dyadic(0)
+    return Dyadic(-1, value.base.exponent)
+
+
+def outcome(state, pruning=None, cancelled=None):
+    """
+    局面の勝敗クラス (正規形: 最後に着手した方が勝ち)
+    L: 黒の勝ち, R: 白の勝ち, N: 先手の勝ち, P: 後手の勝ち
+    pruning (MovePruning) を渡すと、その枝刈りをした探索で求める
+    cancelled() が True を返したら SearchCancelled
+    """
+    memo = {}
+    left_first, _ = _wins_moving_first(state, BLACK, memo, set(), pruning, cancelled)
+    right_first, _ = _wins_moving_first(state, WHITE, memo, set(), pruning, cancelled)
+    return {(True, True): "N", (True, False): "L",
+            (False, True): "R", (False, False): "P"}[(left_first, right_first)]
+
+
+def _wins_moving_first(state, color, memo, path, pruning=None, cancelled=None):
     """
-    ダミー評価関数
-    空点数 = 値
+    color が先に打って勝てるかと、その結果が探索の経路に依存するか
+    (祖先と同じ盤面に戻る手を除いた結果はキャッシュしない)
+    再帰せず、明示的なスタックで探索する
+    スタックの要素: [局面, 手番, 子の局面のリスト, 次に見る子の番号, 勝てるか, 除いたか]
     """
-    empty = sum(row.count(0) for row in state.board)
-    return CGTValue(base=empty)
+    key = (state.board, color)
+    if key in memo:
+        return memo[key], False
+
+    def frame(state, color):
+        path.add(state.board)
+        options = state.options(color) if pruning is None else pruning.options(state, color)
+        return [state, color, options, 0, False, False]
+
+    stack = [frame(state, color)]
+    while True:
+        _check(cancelled)
+        top = stack[-1]
+        current, turn, options, index, result, truncated = top
+        if not result and index < len(options):
+            top[3] += 1
+            child = options[index]
+            if child.board in path:
+                top[5] = True
+                continue
+            child_key = (child.board, -turn)
+            if child_key in memo:
+                top[4] = not memo[child_key]
+                continue
+            stack.append(frame(child, -turn))
+            continue
+        stack.pop()
+        path.discard(current.board)
+        if not truncated:
+            memo[(current.board, turn)] = result
+        if not stack:
+            return result, truncated
+        parent = stack[-1]
+        parent[4] = not result
+        parent[5] = parent[5] or truncated
+
+
+def evaluate(state):
+    """局面のゲームの値 (CGTValue で表せない場合は None)"""
+    return game_value(state)
@@ -1,21 +1,142 @@
-import copy
+EMPTY = 0
+BLACK = 1
+WHITE = -1
+# 切り出した盤面 (regions.crop_region) の壁。盤外と同じく、石を置けず呼吸点にもならない
+WALL = 3
+
 
 class GameState:
-    def __init__(self, board, turn=1):
-        self.board = copy.deepcopy(board)  # 2D list
-        self.turn = turn  # 1=black, 2=white
+    """
+    一つの囲碁の局面 (CSVの規則に従う)
+    board: tuple of tuples (1=黒, -1=白, 2=黒専用点, -2=白専用点, 0=空点, 3=壁)
+    turn: 1 = 黒, -1 = 白
+    area: 着手を許す交点の集合 (None なら盤面全体)
+    candidates: area の中で石の無い交点の集合
+        子局面では着手点を除き、取った石の点を加えるだけで更新する
+        (着手生成は盤面全体ではなくこの集合だけを見る)
+        渡されなければ、子局面を生成するときに初めて盤面を走査して求める
+        (key() や値のキャッシュを引くだけの局面では求めない)
+    """
+    def __init__(self, board, turn=BLACK, last_move=None, area=None, candidates=None):
+        self.board = tuple(map(tuple, board))
+        self.turn = turn
+        self.rows = len(self.board)
+        self.cols = len(self.board[0]) if self.board else 0
+        self.size = self.rows
+        self.last_move = last_move
+        self.area = area
+        self._candidates = candidates
+
+    @property
+    def candidates(self):
+        if self._candidates is None:
+            points = self.area if self.area is not None else (
+                (r, c) for r in range(self.rows) for c in range(self.cols))
+            self._candidates = frozenset(p for p in points
+                                         if self.board[p[0]][p[1]] not in (BLACK, WHITE, WALL))
+        return self._candidates
+
+    def key(self):
+        """局面を辞書のキーとして使うためのハッシュ可能な値"""
+        return self.board, self.turn
+
+    def _get_group_and_liberties(self, board_list, sr, sc):
+        """
+        (sr, sc) の石を含む連と、その呼吸点を返す
+        専用点 (2, -2) も空点なので呼吸点に数える
+        """
+        rows, cols = self.rows, self.cols
+        color = board_list[sr][sc]
+        stack = [(sr, sc)]
+        group = set()
+        liberties = set()
+        while stack:
+            r, c = stack.pop()
+            if (r, c) in group:
+                continue
+            group.add((r, c))
+            for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    val = board_list[nr][nc]
+                    if val == color:
+                        if (nr, nc) not in group:
+                            stack.append((nr, nc))
+                    elif val != -color and val != WALL:
+                        liberties.add((nr, nc))
+        return group, liberties
+
+    def can_play(self, r, c, color):
+        """空点か、その色の専用点なら着手できる"""
+        point = self.board[r][c]
+        return point == EMPTY or point == 2 * color
+
+    def candidate_points(self):
+        """着手を検討する交点 (area の中の石の無い点を行・列の順に)"""
+        return sorted(self.candidates)
+
+    def _child_candidates(self, move, captured):
+        """着手と石の取り上げを反映した candidates"""
+        candidates = self.candidates - {move}
+        if captured:
+            if self.area is not None:
+                captured = [p for p in captured if p in self.area]
+            candidates |= frozenset(captured)
+        return candidates
+
+    def _play(self, r, c, color):
+        """
+        着手後の盤面 (list of lists) と取った石の点のリストを返す
+        自殺手なら (None, None)
+        """
+        rows, cols = self.rows, self.cols
+        new_board = [list(row) for row in self.board]
+        new_board[r][c] = color
+
+        opponent = -color
+        captured = []
+        for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and new_board[nr][nc] == opponent:
+                group, libs = self._get_group_and_liberties(new_board, nr, nc)
+                if not libs:
+                    captured.extend(group)
+                    for (gr, gc) in group:
+                        new_board[gr][gc] = EMPTY
+
+        if not captured:
+            _, libs_self = self._get_group_and_liberties(new_board, r, c)
+            if not libs_self:
+                return None, None
+        return new_board, captured
+
+    def options(self, color):
+        """
+        color が着手した後の子局面のリスト (組み合わせゲームの選択肢)
+        手番に関係なく、黒 (Left) と白 (Right) の両方について求められる
+        """
+        children = []
+        for r, c in self.candidate_points():
+            if not self.can_play(r, c, color):
+                continue
+            new_board, captured = self._play(r, c, color)
+            if new_board is None:
+                continue
+            children.append(GameState(new_board, -color, last_move=(r, c), area=self.area,
+                                      candidates=self._child_candidates((r, c), captured)))
+        return children
+
+    def children(self):
+        """手番側の (着手, 子局面) のリスト"""
+        return [(child.last_move, child) for child in self.options(self.turn)]
 
     def get_legal_moves(self):
-        size = len(self.board)
-        moves = []
-        for i in range(size):
-            for j in range(size):
-                if self.board[i][j] == 0:
-                    moves.append((i, j))
-        return moves
+        return [move for move, _ in self.children()]
 
     def play_move(self, move):
         i, j = move
-        new_state = GameState(self.board, 3 - self.turn)
-        new_state.board[i][j] = self.turn
-        return new_state
+        new_board, captured = self._play(i, j, self.turn)
+        if new_board is None:
+            raise ValueError(f"illegal move: {move}")
+        return GameState(new_board, -self.turn, last_move=move, area=self.area,
+                         candidates=self._child_candidates(move, captured))
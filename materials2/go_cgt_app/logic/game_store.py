@@ -0,0 +1,186 @@
+from .game_state import BLACK, WHITE
+from .evaluator import combine
+from .comparison import GameComparator, DEFAULT_MAX_ENTRIES
+
+
+class GameNode:
+    """ストアの中の標準形のゲーム。lefts / rights は選択肢の ID の昇順のタプル"""
+    __slots__ = ("lefts", "rights")
+
+    def __init__(self, lefts, rights):
+        self.lefts = lefts
+        self.rights = rights
+
+
+class GameStore:
+    """
+    標準形のゲーム {L|R} を ID で管理する表 (hash-consing)
+
+    - 同じ標準形には必ず同じ ID を割り当てるので、ゲームが等しいかは ID を比べるだけで分かる
+    - ノードは ID の順にリストに並べ、選択肢は ID のタプルで持つ
+      ({0|}, {|0}, {0|0} のような部分ゲームは何度現れても1つだけ)
+    - ID 0 は 0 = { | }
+    - 比較は GameComparator (max_comparisons 件までキャッシュ) に任せる
+    """
+    def __init__(self, max_comparisons=DEFAULT_MAX_ENTRIES):
+        self.nodes = []        # ID -> GameNode
+        self._ids = {}         # (lefts, rights) -> ID
+        self.comparator = GameComparator(self, max_comparisons)
+        self._neg = {}
+        self._sums = {}
+        self._from_values = {}  # CGTValue -> ID
+        self._to_values = {}    # ID -> CGTValue or None
+        self._states = {}       # (盤面, 着手範囲) -> ID
+        self.zero = self._intern((), ())
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _intern(self, lefts, rights):
+        key = (tuple(sorted(set(lefts))), tuple(sorted(set(rights))))
+        game = self._ids.get(key)
+        if game is None:
+            game = self._ids[key] = len(self.nodes)
+            self.nodes.append(GameNode(*key))
+        return game
+
+    def game(self, lefts, rights):
+        """選択肢の ID から {lefts | rights} を作り、標準形の ID を返す"""
+        lefts, rights = list(set(lefts)), list(set(rights))
+        while True:
+            lefts = [l for l in lefts if not any(m != l and self.le(l, m) for m in lefts)]
+            rights = [r for r in rights if not any(m != r and self.le(m, r) for m in rights)]
+            # G^L の右の選択肢 G^LR が G^LR <= G なら、G^L を G^LR の左の選択肢で置き換える
+            for l in lefts:
+                reversing = next((lr for lr in self.nodes[l].rights
+                                  if self._form_ge(lefts, rights, lr)), None)
+                if reversing is not None:
+                    lefts.remove(l)
+                    lefts = list(set(lefts) | set(self.nodes[reversing].lefts))
+                    break
+            else:
+                for r in rights:
+                    reversing = next((rl for rl in self.nodes[r].lefts
+                                      if self._form_le(lefts, rights, rl)), None)
+                    if reversing is not None:
+                        rights.remove(r)
+                        rights = list(set(rights) | set(self.nodes[reversing].rights))
+                        break
+                else:
+                    return self._intern(lefts, rights)
+
+    def le(self, g, h):
+        """g <= h"""
+        return self.comparator.le(g, h)
+
+    def _form_le(self, lefts, rights, h):
+        """{lefts | rights} <= h (まだ登録していない形との比較)"""
+        return (not any(self.le(h, l) for l in lefts)
+                and not any(self._form_ge(lefts, rights, hr) for hr in self.nodes[h].rights))
+
+    def _form_ge(self, lefts, rights, h):
+        """{lefts | rights} >= h"""
+        return (not any(self.le(r, h) for r in rights)
+                and not any(self._form_le(lefts, rights, hl) for hl in self.nodes[h].lefts))
+
+    def neg(self, g):
+        result = self._neg.get(g)
+        if result is None:
+            node = self.nodes[g]
+            result = self._intern([self.neg(r) for r in node.rights],
+                                  [self.neg(l) for l in node.lefts])
+            self._neg[g] = result
+        return result
+
+    def add(self, g, h):
+        """g + h の標準形"""
+        if g == self.zero:
+            return h
+        if h == self.zero:
+            return g
+        key = (g, h) if g <= h else (h, g)
+        result = self._sums.get(key)
+        if result is None:
+            a, b = self.nodes[g], self.nodes[h]
+            result = self.game([self.add(l, h) for l in a.lefts] + [self.add(g, l) for l in b.lefts],
+                               [self.add(r, h) for r in a.rights] + [self.add(g, r) for r in b.rights])
+            self._sums[key] = result
+        return result
+
+    def from_value(self, value):
+        """CGTValue の標準形の ID"""
+        result = self._from_values.get(value)
+        if result is None:
+            result = self._intern([self.from_value(v) for v in value.left_options()],
+                                  [self.from_value(v) for v in value.right_options()])
+            self._from_values[value] = result
+            self._to_values[result] = value
+        return result
+
+    def to_value(self, g):
+        """ID を CGTValue にする (数 + ↑ の倍数 + nimber で表せなければ None)"""
+        if g not in self._to_values:
+            node = self.nodes[g]
+            lefts = [self.to_value(l) for l in node.lefts]
+            rights = [self.to_value(r) for r in node.rights]
+            self._to_values[g] = combine(lefts, rights)
+        return self._to_values[g]
+
+    def from_state(self, state):
+        """
+        局面の標準形の ID
+        祖先と同じ盤面に戻る手は除く (evaluator と同じく、その結果はキャッシュしない)
+        """
+        return self._from_state(state, set())[0]
+
+    def _from_state(self, state, path):
+        """
+        再帰せず、明示的なスタックで子局面をたどる (evaluator._option_values と同じ形)
+        スタックの要素: [局面, [(0 黒 / 1 白, 子の局面), ...], 次に見る子の番号, (黒の ID, 白の ID), 除いたか]
+        """
+        key = (state.board, state.area)
+        if key in self._states:
+            return self._states[key], False
+
+        def frame(state):
+            path.add(state.board)
+            options = [(side, child) for side, color in enumerate((BLACK, WHITE))
+                       for child in state.options(color)]
+            return [state, options, 0, ([], []), False]
+
+        stack = [frame(state)]
+        while True:
+            top = stack[-1]
+            current, options, index, games, truncated = top
+            if index < len(options):
+                top[2] += 1
+                side, child = options[index]
+                if child.board in path:
+                    top[4] = True
+                    continue
+                game = self._states.get((child.board, child.area))
+                if game is not None:
+                    games[side].append(game)
+                    continue
+                stack.append(frame(child))
+                continue
+            stack.pop()
+            path.discard(current.board)
+            result = self.game(*games)
+            if not truncated:
+                self._states[(current.board, current.area)] = result
+            if not stack:
+                return result, truncated
+            parent = stack[-1]
+            parent[3][parent[1][parent[2] - 1][0]].append(result)
+            parent[4] = parent[4] or truncated
+
+    def format(self, g):
+        """{lefts | rights} の文字列 (CGTValue で表せる部分はその値で書く)"""
+        value = self.to_value(g)
+        if value is not None:
+            return str(value)
+        node = self.nodes[g]
+        lefts = ", ".join(self.format(l) for l in node.lefts)
+        rights = ", ".join(self.format(r) for r in node.rights)
+        return "{" + lefts + " | " + rights + "}"
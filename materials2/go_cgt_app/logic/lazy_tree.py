@@ -0,0 +1,108 @@
+import queue
+import threading
+from .analysis import region_sum_value
+
+
+class LazyNode:
+    """
+    遅延展開されるゲーム木のノード
+    子ノードは expand() が初めて呼ばれたときにだけ生成する
+    """
+    def __init__(self, state, move=None, depth=0):
+        self.state = state
+        self.move = move      # このノードに至った着手 (root は None)
+        self.depth = depth
+        self.children = None  # 未展開なら None
+
+    @property
+    def expanded(self):
+        return self.children is not None
+
+
+class LazyTree:
+    """
+    root の GameState から、開いたノードだけを展開するゲーム木
+
+    - 展開済みの部分木は局面キーごとにキャッシュし、合流した局面でも再生成しない
+    - 各ノードの値はバックグラウンドのワーカーで計算し、結果をキューに積む
+      既定では領域ごとの値の和 (analysis.region_sum_value)。大きすぎる領域があれば値は None
+    - ワーカーはデーモンスレッドなので、計算中でもビューアを閉じればすぐ終了できる
+      (shutdown でまだ始まっていない計算は取り消す)
+    """
+    def __init__(self, root_state, evaluator=region_sum_value, max_workers=1):
+        self.evaluator = evaluator
+        self.root = LazyNode(root_state)
+        self._children_cache = {}  # 局面キー -> [(move, GameState), ...]
+        self._values = {}          # 局面キー -> 値
+        self._pending = {}         # 局面キー -> 結果を待っているノード
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()  # (局面キー, GameState)。None でワーカーを止める
+        self._closed = False
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+        self.results = queue.Queue()  # (LazyNode, 値) を GUI 側で受け取る
+
+    def expand(self, node):
+        """ノードの子を生成して返す (2回目以降はキャッシュ)"""
+        if node.children is not None:
+            return node.children
+        key = node.state.key()
+        if key not in self._children_cache:
+            self._children_cache[key] = node.state.children()
+        node.children = [
+            LazyNode(child, move, node.depth + 1)
+            for move, child in self._children_cache[key]
+        ]
+        return node.children
+
+    def value_of(self, node):
+        """計算済みの値を返す (未計算なら None)"""
+        return self._values.get(node.state.key())
+
+    def request_value(self, node):
+        """ノードの値の計算をワーカーに依頼する (計算済みなら即座にキューへ)"""
+        key = node.state.key()
+        with self._lock:
+            if key in self._values:
+                self.results.put((node, self._values[key]))
+                return
+            if key in self._pending:
+                self._pending[key].append(node)
+                return
+            self._pending[key] = [node]
+        self._jobs.put((key, node.state))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None or self._closed:
+                return
+            key, state = job
+            try:
+                value = self.evaluator(state)
+            except Exception as e:
+                value = f"エラー: {e}"
+            self._on_done(key, value)
+
+    def _on_done(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            waiting = self._pending.pop(key, [])
+        for node in waiting:
+            self.results.put((node, value))
+
+    @property
+    def expanded_count(self):
+        return len(self._children_cache)
+
+    def shutdown(self):
+        """まだ始まっていない計算を取り消し、ワーカーを止める (計算中のものは待たない)"""
+        self._closed = True
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self._workers:
+            self._jobs.put(None)
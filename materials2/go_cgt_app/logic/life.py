@@ -0,0 +1,234 @@
+from .game_state import GameState, BLACK, WHITE, WALL
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class _Groups:
+    """
+    1色分の Benson の解析に使う構造 (連と、その色以外の点の連結成分 = 領域)
+    chains / regions: 番号 -> 点の frozenset、chain_of / region_of: 点 -> 番号
+    borders[i]: 領域 i に接する連の番号、vital[i]: 領域 i が「生きた眼」になれる連の番号
+    """
+    __slots__ = ("chains", "chain_of", "regions", "region_of", "borders", "vital", "next_id")
+
+    def copy(self):
+        groups = _Groups()
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(groups, name, value.copy() if isinstance(value, dict) else value)
+        return groups
+
+
+class LifeAnalysis:
+    """
+    無条件に活きている石 (Benson のアルゴリズム) と確定地の解析
+
+    - alive[color]: 相手が何手続けて打っても取られない color の石
+    - territory[color]: 活きた石だけに囲まれ、空点が全てその石の呼吸点になっている領域の点
+      (相手はそこに活きた石を作れない。中の相手の石は死んでいる)
+    - 専用点 (2, -2) も空点として扱う (どちらの呼吸点にもなる)。壁 (3) は盤外と同じ
+
+    apply_move で1手打った後の局面の解析を作る
+    連と領域は着手点・取られた石に接するものだけを作り直し、活きの判定 (連と領域の関係の上の反復) をやり直す
+    相手の活き石は前の結果から始める (無条件の活きは相手の着手では崩れない)
+    """
+    def __init__(self, board, previous=None):
+        self.board = tuple(map(tuple, board))
+        self.rows = len(self.board)
+        self.cols = len(self.board[0]) if self.board else 0
+        self._groups = {color: self._build(color) for color in (BLACK, WHITE)}
+        self._solve(previous or {})
+
+    def apply_move(self, move, color):
+        """color が move に打った後の局面の LifeAnalysis (合法でなければ ValueError)"""
+        r, c = move
+        state = GameState(self.board, color)
+        if not state.can_play(r, c, color):
+            raise ValueError(f"illegal move: {move}")
+        new_board, captured = state._play(r, c, color)
+        if new_board is None:
+            raise ValueError(f"illegal move: {move}")
+        result = LifeAnalysis.__new__(LifeAnalysis)
+        result.board = tuple(map(tuple, new_board))
+        result.rows, result.cols = self.rows, self.cols
+        result._groups = {
+            color: result._update_mover(self._groups[color].copy(), move),
+            -color: result._update_opponent(self._groups[-color].copy(), move, captured),
+        }
+        result._solve({-color: self.alive[-color]})
+        return result
+
+    def settled(self, point):
+        """point が確定地ならその色、そうでなければ None"""
+        for color in (BLACK, WHITE):
+            if point in self.territory[color]:
+                return color
+        return None
+
+    def is_alive(self, point):
+        r, c = point
+        color = self.board[r][c]
+        return color in (BLACK, WHITE) and point in self.alive[color]
+
+    def settled_board(self):
+        """確定地の空点を、その色の専用点 (2, -2) にした盤面 (エクスポート用)"""
+        board = [list(row) for row in self.board]
+        for color in (BLACK, WHITE):
+            for r, c in self.territory[color]:
+                if board[r][c] not in (BLACK, WHITE):
+                    board[r][c] = 2 * color
+        return board
+
+    def _neighbors(self, r, c):
+        return [(r + dr, c + dc) for dr, dc in NEIGHBORS
+                if 0 <= r + dr < self.rows and 0 <= c + dc < self.cols]
+
+    def _component(self, start, inside):
+        """start を含み、inside(点) が True の点の連結成分"""
+        stack = [start]
+        component = set()
+        while stack:
+            p = stack.pop()
+            if p in component:
+                continue
+            component.add(p)
+            stack.extend(n for n in self._neighbors(*p) if inside(n) and n not in component)
+        return frozenset(component)
+
+    def _add(self, groups, points, chain):
+        """連 (chain=True) か領域を加えてその番号を返す"""
+        i = groups.next_id
+        groups.next_id += 1
+        if chain:
+            groups.chains[i] = points
+            groups.chain_of.update(dict.fromkeys(points, i))
+        else:
+            groups.regions[i] = points
+            groups.region_of.update(dict.fromkeys(points, i))
+        return i
+
+    def _remove_region(self, groups, i):
+        points = groups.regions.pop(i)
+        groups.borders.pop(i, None)
+        groups.vital.pop(i, None)
+        for p in points:
+            del groups.region_of[p]
+        return points
+
+    def _link(self, groups, i):
+        """領域 i に接する連と、領域 i が vital な連 (領域の空点が全てその連の呼吸点) を求める"""
+        board, chain_of = self.board, groups.chain_of
+        region = groups.regions[i]
+        border = {chain_of[n] for p in region for n in self._neighbors(*p) if n in chain_of}
+        empties = [p for p in region if board[p[0]][p[1]] not in (BLACK, WHITE)]
+        groups.borders[i] = border
+        groups.vital[i] = {x for x in border
+                           if all(any(chain_of.get(n) == x for n in self._neighbors(*p)) for p in empties)}
+
+    def _build(self, color):
+        """盤面全体から color の連と領域を作る"""
+        board = self.board
+        groups = _Groups()
+        groups.chains, groups.chain_of, groups.regions, groups.region_of = {}, {}, {}, {}
+        groups.borders, groups.vital, groups.next_id = {}, {}, 0
+        is_chain = lambda p: board[p[0]][p[1]] == color
+        is_region = lambda p: board[p[0]][p[1]] not in (color, WALL)
+        for r in range(self.rows):
+            for c in range(self.cols):
+                p = (r, c)
+                if p in groups.chain_of or p in groups.region_of or board[r][c] == WALL:
+                    continue
+                if is_chain(p):
+                    self._add(groups, self._component(p, is_chain), True)
+                else:
+                    self._add(groups, self._component(p, is_region), False)
+        for i in groups.regions:
+            self._link(groups, i)
+        return groups
+
+    def _update_mover(self, groups, move):
+        """
+        着手した色の構造を更新する
+        着手点に接する連を1つにまとめ、着手点を含んでいた領域を (着手点を除いて) 分け直す
+        取られた石の点は元から同じ領域の中なので、その領域の空点が増えるだけ
+        """
+        old = {groups.chain_of[n] for n in self._neighbors(*move) if n in groups.chain_of}
+        merged = {move}
+        for i in old:
+            merged |= groups.chains.pop(i)
+        for p in merged:
+            groups.chain_of.pop(p, None)
+        chain = self._add(groups, frozenset(merged), True)
+
+        points = self._remove_region(groups, groups.region_of[move]) - {move}
+        changed = set()
+        while points:
+            region = self._component(next(iter(points)), points.__contains__)
+            points -= region
+            changed.add(self._add(groups, region, False))
+        # まとめた連に接する領域は、接する連と vital な連が変わる
+        changed |= {groups.region_of[n] for p in groups.chains[chain]
+                    for n in self._neighbors(*p) if n in groups.region_of}
+        for i in changed:
+            self._link(groups, i)
+        return groups
+
+    def _update_opponent(self, groups, move, captured):
+        """
+        着手していない色の構造を更新する
+        取られた連を除き、その点と接していた領域を1つにまとめる
+        着手点を含む領域は空点が減るので vital な連を求め直す
+        """
+        changed = set()
+        if captured:
+            for i in {groups.chain_of[p] for p in captured}:
+                for p in groups.chains.pop(i):
+                    del groups.chain_of[p]
+            merged = set(captured)
+            for i in {groups.region_of[n] for p in captured
+                      for n in self._neighbors(*p) if n in groups.region_of}:
+                merged |= self._remove_region(groups, i)
+            changed.add(self._add(groups, frozenset(merged), False))
+        changed.add(groups.region_of[move])
+        for i in changed:
+            self._link(groups, i)
+        return groups
+
+    def _solve(self, known):
+        self.alive = {}
+        self.territory = {}
+        self.settled_regions = []  # [(色, 領域), ...] 確定地の領域 (中の死に石の点を含む)
+        for color in (BLACK, WHITE):
+            self.alive[color], regions = self._benson(self._groups[color], known.get(color))
+            self.territory[color] = frozenset().union(*regions)
+            self.settled_regions.extend((color, region) for region in regions)
+
+    def _benson(self, groups, known=None):
+        """
+        (活き石の集合, 確定地の領域のリスト)
+        known: 活きていると分かっている石 (前の局面の結果)。その連は除かずに残す
+        """
+        keep = set() if known is None else {groups.chain_of[p] for p in known if p in groups.chain_of}
+        chains_left = set(groups.chains)
+        regions_left = set(groups.regions)
+        while True:
+            # 残っている vital な領域が2つ未満の連を除く
+            count = dict.fromkeys(chains_left, 0)
+            for i in regions_left:
+                for x in groups.vital[i]:
+                    if x in count:
+                        count[x] += 1
+            removed = {x for x in chains_left if count[x] < 2 and x not in keep}
+            if not removed:
+                break
+            chains_left -= removed
+            # 除いた連に接する領域も除く
+            regions_left = {i for i in regions_left if not (groups.borders[i] & removed)}
+
+        alive = set()
+        for x in chains_left:
+            alive |= groups.chains[x]
+        territory = sorted((groups.regions[i] for i in regions_left
+                            if groups.borders[i] and groups.borders[i] <= chains_left
+                            and groups.vital[i] & chains_left), key=min)
+        return frozenset(alive), territory
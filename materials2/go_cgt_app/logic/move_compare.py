@@ -0,0 +1,113 @@
+from .game_state import GameState, BLACK
+from .game_store import GameStore
+from .regions import split_regions, region_state, crop_region, split_area
+from .analysis import touched_points, stale_regions
+from .life import LifeAnalysis
+
+# G_a - G_b の勝敗クラス -> G_a と G_b の比較
+_RELATIONS = {"L": ">", "R": "<", "P": "=", "N": "||"}
+
+
+class MoveComparator:
+    """
+    2つの着手 a, b を、打った後の局面の差 G_a - G_b で比べる
+
+    - どちらの着手でも値が変わらない領域は差で打ち消し合うので、
+      どちらかの着手で値が変わりうる領域だけの和を比べる
+    - 差の勝敗クラスで比較が決まる (L: G_a > G_b, R: G_a < G_b, P: 等しい, N: 比べられない)
+    - 領域の標準形 (GameStore の ID) は切り出した盤面 (regions.crop_region) ごとに覚えておき、
+      呼び出しをまたいで使い回す (盤上の位置が違っても同じ形なら同じ ID)
+    - max_points より空点の多い領域が関わるときは比べない (None)
+    - 確定地は中の死に石ごと1つの領域にする (LifeAnalysis は打つ前の盤面ごとに1回だけ求め、
+      打った後の盤面の分は LifeAnalysis.apply_move で求める)
+    - 打った後の盤面は変わりうる部分だけを analysis.BoardAnalysis と同じ規則で分け直す
+      (盤面全体を split_regions で分けたときと同じ領域になる)
+    """
+    def __init__(self, store=None, max_points=None):
+        self.store = GameStore() if store is None else store
+        self.max_points = max_points
+        self._regions = {}  # 盤面 -> (領域のリスト (確定地をまとめたもの), LifeAnalysis)
+        self._games = {}    # (切り出した盤面, 領域) -> ID
+
+    def region_game(self, board, region):
+        # 切り出した盤面をキーにして、盤上の別の位置の同じ形と標準形を共有する
+        cropped = crop_region(board, region)
+        if cropped is None:
+            key, state = (board, region), region_state(board, region)
+        else:
+            key, state = (cropped.board, cropped.area), cropped.state()
+        game = self._games.get(key)
+        if game is None:
+            game = self._games[key] = self.store.from_state(state)
+        return game
+
+    def _split(self, board):
+        split = self._regions.get(board)
+        if split is None:
+            life = LifeAnalysis(board)
+            split = self._regions[board] = (split_regions(board, life), life)
+        return split
+
+    def difference(self, board, move_a, move_b, color=BLACK):
+        """G_a - G_b の ID (比べられる範囲を超えたら None)。合法でない着手は ValueError"""
+        board = tuple(map(tuple, board))
+        state = GameState(board, color)
+        regions, life = self._split(board)
+        played = []
+        touched = set()
+        changed = set()
+        for move in (move_a, move_b):
+            r, c = move
+            if not state.can_play(r, c, color):
+                raise ValueError(f"illegal move: {move}")
+            new_board, captured = state._play(r, c, color)
+            if new_board is None:
+                raise ValueError(f"illegal move: {move}")
+            new_board = tuple(map(tuple, new_board))
+            played.append((new_board, life.apply_move(move, color)))
+            touched |= touched_points(new_board, move, captured)
+            changed |= {move, *captured}
+
+        # 両方の着手について同じ点を分け直し、それ以外の領域は差で打ち消し合う
+        _, points = stale_regions(regions, touched, life, [after for _, after in played], changed)
+        store = self.store
+        games = []
+        for new_board, after in played:
+            game = store.zero
+            for region in split_area(new_board, points, after):
+                if self.max_points is not None and len(region) > self.max_points:
+                    return None
+                game = store.add(game, self.region_game(new_board, region))
+            games.append(game)
+        return store.add(games[0], store.neg(games[1]))
+
+    def compare(self, board, move_a, move_b, color=BLACK):
+        """
+        G_a と G_b の比較 (黒から見た値で "<", ">", "=", "||" のどれか)
+        比べられない大きさの領域が関わるときは None
+        """
+        difference = self.difference(board, move_a, move_b, color)
+        if difference is None:
+            return None
+        return _RELATIONS[self.store.comparator.outcome(difference)]
+
+    def better(self, board, move_a, move_b, color=BLACK):
+        """
+        color にとってどちらの手が良いか ("a", "b", "=", "||")
+        比べられないときは None
+        """
+        relation = self.compare(board, move_a, move_b, color)
+        if relation is None or relation in ("=", "||"):
+            return relation
+        return "a" if (relation == ">") == (color == BLACK) else "b"
+
+    def audit(self, positions):
+        """
+        (盤面, 着手 a, 着手 b, 色) を順に比べる (棋譜の局面をまとめて調べる用)
+        返り値: better の結果を1つずつ返すジェネレータ。合法でない組は None
+        """
+        for board, move_a, move_b, color in positions:
+            try:
+                yield self.better(board, move_a, move_b, color)
+            except ValueError:
+                yield None
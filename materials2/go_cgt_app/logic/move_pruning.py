@@ -0,0 +1,199 @@
+from .game_state import BLACK, WHITE
+from .regions import split_regions
+from .life import LifeAnalysis
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class MovePruning:
+    """
+    探索で試す手を減らし、並べ替えるための設定
+    どのルールも既定では無効。有効にしたものだけが適用される
+
+    - own_territory: 自分の専用点・自分の石だけに囲まれた空点を埋める手を除く
+      (他に手がある場合のみ。囲碁では自分の地を埋める手はパス以下)
+    - settled_eyes: 相手の石だけに囲まれた小さな領域 (max_eye_size 点以下) に
+      石を取らずに打ち込む手を除く
+    - settled: 相手の確定地 (Benson の無条件の活き石だけに囲まれた領域) に打ち込む手を除く
+      (確定地の解析は局面ごとに1回だけ行い、覚えておく)
+    - symmetry: 局面が対称なとき、対称な位置の手は1つだけ残す (値は変わらない)
+    - ordering: 石を取る手 → アタリにする手 → その他 の順に並べる
+
+    own_territory, settled_eyes, settled は囲碁としての「劣った手」を除くもので、
+    正規形の組み合わせゲームの値まで保つとは限らない。verify_pruning で確かめること
+    """
+    def __init__(self, own_territory=False, settled_eyes=False, symmetry=False,
+                 ordering=False, max_eye_size=2, settled=False):
+        self.own_territory = own_territory
+        self.settled_eyes = settled_eyes
+        self.settled = settled
+        self.symmetry = symmetry
+        self.ordering = ordering
+        self.max_eye_size = max_eye_size
+        self._life = {}     # 盤面 -> LifeAnalysis
+        self._parents = {}  # まだ解析していない子の盤面 -> (親の盤面, 着手, 色)
+
+    @classmethod
+    def from_names(cls, names):
+        """"own_territory,symmetry" のようなカンマ区切りの指定から作る ("all" で全て)"""
+        names = [name.strip() for name in names.split(",") if name.strip()]
+        rules = ("own_territory", "settled_eyes", "symmetry", "ordering", "settled")
+        if "all" in names:
+            names = rules
+        unknown = set(names) - set(rules)
+        if unknown:
+            raise ValueError(f"unknown pruning rule(s): {', '.join(sorted(unknown))}")
+        return cls(**{name: True for name in names})
+
+    @property
+    def enabled(self):
+        return (self.own_territory or self.settled_eyes or self.symmetry or self.ordering
+                or self.settled)
+
+    def options(self, state, color):
+        """state.options(color) に枝刈りと並べ替えを適用したもの"""
+        children = state.options(color)
+        if not children:
+            return children
+        if self.own_territory or self.settled_eyes or self.settled:
+            children = self._drop_dominated(state, color, children)
+        if self.settled:
+            for child in children:
+                self._parents.setdefault(child.board, (state.board, child.last_move, color))
+        if self.symmetry:
+            children = self._drop_symmetric(state, children)
+        if self.ordering:
+            children = self._order(state, color, children)
+        return children
+
+    def children(self, state):
+        """state.children() と同じ形式 ((着手, 子局面) のリスト)"""
+        return [(child.last_move, child) for child in self.options(state, state.turn)]
+
+    def life(self, board):
+        """
+        盤面の LifeAnalysis (盤面ごとに1回だけ計算する)
+        options で作った子の盤面は、親の解析を LifeAnalysis.apply_move で更新して求める
+        """
+        result = self._life.get(board)
+        if result is None:
+            parent = self._parents.pop(board, None)
+            if parent is not None and parent[0] in self._life:
+                parent_board, move, color = parent
+                result = self._life[parent_board].apply_move(move, color)
+            else:
+                result = LifeAnalysis(board)
+            self._life[board] = result
+        return result
+
+    def _drop_dominated(self, state, color, children):
+        owner = _region_owners(state.board)
+        stones = _count_stones(state.board)
+        territory = self.life(state.board).territory[-color] if self.settled else ()
+        kept = []
+        for child in children:
+            r, c = child.last_move
+            if (r, c) in territory:
+                continue
+            region, border = owner.get((r, c), (None, None))
+            if self.own_territory and border == {color}:
+                continue
+            if (self.settled_eyes and border == {-color}
+                    and len(region) <= self.max_eye_size
+                    and _count_stones(child.board) == stones + 1):
+                continue
+            kept.append(child)
+        # 全ての手が除かれるなら、手番を失わないよう元に戻す
+        return kept or children
+
+    def _drop_symmetric(self, state, children):
+        transforms = _board_symmetries(state)
+        if len(transforms) == 1:
+            return children
+        kept = []
+        for child in children:
+            move = child.last_move
+            if move == min(t(move) for t in transforms):
+                kept.append(child)
+        return kept
+
+    def _order(self, state, color, children):
+        stones = _count_stones(state.board)
+
+        def priority(child):
+            captured = stones + 1 - _count_stones(child.board)
+            if captured > 0:
+                return (0, -captured)
+            if _makes_atari(child, child.last_move, -color):
+                return (1, 0)
+            return (2, 0)
+        return sorted(children, key=priority)
+
+
+def verify_pruning(state, pruning):
+    """
+    枝刈りありと枝刈りなしで勝敗クラスを比べる
+    返り値: (枝刈りありの結果, 枝刈りなしの結果, 一致したか)
+    """
+    from .evaluator import outcome
+    pruned = outcome(state, pruning)
+    unpruned = outcome(state)
+    return pruned, unpruned, pruned == unpruned
+
+
+def _count_stones(board):
+    return sum(1 for row in board for v in row if v == BLACK or v == WHITE)
+
+
+def _region_owners(board):
+    """空点 -> (その点を含む領域, 領域に接する石の色の集合)"""
+    rows, cols = len(board), len(board[0])
+    owners = {}
+    for region in split_regions(board):
+        border = set()
+        for r, c in region:
+            for dr, dc in NEIGHBORS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols and board[nr][nc] in (BLACK, WHITE):
+                    border.add(board[nr][nc])
+        for point in region:
+            owners[point] = (region, border)
+    return owners
+
+
+def _makes_atari(child, move, opponent):
+    r, c = move
+    for dr, dc in NEIGHBORS:
+        nr, nc = r + dr, c + dc
+        if 0 <= nr < child.rows and 0 <= nc < child.cols and child.board[nr][nc] == opponent:
+            _, liberties = child._get_group_and_liberties(child.board, nr, nc)
+            if len(liberties) == 1:
+                return True
+    return False
+
+
+def _board_symmetries(state):
+    """盤面 (と着手範囲) を変えない対称変換のリスト (恒等変換を含む)"""
+    rows, cols = state.rows, state.cols
+    candidates = [
+        lambda p: p,
+        lambda p: (p[0], cols - 1 - p[1]),
+        lambda p: (rows - 1 - p[0], p[1]),
+        lambda p: (rows - 1 - p[0], cols - 1 - p[1]),
+    ]
+    if rows == cols:
+        candidates += [
+            lambda p: (p[1], p[0]),
+            lambda p: (cols - 1 - p[1], p[0]),
+            lambda p: (p[1], rows - 1 - p[0]),
+            lambda p: (cols - 1 - p[1], rows - 1 - p[0]),
+        ]
+    points = [(r, c) for r in range(rows) for c in range(cols)]
+    result = []
+    for t in candidates:
+        if any(state.board[r][c] != state.board[t((r, c))[0]][t((r, c))[1]] for r, c in points):
+            continue
+        if state.area is not None and {t(p) for p in state.area} != set(state.area):
+            continue
+        result.append(t)
+    return result
@@ -0,0 +1,213 @@
+"""
+よく現れる局所形 (ダメ・1目の後手・簡単な先手のハネなど) の値のデータベース
+
+    python -m logic.patterns --out logic/patterns.json benchmarks/boards/*.csv --shapes 3
+
+領域の周りの形を対称変換で正規化した文字列をキーにして、領域の値 (CGTValue) を引く。
+探索する前にここを見て、載っていればその値を使う。
+ビルダーは CSV の盤面 (と小さい盤面の全ての局所形) の領域を探索して、値をデータベースに加える
+"""
+import argparse
+import json
+import os
+from .game_state import GameState, BLACK, WHITE
+from .evaluator import CGTValue, game_value
+from .dyadic import Dyadic
+from .regions import split_regions, region_state
+from .board import Board, enumerate_shapes
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+# 同梱のデータベース
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patterns.json")
+
+# ビルダーが探索する領域の空点の数の上限
+BUILD_MAX_POINTS = 4
+
+# 領域の中の交点
+_REGION_CELLS = {0: ".", 2: "b", -2: "w"}
+# 領域の外に呼吸点がある (取られない) 連の石
+_SAFE_STONES = {BLACK: "X", WHITE: "O"}
+# 呼吸点が全て領域の中にある (取られうる) 連の石 (後ろに連の番号が付く)
+_UNSAFE_STONES = {BLACK: "x", WHITE: "o"}
+
+
+def pattern_key(board, region):
+    """
+    領域とその周りの形を正規化したキー
+    領域を囲む長方形 (1路広げる) の中を、領域の交点・隣接する石 (取られうるかと連の番号)・
+    盤外 (#)・関係ない点 (?) で書き、8通りの対称変換で辞書順最小のものを選ぶ
+    取られうる連に領域に接していない石があるときは、形だけで値が決まらないので None
+    """
+    rows, cols = len(board), len(board[0])
+    if any(board[r][c] in (BLACK, WHITE) for r, c in region):
+        return None  # 死に石を含む確定地の領域
+    state = GameState(board)
+    stones = {}  # 領域に接する石 -> (色, 連の番号 or None)
+    for r, c in region:
+        for dr, dc in NEIGHBORS:
+            nr, nc = r + dr, c + dc
+            if not (0 <= nr < rows and 0 <= nc < cols) or (nr, nc) in stones:
+                continue
+            color = board[nr][nc]
+            if color not in (BLACK, WHITE):
+                continue
+            group, liberties = state._get_group_and_liberties(board, nr, nc)
+            if liberties <= region:
+                label = len(stones)
+                for stone in group:
+                    stones[stone] = (color, label)
+            else:
+                for stone in group:
+                    stones[stone] = (color, None)
+    touching = {(r + dr, c + dc) for r, c in region for dr, dc in NEIGHBORS}
+    if any(label is not None and stone not in touching for stone, (_, label) in stones.items()):
+        return None
+
+    top = min(r for r, _ in region) - 1
+    bottom = max(r for r, _ in region) + 1
+    left = min(c for _, c in region) - 1
+    right = max(c for _, c in region) + 1
+    grid = []
+    for r in range(top, bottom + 1):
+        row = []
+        for c in range(left, right + 1):
+            if not (0 <= r < rows and 0 <= c < cols):
+                row.append("#")
+            elif (r, c) in region:
+                row.append(_REGION_CELLS[board[r][c]])
+            elif (r, c) in touching and (r, c) in stones:
+                color, label = stones[(r, c)]
+                row.append(_SAFE_STONES[color] if label is None else (_UNSAFE_STONES[color], label))
+            else:
+                row.append("?")
+        grid.append(tuple(row))
+    return min(_encode(image) for image in _images(tuple(grid)))
+
+
+def _images(grid):
+    """長方形の8通りの対称変換 (転置を含む)"""
+    transposed = tuple(zip(*grid))
+    for g in (grid, transposed):
+        yield g
+        yield tuple(row[::-1] for row in g)
+        yield g[::-1]
+        yield tuple(row[::-1] for row in g[::-1])
+
+
+def _encode(grid):
+    """行を / で区切った文字列。取られうる連の番号は左上から現れた順に付け直す"""
+    labels = {}
+    rows = []
+    for row in grid:
+        text = ""
+        for cell in row:
+            if isinstance(cell, tuple):
+                mark, label = cell
+                text += mark + str(labels.setdefault(label, len(labels)))
+            else:
+                text += cell
+        rows.append(text)
+    return "/".join(rows)
+
+
+def _to_json(value):
+    return [value.base.numerator, value.base.exponent, value.ups, value.nim]
+
+
+def _from_json(data):
+    numerator, exponent, ups, nim = data
+    return CGTValue(Dyadic(numerator, exponent), ups=ups, nim=nim)
+
+
+class PatternDB:
+    """
+    局所形のキー -> 値 (CGTValue) の表
+    値が CGTValue で表せない形は載せない
+    """
+    def __init__(self, path=None):
+        self.patterns = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.patterns = {key: _from_json(data) for key, data in json.load(f).items()}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def lookup(self, board, region):
+        """載っていれば値、無ければ None"""
+        key = pattern_key(board, region)
+        value = None if key is None else self.patterns.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def add(self, board, region, value):
+        """解いた領域の値を加える (キーが作れない形や値が None なら何もしない)。加えたら True"""
+        key = pattern_key(board, region)
+        if key is None or value is None:
+            return False
+        self.patterns[key] = value
+        return True
+
+    def add_board(self, board, max_points=BUILD_MAX_POINTS):
+        """盤面の領域のうち、まだ載っていないものを探索して加える。加えた数を返す"""
+        added = 0
+        for region in split_regions(board):
+            if len(region) > max_points:
+                continue
+            key = pattern_key(board, region)
+            if key is None or key in self.patterns:
+                continue
+            value = game_value(region_state(board, region))
+            if value is not None:
+                self.patterns[key] = value
+                added += 1
+        return added
+
+    def save(self, path):
+        # 1行に1つの形 (差分が読みやすいように)
+        lines = [f"{json.dumps(key)}: {json.dumps(_to_json(value))}"
+                 for key, value in sorted(self.patterns.items())]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{\n" + ",\n".join(lines) + "\n}\n")
+
+
+_default = None
+
+
+def default_patterns():
+    """同梱のデータベース (最初に使うときに読み込む)"""
+    global _default
+    if _default is None:
+        _default = PatternDB(DEFAULT_PATH)
+    return _default
+
+
+def main():
+    parser = argparse.ArgumentParser(description="局所形のデータベースを作る・増やす")
+    parser.add_argument("boards", nargs="*", help="CSV boards whose regions are solved and added")
+    parser.add_argument("--out", default=DEFAULT_PATH, help="database file (extended if it exists)")
+    parser.add_argument("--shapes", type=int, default=0,
+                        help="also add every legal local shape of an N x N board")
+    parser.add_argument("--max-points", type=int, default=BUILD_MAX_POINTS,
+                        help="largest region (empty points) to solve")
+    args = parser.parse_args()
+
+    db = PatternDB(args.out)
+    before = len(db)
+    for path in args.boards:
+        db.add_board(Board.from_csv(path).to_rows(), args.max_points)
+    if args.shapes:
+        for shape in enumerate_shapes(args.shapes, values=(0, BLACK, WHITE, 2, -2)):
+            db.add_board(shape.to_rows(), args.max_points)
+    db.save(args.out)
+    print(f"{len(db) - before} patterns added ({len(db)} in {args.out})")
+
+
+if __name__ == "__main__":
+    main()
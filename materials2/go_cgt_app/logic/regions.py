@@ -0,0 +1,172 @@
+from .game_state import GameState, EMPTY, BLACK, WHITE, WALL
+
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def split_regions(board, life=None):
+    """
+    石で区切られた空点 (0, 2, -2) の連結成分に盤面を分割する
+    返り値: 交点の frozenset のリスト (左上から順)
+    life (LifeAnalysis) を渡すと、確定地は中の死に石の点も含めて1つの領域にする
+    (確定地を囲む石は取られないので、その領域は他と独立に扱える)
+    """
+    rows, cols = len(board), len(board[0]) if board else 0
+    seen = set()
+    regions = []
+    for sr in range(rows):
+        for sc in range(cols):
+            if (sr, sc) in seen or board[sr][sc] in (BLACK, WHITE, WALL):
+                continue
+            stack = [(sr, sc)]
+            region = set()
+            while stack:
+                r, c = stack.pop()
+                if (r, c) in region:
+                    continue
+                region.add((r, c))
+                for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < rows and 0 <= nc < cols and board[nr][nc] not in (BLACK, WHITE, WALL):
+                        stack.append((nr, nc))
+            seen |= region
+            regions.append(frozenset(region))
+    settled = settled_regions(life)
+    if settled:
+        regions = [region for region in regions if not any(region <= s for s in settled)]
+        regions = sorted(regions + settled, key=min)
+    return regions
+
+
+def settled_regions(life):
+    """
+    split_regions が1つの領域にする確定地のリスト (life が None なら空)
+    黒と白の確定地が重なることは普通ないが、重なったら先の方だけを使う
+    """
+    settled = []
+    if life is not None:
+        for _, region in life.settled_regions:
+            if not any(region & s for s in settled):
+                settled.append(region)
+    return settled
+
+
+def split_area(board, points, life=None):
+    """
+    points の中だけを split_regions と同じ規則で領域に分ける (着手で変わった部分の分け直し用)
+    points と重なる確定地は1つの領域にする (確定地が points に収まっていること)
+    それ以外の石の点は除き、石の無い点を連結成分に分ける
+    """
+    rows, cols = len(board), len(board[0])
+    settled = [s for s in settled_regions(life) if s & points]
+    covered = set().union(*settled)
+    free = {(r, c) for r, c in points
+            if (r, c) not in covered and board[r][c] not in (BLACK, WHITE, WALL)}
+    regions = list(settled)
+    while free:
+        stack = [min(free)]
+        region = set()
+        while stack:
+            r, c = stack.pop()
+            if (r, c) in region:
+                continue
+            region.add((r, c))
+            for dr, dc in NEIGHBORS:
+                n = (r + dr, c + dc)
+                if 0 <= n[0] < rows and 0 <= n[1] < cols and n in free and n not in region:
+                    stack.append(n)
+        free -= region
+        regions.append(frozenset(region))
+    return sorted(regions, key=min)
+
+
+def region_state(board, region, turn=BLACK):
+    """領域の中だけに着手を制限した局面"""
+    return GameState(board, turn, area=region)
+
+
+class CroppedRegion:
+    """
+    領域を切り出した小さい盤面
+    board: 切り出した盤面 (tuple of tuples)、area: その中の領域の点、(top, left): 元の盤面での左上
+    """
+    __slots__ = ("board", "area", "top", "left")
+
+    def __init__(self, board, area, top, left):
+        self.board = board
+        self.area = area
+        self.top = top
+        self.left = left
+
+    def to_board(self, point):
+        """切り出した盤面の座標 -> 元の盤面の座標"""
+        return point[0] + self.top, point[1] + self.left
+
+    def to_sub(self, point):
+        """元の盤面の座標 -> 切り出した盤面の座標"""
+        return point[0] - self.top, point[1] - self.left
+
+    def state(self, turn=BLACK):
+        return GameState(self.board, turn, area=self.area)
+
+
+def crop_region(board, region):
+    """
+    領域の値を変えずに、領域を囲む最小の長方形の盤面に切り出す (できなければ None)
+
+    - 領域の点と、領域に接する石はそのまま写す
+    - 領域の外に呼吸点がある (取られない) 連の石には、領域に接しない空点を1つ隣に置く
+      (着手範囲の外なので埋まらず、ずっと呼吸点のまま)
+    - それ以外は壁 (WALL)。盤外と同じく石も置けず呼吸点にもならない
+    - 呼吸点が全て領域の中にある連は、全ての石が領域に接していなければならない
+      (そうでなければ取ったあとの形が切り出した盤面で表せないので None)
+    - 壁だけの外側の行・列は除く (盤の端の領域も中央の領域も、同じ形なら同じ盤面になる)
+    - 石を含む領域 (確定地) も None
+    """
+    rows, cols = len(board), len(board[0])
+    if any(board[r][c] in (BLACK, WHITE) for r, c in region):
+        return None  # 死に石を含む確定地の領域
+    full = GameState(board)
+    neighbors = lambda r, c: [(r + dr, c + dc) for dr, dc in NEIGHBORS
+                              if 0 <= r + dr < rows and 0 <= c + dc < cols]
+    safe = {}  # 領域に接する石 -> 取られないか
+    for r, c in region:
+        for nr, nc in neighbors(r, c):
+            if board[nr][nc] not in (BLACK, WHITE) or (nr, nc) in safe:
+                continue
+            group, liberties = full._get_group_and_liberties(board, nr, nc)
+            is_safe = not liberties <= region
+            for stone in group:
+                safe[stone] = is_safe
+    touching = {n for p in region for n in neighbors(*p)}
+    unsafe = {stone for stone, is_safe in safe.items() if not is_safe}
+    if not unsafe <= touching:
+        return None
+
+    top = max(0, min(r for r, _ in region) - 2)
+    bottom = min(rows - 1, max(r for r, _ in region) + 2)
+    left = max(0, min(c for _, c in region) - 2)
+    right = min(cols - 1, max(c for _, c in region) + 2)
+    sub = {}
+    for p in region:
+        sub[p] = board[p[0]][p[1]]
+    for p in touching:
+        if p in safe:
+            sub[p] = board[p[0]][p[1]]
+    near_unsafe = {n for p in unsafe for n in neighbors(*p)}
+    for stone in sorted(p for p in touching if safe.get(p)):
+        around = [n for n in neighbors(*stone) if top <= n[0] <= bottom and left <= n[1] <= right]
+        if any(sub.get(n) == EMPTY and n not in region for n in around):
+            continue
+        liberty = next((n for n in around if n not in sub and n not in near_unsafe), None)
+        if liberty is None:
+            return None
+        sub[liberty] = EMPTY
+
+    top = min(r for r, _ in sub)
+    bottom = max(r for r, _ in sub)
+    left = min(c for _, c in sub)
+    right = max(c for _, c in sub)
+    cropped = tuple(tuple(sub.get((r, c), WALL) for c in range(left, right + 1))
+                    for r in range(top, bottom + 1))
+    area = frozenset((r - top, c - left) for r, c in region)
+    return CroppedRegion(cropped, area, top, left)
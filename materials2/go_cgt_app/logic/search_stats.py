@@ -0,0 +1,91 @@
+import json
+from collections import defaultdict
+
+
+class SearchHooks:
+    """
+    ゲーム木の探索中に呼ばれるフック (既定では何もしない)
+    必要なメソッドだけ上書きして build_tree(..., hooks=...) に渡す
+    hooks=None のときはフックの呼び出し自体を行わない
+    """
+    def on_node(self, depth, state, children, seconds):
+        """局面を1つ展開した (children: 子の数, seconds: 着手生成にかかった時間)"""
+
+    def on_cache_hit(self, depth, state):
+        """展開済みの局面に再び到達した"""
+
+    def on_prune(self, depth, move, reason):
+        """
+        着手を探索から外した
+        reason: "ko" = 同形反復, "suicide" = 自殺手, "dominated" = 枝刈りで除いた手
+        """
+
+    def on_capture(self, depth, move, stones):
+        """着手で stones 個の石を取った"""
+
+
+class SearchStats(SearchHooks):
+    """
+    深さごとの探索統計
+    trace=True なら全てのイベントを記録して JSON に書き出せる
+    """
+    FIELDS = ("nodes", "children", "cache_hits", "ko", "suicide", "dominated", "captures", "seconds")
+
+    def __init__(self, trace=False):
+        self.depths = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+        self.trace = [] if trace else None
+
+    def _event(self, event, depth, **data):
+        if self.trace is not None:
+            self.trace.append({"event": event, "depth": depth, **data})
+
+    def on_node(self, depth, state, children, seconds):
+        row = self.depths[depth]
+        row["nodes"] += 1
+        row["children"] += children
+        row["seconds"] += seconds
+        self._event("node", depth, children=children, seconds=seconds)
+
+    def on_cache_hit(self, depth, state):
+        self.depths[depth]["cache_hits"] += 1
+        self._event("cache_hit", depth)
+
+    def on_prune(self, depth, move, reason):
+        self.depths[depth][reason] += 1
+        self._event("prune", depth, move=move, reason=reason)
+
+    def on_capture(self, depth, move, stones):
+        self.depths[depth]["captures"] += 1
+        self._event("capture", depth, move=move, stones=stones)
+
+    def report(self):
+        """深さごとの内訳を表にした文字列"""
+        lines = [f"{'depth':>5} {'nodes':>8} {'branch':>7} {'cache%':>7} "
+                 f"{'ko':>6} {'suicide':>8} {'pruned':>7} {'capture':>8} {'ms':>9}"]
+        total = dict.fromkeys(self.FIELDS, 0)
+        for depth in sorted(self.depths):
+            row = self.depths[depth]
+            lines.append(self._format_row(str(depth), row))
+            for field in self.FIELDS:
+                total[field] += row[field]
+        lines.append(self._format_row("total", total))
+        return "\n".join(lines)
+
+    def _format_row(self, label, row):
+        branch = row["children"] / row["nodes"] if row["nodes"] else 0
+        visits = row["nodes"] + row["cache_hits"]
+        hit_rate = 100 * row["cache_hits"] / visits if visits else 0
+        return (f"{label:>5} {row['nodes']:>8} {branch:>7.2f} {hit_rate:>7.1f} "
+                f"{row['ko']:>6} {row['suicide']:>8} {row['dominated']:>7} {row['captures']:>8} "
+                f"{row['seconds'] * 1000:>9.2f}")
+
+    def as_dict(self):
+        """深さごとの統計と全イベント (JSON にできる形)"""
+        return {
+            "depths": {str(depth): row for depth, row in sorted(self.depths.items())},
+            "trace": self.trace,
+        }
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
@@ -0,0 +1,218 @@
+"""
+小さい盤面の終局表 (tablebase) を後退解析で作る
+
+    python -m logic.tablebase --rows 3 --cols 3 --out tablebase_3x3.npy
+
+N×M の盤面の全ての局面を列挙し、
+黒が先に打つとき・白が先に打つときの勝ち負けを、打てなくなった局面から逆向きに
+NumPy の配列演算でまとめて決める。結果は交点の値を桁とした番号 (完全ハッシュ) の位置に
+1バイトずつ並べて .npy に保存し、np.load(mmap_mode="r") でメモリマップして引く
+
+- 交点が MAX_POINTS 個まで: 各交点は 0, 1, -1, 2, -2 の5通り (5進数)
+- MAX_STONE_POINTS 個まで (4x4 など): 専用点 (2, -2) の無い局面だけを 0, 1, -1 の3通り (3進数) で持つ
+"""
+import argparse
+import math
+from .game_state import BLACK, WHITE
+from .batch_expand import expand_boards, label_groups
+
+# NumPyライブラリのインポート
+try:
+    import numpy as np
+except ImportError:
+    print("エラー: NumPyライブラリが見つかりません。")
+    print("コマンドプロンプトで pip install numpy を実行してください。")
+    exit()
+
+# 交点の値の種類 (-2, -1, 0, 1, 2 を 0..4 の桁にする)
+BASE = 5
+
+# 専用点の無い表の交点の値の種類 (-1, 0, 1 を 0..2 の桁にする)
+STONE_BASE = 3
+
+# 専用点も含めた表を作れる交点の数の上限 (表の大きさは 5**(N*M) バイト)
+MAX_POINTS = 10
+
+# 専用点の無い表を作れる交点の数の上限 (表の大きさは 3**(N*M) バイト。4x4 で約43MB)
+MAX_STONE_POINTS = 16
+
+# 手番側から見た結果 (1バイトの下位2ビットが黒番、上位2ビットが白番)
+UNKNOWN, WIN, LOSS, DRAW = 0, 1, 2, 3
+
+# 一度に配列にする局面の数
+CHUNK_SIZE = 1 << 16
+
+
+def table_base(rows, cols):
+    """rows×cols の表の交点の値の種類 (BASE か STONE_BASE)。大きすぎれば ValueError"""
+    points = rows * cols
+    if points <= MAX_POINTS:
+        return BASE
+    if points <= MAX_STONE_POINTS:
+        return STONE_BASE
+    raise ValueError(f"{rows}x{cols} is too large (at most {MAX_STONE_POINTS} points)")
+
+
+def board_index(board, base=BASE):
+    """盤面の番号 (base 進数で、左上の交点が最上位の桁)"""
+    offset = base // 2
+    index = 0
+    for row in board:
+        for value in row:
+            index = index * base + value + offset
+    return index
+
+
+def _indices(boards, base):
+    """(K, R, C) の盤面の配列の番号"""
+    flat = boards.reshape(len(boards), -1).astype(np.int64) + base // 2
+    powers = base ** np.arange(flat.shape[1] - 1, -1, -1, dtype=np.int64)
+    return flat @ powers
+
+
+def _boards(indices, rows, cols, base):
+    """番号 (K,) から盤面 (K, R, C) の int8 配列を作る"""
+    powers = base ** np.arange(rows * cols - 1, -1, -1, dtype=np.int64)
+    digits = (indices[:, None] // powers) % base - base // 2
+    return digits.astype(np.int8).reshape(len(indices), rows, cols)
+
+
+def _legal(boards):
+    """呼吸点の無い連が無い盤面"""
+    count, rows, cols = boards.shape
+    labels, has_liberty = label_groups(boards)
+    stride = rows * cols + 1
+    group = labels + (np.arange(count) * stride)[:, None, None]
+    stones = labels < rows * cols
+    liberty = np.bincount(group[stones], weights=has_liberty[stones],
+                          minlength=count * stride) > 0
+    dead = stones & ~liberty[group]
+    return ~dead.reshape(count, -1).any(axis=1)
+
+
+def build_tablebase(rows, cols, path, chunk_size=CHUNK_SIZE):
+    """
+    rows×cols の全ての局面の結果を path (.npy) に保存し、メモリマップした表を返す
+    同じ局面の繰り返しで終わらない局面は DRAW (引き分け) とする
+    交点が MAX_POINTS 個より多ければ専用点の無い局面だけ (STONE_BASE 進数の番号) にする
+    """
+    base = table_base(rows, cols)
+    size = base ** (rows * cols)
+
+    # 合法な局面を列挙し、番号を詰めた通し番号にする
+    legal = []
+    for start in range(0, size, chunk_size):
+        indices = np.arange(start, min(start + chunk_size, size), dtype=np.int64)
+        legal.append(indices[_legal(_boards(indices, rows, cols, base))])
+    legal = np.concatenate(legal)
+    count = len(legal)
+
+    # 黒・白それぞれの着手 (親 -> 子) の辺を、親 chunk_size 局面ずつの塊のまま持つ
+    # (親は塊の中の番号、子は通し番号の int32 にして、全ての辺を1つの配列にまとめない。4x4 で数GBになるため)
+    local = np.min_scalar_type(chunk_size - 1)
+    edges = {BLACK: [], WHITE: []}
+    degrees = {color: np.zeros(count, dtype=np.uint8) for color in (BLACK, WHITE)}
+    for start in range(0, count, chunk_size):
+        boards = _boards(legal[start:start + chunk_size], rows, cols, base)
+        for color in (BLACK, WHITE):
+            p, _, c = expand_boards(boards, color)
+            children = np.searchsorted(legal, _indices(c, base)).astype(np.int32)
+            edges[color].append((start, p.astype(local), children))
+            degrees[color][start:start + len(boards)] = np.bincount(p, minlength=len(boards))
+
+    # 後退解析: 打てない局面は手番の負け。負けの局面に進める局面は勝ち、
+    # 全ての手が相手の勝ちに進む局面は負け。変わらなくなるまで繰り返す
+    results = {color: np.zeros(count, dtype=np.uint8) for color in (BLACK, WHITE)}
+    for color in (BLACK, WHITE):
+        results[color][degrees[color] == 0] = LOSS
+    changed = True
+    while changed:
+        changed = False
+        for color in (BLACK, WHITE):
+            mine, theirs = results[color], results[-color]
+            win = np.zeros(count, dtype=bool)
+            losing = np.zeros(count, dtype=bool)
+            for start, parents, children in edges[color]:
+                after = theirs[children]
+                stop = min(start + chunk_size, count)
+                win[start:stop][parents[after == LOSS]] = True
+                losing[start:stop] = (np.bincount(parents[after == WIN], minlength=stop - start)
+                                      == degrees[color][start:stop])
+            new_win = win & (mine == UNKNOWN)
+            new_loss = losing & ~win & (mine == UNKNOWN)
+            if new_win.any() or new_loss.any():
+                mine[new_win] = WIN
+                mine[new_loss] = LOSS
+                changed = True
+    for color in (BLACK, WHITE):
+        results[color][results[color] == UNKNOWN] = DRAW
+
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8,
+                                      shape=(base ** cols,) * rows)
+    flat = table.reshape(-1)
+    flat[legal] = results[BLACK] | (results[WHITE] << 2)
+    table.flush()
+    return table
+
+
+class Tablebase:
+    """
+    build_tablebase で作った表をメモリマップして引く
+    表の次元が行、各次元の長さ base**cols が1行の局面の数 (base は 5 か、専用点の無い表なら 3)
+    """
+    def __init__(self, path):
+        self.table = np.load(path, mmap_mode="r")
+        self.rows = self.table.ndim
+        width = self.table.shape[0]
+        for base in (BASE, STONE_BASE):
+            cols = round(math.log(width, base))
+            if base ** cols == width:
+                break
+        self.base = base
+        self.cols = cols
+        self._flat = self.table.reshape(-1)
+
+    def covers(self, board):
+        """盤面の大きさが同じで、交点の値が表の桁で表せるか (専用点の無い表は専用点を含む盤面を持たない)"""
+        offset = self.base // 2
+        return len(board) == self.rows and all(
+            len(row) == self.cols and all(-offset <= value <= offset for value in row) for row in board)
+
+    def describe(self):
+        """表の範囲 (例: "4x4, no exclusive points")"""
+        if self.base == STONE_BASE:
+            return f"{self.rows}x{self.cols}, no exclusive points"
+        return f"{self.rows}x{self.cols}"
+
+    def results(self, board):
+        """(黒が先に打つときの黒の結果, 白が先に打つときの白の結果)。合法でない局面は None"""
+        entry = int(self._flat[board_index(board, self.base)])
+        if entry == 0:
+            return None
+        return entry & 3, entry >> 2
+
+    def outcome(self, board):
+        """
+        勝敗クラス (L: 黒の勝ち, R: 白の勝ち, N: 先手の勝ち, P: 後手の勝ち)
+        繰り返しで決まらない局面や合法でない局面は None (探索で求める)
+        """
+        results = self.results(board)
+        if results is None or DRAW in results:
+            return None
+        black, white = results
+        return {(WIN, WIN): "N", (WIN, LOSS): "L", (LOSS, WIN): "R", (LOSS, LOSS): "P"}[(black, white)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="小さい盤面の終局表を作る")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--cols", type=int, required=True)
+    parser.add_argument("--out", required=True, help="output .npy file")
+    args = parser.parse_args()
+    table = build_tablebase(args.rows, args.cols, args.out)
+    entries = np.count_nonzero(table)
+    print(f"{args.rows}x{args.cols}: {entries} legal positions saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from .dyadic import Dyadic
+
+# サーモグラフを描く温度の下限
+MIN_TEMPERATURE = Dyadic(-1)
+
+
+class Trajectory:
+    """
+    温度 t (>= -1) の折れ線関数
+    points: (t, 値) の t の昇順のリスト。最後の点より先は傾き tail の直線
+    t と値は Dyadic (短いゲームのサーモグラフの折れ目と値は全て2進有理数)
+    """
+    __slots__ = ("points", "tail")
+
+    def __init__(self, points, tail=0):
+        self.points = points
+        self.tail = tail
+
+    @classmethod
+    def constant(cls, value):
+        return cls([(MIN_TEMPERATURE, Dyadic.coerce(value))], 0)
+
+    def __call__(self, t):
+        points = self.points
+        if t >= points[-1][0]:
+            last_t, last_v = points[-1]
+            return last_v + self.tail * (t - last_t)
+        for (t0, v0), (t1, v1) in zip(points, points[1:]):
+            if t <= t1:
+                return v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+        return points[0][1]
+
+    def slope_after(self, t):
+        """t の直後の傾き"""
+        points = self.points
+        for (t0, v0), (t1, v1) in zip(points, points[1:]):
+            if t0 <= t < t1:
+                return (v1 - v0) / (t1 - t0)
+        return self.tail
+
+    def tilted(self, slope):
+        """self(t) + slope * t"""
+        return Trajectory([(t, v + slope * t) for t, v in self.points], self.tail + slope)
+
+    def until(self, temperature, mast):
+        """temperature までは self、そこから上は mast で一定"""
+        points = [(t, v) for t, v in self.points if t < temperature]
+        points.append((temperature, mast))
+        return Trajectory(points, 0)
+
+    def breakpoints(self):
+        return [t for t, _ in self.points]
+
+
+def envelope(trajectories, upper=True):
+    """折れ線の上側 (upper=True) / 下側の包絡線"""
+    if len(trajectories) == 1:
+        return trajectories[0]
+    pick = max if upper else min
+    ts = sorted({t for f in trajectories for t in f.breakpoints()})
+    crossings = []
+    for a, b in zip(ts, ts[1:] + [None]):
+        lines = [(f(a), f.slope_after(a)) for f in trajectories]
+        for i, (va, sa) in enumerate(lines):
+            for vb, sb in lines[i + 1:]:
+                if sa != sb:
+                    t = a + (vb - va) / (sa - sb)
+                    if t > a and (b is None or t < b):
+                        crossings.append(t)
+    ts = sorted(set(ts) | set(crossings))
+    points = [(t, pick(f(t) for f in trajectories)) for t in ts]
+    last = ts[-1]
+    best = pick(f(last) for f in trajectories)
+    tail = pick(f.slope_after(last) for f in trajectories if f(last) == best)
+    return Trajectory(_simplify(points), tail)
+
+
+def _simplify(points):
+    """同じ直線上にある途中の点を除く"""
+    result = points[:2]
+    for point in points[2:]:
+        (t0, v0), (t1, v1) = result[-2], result[-1]
+        t2, v2 = point
+        if (v1 - v0) * (t2 - t1) == (v2 - v1) * (t1 - t0):
+            result[-1] = point
+        else:
+            result.append(point)
+    return result
+
+
+def first_crossing(left, right):
+    """left(t) <= right(t) となる最小の t (>= -1)"""
+    ts = sorted(set(left.breakpoints()) | set(right.breakpoints()))
+    if left(ts[0]) <= right(ts[0]):
+        return ts[0]
+    for a, b in zip(ts, ts[1:] + [None]):
+        gap = left(a) - right(a)
+        slope = left.slope_after(a) - right.slope_after(a)
+        if slope < 0:
+            t = a - gap / slope
+            if b is None or t <= b:
+                return t
+    raise ValueError("scaffolds never cross")
+
+
+class Thermograph:
+    """
+    サーモグラフ (左の壁・右の壁・温度・平均値 (マストの位置))
+    壁は温度 t の関数で、t >= temperature では両方とも mast
+    """
+    __slots__ = ("left", "right", "temperature", "mast")
+
+    def __init__(self, left, right, temperature, mast):
+        self.left = left
+        self.right = right
+        self.temperature = temperature
+        self.mast = mast
+
+    def width(self, t):
+        return self.left(t) - self.right(t)
+
+    def __repr__(self):
+        return f"Thermograph(temperature={self.temperature}, mast={self.mast})"
+
+
+class ThermographCache:
+    """GameStore の ID ごとにサーモグラフを計算して覚えておく"""
+    def __init__(self, store):
+        self.store = store
+        self._cache = {}
+
+    def __call__(self, g):
+        result = self._cache.get(g)
+        if result is None:
+            result = self._cache[g] = self._compute(g)
+        return result
+
+    def _compute(self, g):
+        value = self.store.to_value(g)
+        if value is not None and value.is_number:
+            x = Dyadic.coerce(value.base)
+            wall = Trajectory.constant(x)
+            return Thermograph(wall, wall, Dyadic(-1, x.exponent), x)
+        node = self.store.nodes[g]
+        # 足場: 左は max(G^L の右の壁 - t)、右は min(G^R の左の壁 + t)
+        left = envelope([self(l).right.tilted(-1) for l in node.lefts], upper=True)
+        right = envelope([self(r).left.tilted(1) for r in node.rights], upper=False)
+        temperature = first_crossing(left, right)
+        mast = left(temperature)
+        return Thermograph(left.until(temperature, mast), right.until(temperature, mast),
+                           temperature, mast)
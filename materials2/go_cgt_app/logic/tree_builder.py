@@ -1,32 +1,159 @@
+import time
 import graphviz
 from .game_state import GameState
 
-def build_tree(state, depth=2):
+def build_tree(state, depth=2, hooks=None, pruning=None):
     """
-    再帰的にゲーム木を構築 (depth制限あり)
+    ゲーム木を深さ優先で構築 (depth制限あり)
+    祖先と同じ盤面に戻る着手 (コウなどの同形反復) は除く
+    別の手順で同じ局面に着いたら、作ってある部分木をそのまま使う (木の中で同じ dict を共有する)
+    hooks (SearchHooks) を渡すと、探索中のイベントを通知する
+    pruning (MovePruning) を渡すと、劣った手の枝刈りと手の並べ替えをする
     """
+    if hooks is None:
+        children_of = GameState.children if pruning is None else pruning.children
+        return _build(state, depth, set(), children_of)
+    return _build_with_hooks(state, depth, set(), hooks, 0, pruning)
+
+
+def _build(state, depth, path, children_of):
+    """
+    深さ優先で木を作る (再帰の代わりに明示的なスタックを使うので、深い探索でも RecursionError にならない)
+    スタックの要素: [局面, 残りの深さ, その局面の部分木, まだ見ていない子の反復子,
+                     部分木の盤面の集合, 同形反復で手を除いたか]
+    同じ局面・残りの深さの部分木は作り直さずに使い回す (_reuse)
+    """
+    if depth == 0:
+        return {}
+    memo = {}
+    root = {}
+    path.add(state.board)
+    stack = [[state, depth, root, iter(children_of(state)), {state.board}, False]]
+    while stack:
+        frame = stack[-1]
+        state, depth, tree, children, boards, _ = frame
+        for move, child in children:
+            if child.board in path:
+                frame[5] = True
+                continue
+            if depth == 1:
+                tree[move] = {}
+                boards.add(child.board)
+                continue
+            cached = _reuse(memo, child, depth - 1, path)
+            if cached is not None:
+                tree[move], child_boards = cached
+                boards |= child_boards
+                continue
+            subtree = tree[move] = {}
+            path.add(child.board)
+            stack.append([child, depth - 1, subtree, iter(children_of(child)), {child.board}, False])
+            break
+        else:
+            stack.pop()
+            path.discard(state.board)
+            _finish(memo, frame, stack)
+    return root
+
+
+def _build_with_hooks(state, depth, path, hooks, current_depth, pruning):
+    """_build と同じ木を作りつつ、フックを呼ぶ (計測用に分けてある)"""
     if depth == 0:
         return {}
-    tree = {}
-    for move in state.get_legal_moves():
-        child = state.play_move(move)
-        tree[move] = build_tree(child, depth-1)
-    return tree
+    memo = {}
+    root = {}
+    stack = [_enter(state, depth, root, path, hooks, current_depth, pruning)]
+    while stack:
+        frame = stack[-1]
+        state, depth, tree, children, boards, _, current_depth, stones = frame
+        for move, child in children:
+            if child.board in path:
+                hooks.on_prune(current_depth, move, "ko")
+                frame[5] = True
+                continue
+            captured = stones + 1 - _count_stones(child.board)
+            if captured > 0:
+                hooks.on_capture(current_depth, move, captured)
+            if depth == 1:
+                tree[move] = {}
+                boards.add(child.board)
+                continue
+            cached = _reuse(memo, child, depth - 1, path)
+            if cached is not None:
+                hooks.on_cache_hit(current_depth + 1, child)
+                tree[move], child_boards = cached
+                boards |= child_boards
+                continue
+            subtree = tree[move] = {}
+            stack.append(_enter(child, depth - 1, subtree, path, hooks, current_depth + 1, pruning))
+            break
+        else:
+            stack.pop()
+            path.discard(state.board)
+            _finish(memo, frame, stack)
+    return root
+
+
+def _enter(state, depth, tree, path, hooks, current_depth, pruning):
+    """局面の子を生成してフックを呼び、_build_with_hooks のスタックの要素を返す"""
+    path.add(state.board)
+    start = time.perf_counter()
+    children = state.children() if pruning is None else pruning.children(state)
+    hooks.on_node(current_depth, state, len(children), time.perf_counter() - start)
+
+    kept = {move for move, _ in children}
+    legal = kept if pruning is None else set(state.get_legal_moves())
+    for r, c in state.candidate_points():
+        if state.can_play(r, c, state.turn) and (r, c) not in legal:
+            hooks.on_prune(current_depth, (r, c), "suicide")
+    for move in sorted(legal - kept):
+        hooks.on_prune(current_depth, move, "dominated")
+    return [state, depth, tree, iter(children), {state.board}, False,
+            current_depth, _count_stones(state.board)]
+
+
+def _reuse(memo, state, depth, path):
+    """
+    作ってある同じ局面・残りの深さの (部分木, 部分木の盤面の集合)
+    部分木に今の経路上の盤面があると、同形反復で除く手が変わるので使わない (None)
+    """
+    entry = memo.get((state.board, state.turn, depth))
+    if entry is None or not entry[1].isdisjoint(path):
+        return None
+    return entry
+
+
+def _finish(memo, frame, stack):
+    """
+    作り終えた部分木を覚え、盤面の集合と同形反復で手を除いたかを親に伝える
+    同形反復で手を除いた部分木は経路によって形が変わるので覚えない
+    """
+    state, depth, tree, _, boards, truncated = frame[:6]
+    boards = frozenset(boards)
+    if not truncated:
+        memo[(state.board, state.turn, depth)] = (tree, boards)
+    if stack:
+        parent = stack[-1]
+        parent[4] |= boards
+        parent[5] = parent[5] or truncated
+
+
+def _count_stones(board):
+    return sum(1 for row in board for v in row if v == 1 or v == -1)
 
 def visualize_tree(tree, filename="assets/game_tree"):
     dot = graphviz.Digraph()
+    # 行きがけ順に番号を付ける (スタックには子を逆順に積む)
     node_id = 0
-
-    def add_node(subtree, parent=None):
-        nonlocal node_id
+    stack = [(tree, None)]
+    while stack:
+        subtree, parent = stack.pop()
         this_id = str(node_id)
         dot.node(this_id, label=f"Node {this_id}")
         node_id += 1
         if parent is not None:
             dot.edge(parent, this_id)
-        for move, child in subtree.items():
-            add_node(child, this_id)
-
-    add_node(tree)
+        for child in reversed(list(subtree.values())):
+            stack.append((child, this_id))
     dot.render(filename, format="png", cleanup=True)
     print(f"Tree saved to {filename}.png")
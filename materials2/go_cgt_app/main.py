@@ -1,9 +1,17 @@
 import argparse
 import csv
 from gui.board_editor import launch_board_editor
-from logic.game_state import GameState
+from gui.tree_viewer import launch_tree_viewer
+from logic.game_state import GameState, BLACK, WHITE
 from logic.tree_builder import build_tree, visualize_tree
-from logic.evaluator import evaluate
+from logic.batch_expand import build_tree_batched
+from logic.game_store import GameStore
+from logic.chilling import chilled_total
+from logic.endgame import SumPlayer, STRATEGIES
+from logic.analysis import MAX_REGION_POINTS, board_value
+from logic.tablebase import Tablebase
+from logic.search_stats import SearchStats
+from logic.move_pruning import MovePruning
 
 def load_board_from_csv(path):
     with open(path, newline="") as f:
@@ -12,8 +20,21 @@ def load_board_from_csv(path):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["gui", "tree", "eval"], default="gui")
+    parser.add_argument("--mode", choices=["gui", "tree", "view", "eval", "play"], default="gui")
     parser.add_argument("--file", help="CSV file for board")
+    parser.add_argument("--stats", action="store_true",
+                        help="print per-depth search statistics (tree mode)")
+    parser.add_argument("--stats-json", help="write the search statistics and event trace to this JSON file")
+    parser.add_argument("--prune", default="",
+                        help="comma-separated pruning rules for tree mode: "
+                             "own_territory, settled_eyes, symmetry, ordering, settled or all")
+    parser.add_argument("--chilled", action="store_true",
+                        help="print the sum of the chilled values of the regions (eval mode)")
+    parser.add_argument("--batch", action="store_true",
+                        help="build the tree breadth-first with NumPy-batched move generation (tree mode)")
+    parser.add_argument("--tablebase", help="look up the outcome in this tablebase (.npy) before searching (eval mode)")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="hotstrat",
+                        help="how to pick the region to play in (play mode)")
     args = parser.parse_args()
 
     if args.mode == "gui":
@@ -24,16 +45,65 @@ def main():
             return
         board = load_board_from_csv(args.file)
         state = GameState(board)
-        tree = build_tree(state, depth=2)
+        stats = SearchStats(trace=bool(args.stats_json)) if args.stats or args.stats_json else None
+        pruning = MovePruning.from_names(args.prune) if args.prune else None
+        if args.batch and (stats is not None or pruning is not None):
+            print("--batch cannot be combined with --stats or --prune")
+            return
+        if args.batch:
+            tree = build_tree_batched(state, depth=2)
+        else:
+            tree = build_tree(state, depth=2, hooks=stats, pruning=pruning)
         visualize_tree(tree)
+        if stats is not None:
+            print(stats.report())
+            if args.stats_json:
+                stats.to_json(args.stats_json)
+                print(f"Stats saved to {args.stats_json}")
+    elif args.mode == "view":
+        if not args.file:
+            print("Please provide --file CSV")
+            return
+        board = load_board_from_csv(args.file)
+        launch_tree_viewer(GameState(board))
     elif args.mode == "eval":
         if not args.file:
             print("Please provide --file CSV")
             return
         board = load_board_from_csv(args.file)
-        state = GameState(board)
-        val = evaluate(state)
-        print("Game value =", val)
+        if args.chilled:
+            total = chilled_total(board)
+            print("Chilled value =", "?" if total is None else total)
+            return
+        if args.tablebase:
+            tablebase = Tablebase(args.tablebase)
+            if not tablebase.covers(board):
+                print(f"Board is out of range of the tablebase ({tablebase.describe()}); searching instead")
+            else:
+                outcome = tablebase.outcome(board)
+                if outcome is not None:
+                    print("Outcome =", outcome, "(tablebase)")
+                    return
+                print("Outcome is not decided in the tablebase (repetition or illegal board); searching instead")
+        # 領域ごとの値の和 (数 + ↑ + nimber で表せないときは標準形 {L|R} で表示する)
+        store = GameStore()
+        game, skipped = board_value(board, store)
+        if skipped:
+            sizes = ", ".join(str(len(region)) for region in skipped)
+            print(f"Regions larger than {MAX_REGION_POINTS} points were not searched ({sizes} points)")
+            print("Game value = ?")
+            return
+        print("Game value =", store.format(game))
+    elif args.mode == "play":
+        if not args.file:
+            print("Please provide --file CSV")
+            return
+        board = load_board_from_csv(args.file)
+        player = SumPlayer(board, args.strategy, max_points=MAX_REGION_POINTS)
+        moves, winner = player.play_out(BLACK)
+        for color, move in moves:
+            print("黒" if color == BLACK else "白", move)
+        print("Winner =", {BLACK: "黒", WHITE: "白"}.get(winner, "?"))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+import itertools
+import random
+from logic.analysis import BoardAnalysis, analyze_board, board_value
+from logic.game_store import GameStore
+from logic.move_compare import MoveComparator
+from logic.game_state import GameState, BLACK, WHITE
+from logic.life import LifeAnalysis
+from logic.regions import split_regions
+
+# 領域が大きいと探索が遅いので、空点が3点以下の領域だけの盤面で調べる
+MAX_POINTS = 3
+
+
+def small_regions(board):
+    return all(len(region) <= MAX_POINTS for region in split_regions(board, LifeAnalysis(board)))
+
+
+def random_boards(count, rows=4, cols=5, seed=0):
+    """呼吸点の無い連が無く、領域の小さい乱択の盤面"""
+    rng = random.Random(seed)
+    while count:
+        board = [[rng.choice((0, BLACK, BLACK, BLACK, WHITE, WHITE, WHITE)) for _ in range(cols)]
+                 for _ in range(rows)]
+        state = GameState(board)
+        if not small_regions(board) or any(
+                not state._get_group_and_liberties(board, r, c)[1]
+                for r in range(rows) for c in range(cols) if board[r][c] in (BLACK, WHITE)):
+            continue
+        count -= 1
+        yield rng, board
+
+
+def small_moves(board, color):
+    """打った後も領域が小さいままの合法手"""
+    state = GameState(board, color)
+    moves = []
+    for r, row in enumerate(board):
+        for c, cell in enumerate(row):
+            if cell == 0 and state.can_play(r, c, color):
+                new_board, _ = state._play(r, c, color)
+                if new_board is not None and small_regions(new_board):
+                    moves.append((r, c))
+    return moves
+
+
+def test_apply_move_matches_fresh_analysis():
+    # 確定地ができたり崩れたりする着手の後も、盤面から解析し直したときと同じ領域・合計になる
+    for rng, board in random_boards(100):
+        analysis = BoardAnalysis(board)
+        color = BLACK
+        for _ in range(4):
+            moves = small_moves(analysis.board, color)
+            if not moves:
+                break
+            analysis.apply_move(rng.choice(moves), color)
+            fresh = BoardAnalysis(analysis.board)
+            assert [result.region for result in analysis.results] == [result.region for result in fresh.results]
+            assert analysis.total == fresh.total
+            color = -color
+
+
+def test_apply_move_keeps_dead_stone_in_settled_region():
+    # 黒の確定地 (下の辺の左) に白が打っても、その石は死に石として確定地の領域に含まれたまま
+    board = [
+        [0, WHITE, 0, BLACK, 0, WHITE, 0],
+        [BLACK, BLACK, BLACK, BLACK, BLACK, WHITE, 0],
+        [0, 0, 0, 0, BLACK, WHITE, 0],
+    ]
+    analysis = BoardAnalysis(board)
+    analysis.apply_move((2, 0), WHITE)
+    fresh = BoardAnalysis(analysis.board)
+    assert {(2, 0), (2, 1), (2, 2), (2, 3)} in [result.region for result in analysis.results]
+    assert [result.region for result in analysis.results] == [result.region for result in fresh.results]
+
+
+def test_compare_matches_child_positions():
+    # 変わりうる領域だけの差で比べた結果が、打った後の盤面全体の値の比較と一致する
+    store = GameStore()
+    comparator = MoveComparator(store)
+    relations = {"L": ">", "R": "<", "P": "=", "N": "||"}
+    for rng, board in random_boards(60, seed=1):
+        color = rng.choice((BLACK, WHITE))
+        state = GameState(board, color)
+        for move_a, move_b in itertools.combinations(small_moves(board, color), 2):
+            game_a, _ = board_value(state._play(*move_a, color)[0], store)
+            game_b, _ = board_value(state._play(*move_b, color)[0], store)
+            expected = relations[store.comparator.outcome(store.add(game_a, store.neg(game_b)))]
+            assert comparator.compare(board, move_a, move_b, color) == expected
+
+
+def test_analyze_board_cancels_inside_region_search():
+    # 1つしかない大きい領域の探索の途中でも、cancelled() が True になれば打ち切る
+    calls = []
+
+    def cancelled():
+        calls.append(None)
+        return len(calls) > 50
+
+    assert analyze_board([[0] * 4, [0] * 4], cancelled=cancelled) is None
+    assert len(calls) == 51
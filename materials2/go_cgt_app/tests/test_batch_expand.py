@@ -0,0 +1,28 @@
+from logic.batch_expand import build_tree_batched
+from logic.game_state import GameState, BLACK, WHITE
+from logic.regions import split_regions
+from logic.tree_builder import build_tree
+
+BOARDS = [
+    # 黒は (1, 1) で白の (0, 1) を、(1, 2) で白の (2, 2) を取れる
+    [[BLACK, WHITE, BLACK], [BLACK, 0, 0], [0, BLACK, WHITE]],
+    # 黒が (1, 2) で取ると、白は (1, 1) で取り返せる (コウの形)
+    [[0, BLACK, WHITE, 0], [BLACK, WHITE, 0, WHITE], [0, BLACK, WHITE, 0]],
+    # 2 は黒だけ、-2 は白だけが打てる点
+    [[2, 0, -2], [BLACK, 0, WHITE], [0, 2, 0]],
+]
+
+
+def test_batched_tree_matches_build_tree():
+    for board in BOARDS:
+        for turn in (BLACK, WHITE):
+            state = GameState(board, turn)
+            for depth in (1, 2, 3):
+                assert build_tree_batched(state, depth) == build_tree(state, depth)
+
+
+def test_batched_tree_matches_build_tree_in_region():
+    board = BOARDS[1]
+    for region in split_regions(board):
+        state = GameState(board, BLACK, area=region)
+        assert build_tree_batched(state, 3) == build_tree(state, 3)
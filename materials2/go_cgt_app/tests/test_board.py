@@ -0,0 +1,26 @@
+from logic.analysis import region_value
+from logic.board import Board, enumerate_shapes, evaluate_shapes, SHAPE_MAX_POINTS
+from logic.evaluator import CGTValue
+from logic.game_state import BLACK, WHITE
+from logic.regions import split_regions
+
+
+def test_evaluate_shapes_streams_region_sums():
+    # 3x3 の全ての局所形を既定の評価 (領域ごとの値の和) に流す
+    shapes = list(enumerate_shapes(3))
+    results = list(evaluate_shapes(shapes))
+    assert [board for board, _ in results] == shapes
+    for board, value in results:
+        assert value is None or isinstance(value, CGTValue)
+        if all(len(region) <= SHAPE_MAX_POINTS for region in split_regions(board.to_rows())):
+            assert value == region_value(board.state(), SHAPE_MAX_POINTS)
+    assert sum(value is not None for _, value in results) > len(results) // 3
+
+
+def test_evaluate_shapes_skips_large_regions():
+    [(_, value)] = evaluate_shapes([Board(3)])
+    assert value is None
+    [(_, value)] = evaluate_shapes([Board(1, 3).place(0, 0, WHITE).place(0, 2, WHITE)])
+    assert value == CGTValue(1)
+    [(_, value)] = evaluate_shapes([Board(1, 3).place(0, 1, BLACK)])
+    assert value == CGTValue(2)
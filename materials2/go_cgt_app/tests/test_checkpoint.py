@@ -0,0 +1,31 @@
+import os
+import pytest
+from logic.checkpoint import Checkpoint
+
+
+def test_resume_replays_log(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "run"), ("board", 3))
+    checkpoint.save({"step": 1}, [1, 2])
+    checkpoint.save({"step": 2}, [3])
+    assert checkpoint.load() == ({"step": 2}, [1, 2, 3])
+
+
+def test_missing_empty_log_resumes_from_snapshot(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "run"), ("board", 3))
+    checkpoint.save({"step": 1})
+    os.remove(checkpoint.log_path)
+    assert checkpoint.load() == ({"step": 1}, [])
+
+
+def test_missing_log_with_records_is_an_error(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / "run"), ("board", 3))
+    checkpoint.save({"step": 1}, [1, 2])
+    os.remove(checkpoint.log_path)
+    with pytest.raises(ValueError):
+        checkpoint.load()
+
+
+def test_different_fingerprint_is_an_error(tmp_path):
+    Checkpoint(str(tmp_path / "run"), ("board", 3)).save({"step": 1})
+    with pytest.raises(ValueError):
+        Checkpoint(str(tmp_path / "run"), ("board", 4)).load()
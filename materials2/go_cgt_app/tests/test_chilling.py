@@ -0,0 +1,27 @@
+from fractions import Fraction
+from logic.chilling import Chiller
+from logic.evaluator import CGTValue
+
+
+def test_warming_undoes_chilling_of_hot_integer_games():
+    chiller = Chiller()
+    store = chiller.store
+
+    def number(x):
+        return store.from_value(CGTValue(x))
+
+    switches = [store.game([number(a)], [number(b)]) for a in range(-3, 4) for b in range(-3, a)]
+    nested = store.game([store.game([number(4)], [number(2)])], [number(-2)])
+    for g in switches + [nested, store.add(switches[-1], nested), number(2)]:
+        assert chiller.warm(chiller.chill(g)) == g
+    assert store.format(chiller.chill(nested)) == "{2* | -1}"
+
+
+def test_chilling_loses_infinitesimals_and_fractions():
+    chiller = Chiller()
+    store = chiller.store
+    star = store.from_value(CGTValue(0, nim=1))
+    half = store.from_value(CGTValue(Fraction(1, 2)))
+    for g in (star, half):
+        assert chiller.chill(g) == store.zero
+        assert chiller.warm(chiller.chill(g)) == store.zero != g
@@ -0,0 +1,38 @@
+import functools
+import itertools
+from logic.comparison import GameComparator
+from logic.evaluator import CGTValue
+from logic.game_store import GameStore
+
+
+def games(store):
+    """数・↑・* と、CGTValue で表せないスイッチ、それらの和"""
+    def number(x):
+        return store.from_value(CGTValue(x))
+    base = [number(0), number(1), number(-1), store.from_value(CGTValue(0, ups=1)),
+            store.from_value(CGTValue(0, nim=1)),
+            store.game([number(1)], [number(-1)]), store.game([number(2)], [number(0)]),
+            store.game([number(0)], [number(-1)])]
+    return sorted({store.add(g, h) for g, h in itertools.combinations_with_replacement(base, 2)})
+
+
+def test_memoized_comparison_matches_direct_definition():
+    store = GameStore()
+    nodes = store.nodes
+
+    @functools.lru_cache(maxsize=None)
+    def le(g, h):
+        # G <= H ⇔ G^L <= H となる G^L も、G <= H^R となる H^R も無い
+        return (not any(le(h, gl) for gl in nodes[g].lefts)
+                and not any(le(hr, g) for hr in nodes[h].rights))
+
+    expected = {}
+    for g, h in itertools.product(games(store), repeat=2):
+        le_gh, le_hg = le(g, h), le(h, g)
+        expected[g, h] = {(True, True): "=", (True, False): "<",
+                          (False, True): ">", (False, False): "||"}[(le_gh, le_hg)]
+    # 上限の小さいキャッシュ (捨てながら計算する) でも同じ結果になる
+    for comparator in (store.comparator, GameComparator(store, max_entries=4)):
+        for (g, h), relation in expected.items():
+            assert comparator.compare(g, h) == relation
+    assert store.comparator.hits > 0
@@ -0,0 +1,47 @@
+import itertools
+from fractions import Fraction
+import pytest
+from logic.dyadic import Dyadic, simplest_between, simplest_in, birthday
+
+
+def numbers_by_birthday(days):
+    """日ごとに生まれる数 (Fraction) のリスト: 0 日目は 0、次の日は両端の外と隣り合う数の間"""
+    born = [[Fraction(0)]]
+    known = [Fraction(0)]
+    for _ in range(days):
+        new = [known[0] - 1, known[-1] + 1] + [(a + b) / 2 for a, b in zip(known, known[1:])]
+        born.append(sorted(new))
+        known = sorted(known + new)
+    return born
+
+
+BORN = numbers_by_birthday(8)
+
+
+def reference_simplest(low, high):
+    """low < x < high の数のうち最も早く生まれたもの (Fraction で総当たり)"""
+    for day, numbers in enumerate(BORN):
+        inside = [x for x in numbers if (low is None or low < x) and (high is None or x < high)]
+        if inside:
+            assert len(inside) == 1  # 同じ日に生まれた数の間には、それより早く生まれた数がある
+            return inside[0], day
+    raise AssertionError("interval too narrow for the reference")
+
+
+def test_simplest_between_matches_fraction_reference():
+    bounds = [None] + [Fraction(k, 8) for k in range(-20, 21)]
+    for low, high in itertools.product(bounds, repeat=2):
+        if low is not None and high is not None and low >= high:
+            continue
+        expected, day = reference_simplest(low, high)
+        result = simplest_between(low, high)
+        assert isinstance(result, Dyadic)
+        assert result == expected and birthday(result) == day
+
+
+def test_simplest_between_rejects_empty_interval():
+    for low, high in ((1, 1), (Fraction(1, 2), Fraction(1, 2)), (2, 1), (Dyadic(-1, 1), -1)):
+        with pytest.raises(ValueError):
+            simplest_between(low, high)
+    assert simplest_in(1, 1) is None
+    assert simplest_in(1, 1, low_closed=True, high_closed=True) == 1
@@ -0,0 +1,73 @@
+from logic.endgame import SumPlayer, STRATEGIES, accuracy_report
+from logic.game_state import BLACK, WHITE, WALL
+
+# 壁で区切った3つの領域: {1 | -1}, {2 | -2}, {1 | 0}
+SWITCHES = [
+    [0, 0, WALL, 0, 0, 0, WALL, 0, 0, WHITE],
+    [BLACK, WHITE, WALL, BLACK, WHITE, BLACK, WALL, WALL, WALL, WALL],
+]
+
+# ↑ + * (どちらも温度 0)。先手の黒は * を 0 にすれば勝つが、↑ に打つと負ける
+UP_STAR = [
+    [0, 0, WALL, 0, 0, 0],
+    [BLACK, BLACK, WALL, WALL, WALL, WALL],
+]
+
+
+def sums(player, color):
+    """color の各手について (着手, 打った後の和の ID)"""
+    store = player.store
+    results = []
+    for index, component in enumerate(player.components):
+        for move, _, game in player._moves(component, color):
+            games = player.games()
+            games[index] = game
+            total = store.zero
+            for g in games:
+                total = store.add(total, g)
+            results.append((move, total))
+    return results
+
+
+def best_moves(player, color):
+    """和の完全な比較で、打った後の和が他のどの手の後より color に悪くない手"""
+    store = player.store
+    results = sums(player, color)
+    good = ("L", "P") if color == BLACK else ("R", "P")
+    return {move for move, total in results
+            if all(store.comparator.outcome(store.add(total, store.neg(other))) in good
+                   for _, other in results)}
+
+
+def winning_moves(player, color):
+    """打った後、相手の手番で color の勝ちになる手"""
+    good = ("L", "P") if color == BLACK else ("R", "P")
+    return {move for move, total in sums(player, color) if player.store.comparator.outcome(total) in good}
+
+
+def test_strategies_play_the_exhaustive_best_move():
+    for strategy in STRATEGIES:
+        for color in (BLACK, WHITE):
+            player = SumPlayer(SWITCHES, strategy)
+            assert [player.store.format(c.game) for c in player.components] == ["{1 | -1}", "{2 | -2}", "{1 | 0}"]
+            assert best_moves(player, color) == {(0, 4)}
+            assert player.choose(color)[1] == (0, 4)
+
+
+def test_accuracy_report_counts_hotstrat_loss():
+    # 黒の先手: 同じ温度なら左上の ↑ に打ち、残った * を白に取られて負ける
+    # 白の先手: ↑ を * にして * + * = 0 で勝つ
+    player = SumPlayer(UP_STAR)
+    assert [player.store.format(c.game) for c in player.components] == ["0↑", "0*"]
+    assert player.choose(BLACK)[1] == (0, 0)
+    assert winning_moves(player, BLACK) == {(0, 4)}
+    assert player.choose(WHITE)[1] in winning_moves(player, WHITE)
+    assert accuracy_report([UP_STAR]) == {
+        "positions": 2,
+        "skipped": 0,
+        "winning": 2,
+        "kept": 1,
+        "agreed": 1,
+        "move_accuracy": 0.5,
+        "playout_accuracy": 0.5,
+    }
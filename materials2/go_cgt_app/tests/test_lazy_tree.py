@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import time
+from logic.game_state import GameState, BLACK, WHITE
+from logic.lazy_tree import LazyTree
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOARD = [
+    [0, 0, BLACK, WHITE],
+    [BLACK, BLACK, BLACK, WHITE],
+    [WHITE, WHITE, WHITE, WHITE],
+    [0, 0, 0, 0],
+]
+
+
+def wait_for(tree, count, timeout=30):
+    values = []
+    deadline = time.monotonic() + timeout
+    while len(values) < count and time.monotonic() < deadline:
+        if not tree.results.empty():
+            values.append(tree.results.get())
+        else:
+            time.sleep(0.01)
+    return values
+
+
+def test_default_evaluator_sums_regions():
+    tree = LazyTree(GameState(BOARD))
+    nodes = [tree.root] + tree.expand(tree.root)
+    for node in nodes:
+        tree.request_value(node)
+    values = wait_for(tree, len(nodes))
+    tree.shutdown()
+    assert len(values) == len(nodes)
+    assert all(isinstance(value, str) for _, value in values)
+
+
+def test_oversized_region_has_no_value():
+    tree = LazyTree(GameState([[0] * 5 for _ in range(5)]))
+    tree.request_value(tree.root)
+    assert wait_for(tree, 1) == [(tree.root, None)]
+    tree.shutdown()
+
+
+def test_shutdown_does_not_wait_for_running_search():
+    # 終わらない評価が走っていても、shutdown すればインタプリタはすぐ終了する
+    script = (
+        "import time\n"
+        "from logic.game_state import GameState\n"
+        "from logic.lazy_tree import LazyTree\n"
+        "tree = LazyTree(GameState([[0, 0]]), evaluator=lambda state: time.sleep(60))\n"
+        "tree.request_value(tree.root)\n"
+        "tree.request_value(tree.expand(tree.root)[0])\n"
+        "time.sleep(0.1)\n"
+        "tree.shutdown()\n"
+    )
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, check=True, timeout=30)
+    assert time.monotonic() - start < 10
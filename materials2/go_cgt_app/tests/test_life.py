@@ -0,0 +1,61 @@
+import csv
+import os
+import random
+from logic.analysis import analyze_board
+from logic.game_state import GameState, BLACK, WHITE
+from logic.life import LifeAnalysis
+from logic.move_pruning import MovePruning
+from logic.regions import split_regions
+
+BOARDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "boards")
+
+# 黒は2つの眼で無条件に活きている。上の辺の左は白の死に石 (0, 1) を含む黒の確定地
+SETTLED = [
+    [0, WHITE, 0, BLACK, 0],
+    [BLACK, BLACK, BLACK, BLACK, BLACK],
+]
+
+
+def load(name):
+    with open(os.path.join(BOARDS_DIR, name), newline="") as f:
+        return [[int(cell) for cell in row] for row in csv.reader(f)]
+
+
+def test_settled_region_is_one_independent_region():
+    life = LifeAnalysis(SETTLED)
+    assert life.alive[BLACK] == {(0, 3)} | {(1, c) for c in range(5)}
+    assert life.territory[BLACK] == {(0, 0), (0, 1), (0, 2), (0, 4)}
+    # 死に石で分かれていた2つの空点が、死に石ごと1つの領域になる
+    assert split_regions(SETTLED) == [{(0, 0)}, {(0, 2)}, {(0, 4)}]
+    assert split_regions(SETTLED, life) == [{(0, 0), (0, 1), (0, 2)}, {(0, 4)}]
+    assert [result.region for result in analyze_board(SETTLED)] == [{(0, 0), (0, 1), (0, 2)}, {(0, 4)}]
+
+
+def test_apply_move_matches_fresh_analysis():
+    rng = random.Random(0)
+    for name in ("endgame_6x6.csv", "endgame_9x9.csv"):
+        for _ in range(3):
+            life = LifeAnalysis(load(name))
+            color = BLACK
+            for _ in range(40):
+                moves = GameState(life.board, color).get_legal_moves()
+                if moves:
+                    life = life.apply_move(rng.choice(moves), color)
+                    fresh = LifeAnalysis(life.board)
+                    assert life.alive == fresh.alive
+                    assert life.settled_regions == fresh.settled_regions
+                color = -color
+
+
+def test_pruning_derives_child_analysis_from_parent():
+    pruning = MovePruning(settled=True)
+    state = GameState(SETTLED, WHITE)
+    parent = pruning.life(state.board)
+    children = pruning.options(state, WHITE)
+    assert children  # 確定地の中しか打てないので、除かずに残す
+    child = children[0]
+    assert pruning._parents[child.board] == (state.board, child.last_move, WHITE)
+    life = pruning.life(child.board)
+    assert child.board not in pruning._parents
+    assert life.territory == parent.apply_move(child.last_move, WHITE).territory
+    assert life.territory == LifeAnalysis(child.board).territory
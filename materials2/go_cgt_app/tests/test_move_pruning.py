@@ -0,0 +1,55 @@
+import random
+import pytest
+from logic.evaluator import outcome
+from logic.game_state import GameState, BLACK, WHITE
+from logic.move_pruning import MovePruning, verify_pruning
+from logic.regions import split_regions, region_state
+
+
+def random_regions(count, rows=4, cols=5, seed=0):
+    """呼吸点の無い連が無い乱択の盤面の、3点以下の領域の局面"""
+    rng = random.Random(seed)
+    while count:
+        board = [[rng.choice((0, 0, BLACK, BLACK, BLACK, WHITE, WHITE, WHITE, 2, -2)) for _ in range(cols)]
+                 for _ in range(rows)]
+        state = GameState(board)
+        if any(not state._get_group_and_liberties(board, r, c)[1]
+               for r in range(rows) for c in range(cols) if board[r][c] in (BLACK, WHITE)):
+            continue
+        count -= 1
+        for region in split_regions(board):
+            if len(region) <= 3:
+                yield region_state(board, region)
+
+
+def test_value_preserving_rules_match_unpruned_search():
+    # 対称な手を除くことと並べ替えは勝敗クラスを変えない
+    for state in random_regions(100):
+        for names in ("symmetry", "ordering", "symmetry,ordering"):
+            pruning = MovePruning.from_names(names)
+            pruned, unpruned, agreed = verify_pruning(state, pruning)
+            assert agreed, (names, state.board, state.area)
+            assert unpruned == outcome(state)
+
+
+def test_verify_pruning_reports_changed_outcome():
+    # 黒だけに囲まれた2点 (1, 0), (1, 1) に石を取らずに打ち込む白の手を除くと、白の勝ち (R) が後手の勝ち (P) になる
+    # (settled_eyes は囲碁の劣った手を除くもので、勝敗クラスを保つとは限らない)
+    board = [
+        [BLACK, BLACK, WHITE, WHITE, 0],
+        [0, -2, BLACK, WHITE, BLACK],
+        [BLACK, BLACK, WHITE, WHITE, -2],
+        [WHITE, 0, WHITE, -2, WHITE],
+    ]
+    state = region_state(board, frozenset({(1, 0), (1, 1)}))
+    pruning = MovePruning.from_names("settled_eyes")
+    assert verify_pruning(state, pruning) == (outcome(state, pruning), outcome(state), False)
+    assert verify_pruning(state, pruning)[:2] == ("P", "R")
+
+
+def test_from_names():
+    assert not MovePruning.from_names("").enabled
+    pruning = MovePruning.from_names("all")
+    assert all((pruning.own_territory, pruning.settled_eyes, pruning.symmetry, pruning.ordering, pruning.settled))
+    with pytest.raises(ValueError):
+        MovePruning.from_names("symmetry,unknown")
@@ -0,0 +1,46 @@
+import random
+from logic.evaluator import game_value
+from logic.game_state import GameState, BLACK, WHITE
+from logic.patterns import PatternDB, default_patterns
+from logic.regions import split_regions, region_state
+
+
+def random_boards(count, rows=4, cols=5, seed=0):
+    """呼吸点の無い連が無い乱択の盤面 (専用点を含む)"""
+    rng = random.Random(seed)
+    while count:
+        board = [[rng.choice((0, 0, BLACK, BLACK, WHITE, WHITE, 2, -2)) for _ in range(cols)]
+                 for _ in range(rows)]
+        state = GameState(board)
+        if any(not state._get_group_and_liberties(board, r, c)[1]
+               for r in range(rows) for c in range(cols) if board[r][c] in (BLACK, WHITE)):
+            continue
+        count -= 1
+        yield board
+
+
+def test_default_patterns_match_search():
+    db = default_patterns()
+    hits = 0
+    for board in random_boards(200):
+        for region in split_regions(board):
+            if len(region) > 3:
+                continue
+            value = db.lookup(board, region)
+            if value is not None:
+                assert value == game_value(region_state(board, region))
+                hits += 1
+    assert hits > 100
+
+
+def test_lookup_uses_symmetric_shapes():
+    # 1つの盤面で加えた形を、回転・反転した盤面で引いても探索した値と同じ
+    board = [[0, 0, BLACK, WHITE], [BLACK, BLACK, 0, WHITE], [WHITE, WHITE, WHITE, -2]]
+    db = PatternDB()
+    assert db.add_board(board) > 0
+    images = [board, [row[::-1] for row in board], board[::-1], [list(row) for row in zip(*board)]]
+    for image in images:
+        for region in split_regions(image):
+            value = db.lookup(image, region)
+            assert value is not None
+            assert value == game_value(region_state(image, region))
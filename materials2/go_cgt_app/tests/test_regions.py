@@ -0,0 +1,41 @@
+import random
+from logic.evaluator import outcome
+from logic.game_state import GameState, BLACK, WHITE
+from logic.game_store import GameStore
+from logic.regions import split_regions, region_state, crop_region
+
+
+def random_boards(count, rows=5, cols=6, seed=0):
+    """呼吸点の無い連が無い乱択の盤面 (専用点を含む)"""
+    rng = random.Random(seed)
+    while count:
+        board = [[rng.choice((0, 0, BLACK, BLACK, BLACK, WHITE, WHITE, WHITE, 2, -2)) for _ in range(cols)]
+                 for _ in range(rows)]
+        state = GameState(board)
+        if any(not state._get_group_and_liberties(board, r, c)[1]
+               for r in range(rows) for c in range(cols) if board[r][c] in (BLACK, WHITE)):
+            continue
+        count -= 1
+        yield board
+
+
+def test_cropped_region_has_the_same_game():
+    # 切り出した盤面の局面は、元の盤面で着手を領域に制限した局面と同じ標準形・勝敗クラス・着手を持つ
+    store = GameStore()
+    cropped_count = 0
+    for board in random_boards(150):
+        for region in split_regions(board):
+            if len(region) > 3:
+                continue
+            cropped = crop_region(board, region)
+            if cropped is None:
+                continue
+            cropped_count += 1
+            assert {cropped.to_board(p) for p in cropped.area} == region
+            full, sub = region_state(board, region), cropped.state()
+            assert store.from_state(sub) == store.from_state(full)
+            assert outcome(sub) == outcome(full)
+            for color in (BLACK, WHITE):
+                assert sorted(cropped.to_board(child.last_move) for child in sub.options(color)) == \
+                    sorted(child.last_move for child in full.options(color))
+    assert cropped_count > 200
@@ -0,0 +1,21 @@
+import itertools
+from logic import evaluator
+from logic.game_state import GameState
+from logic.tablebase import Tablebase, build_tablebase
+
+
+def test_tablebase_matches_search_on_2x2(tmp_path):
+    path = str(tmp_path / "tablebase_2x2.npy")
+    build_tablebase(2, 2, path)
+    tablebase = Tablebase(path)
+    assert (tablebase.rows, tablebase.cols) == (2, 2)
+    compared = 0
+    for cells in itertools.product((0, 1, -1, 2, -2), repeat=4):
+        board = [list(cells[:2]), list(cells[2:])]
+        assert tablebase.covers(board)
+        outcome = tablebase.outcome(board)
+        if outcome is None:  # 合法でない局面や、繰り返しで決まらない局面
+            continue
+        assert outcome == evaluator.outcome(GameState(board))
+        compared += 1
+    assert compared > 200
@@ -0,0 +1,32 @@
+from fractions import Fraction
+from logic.dyadic import Dyadic
+from logic.evaluator import CGTValue
+from logic.game_store import GameStore
+from logic.thermograph import ThermographCache
+
+
+def number(store, x):
+    return store.from_value(CGTValue(x))
+
+
+def test_hot_game_thermograph_is_dyadic():
+    store = GameStore()
+    thermograph = ThermographCache(store)
+    # {3 | -1}: 温度 2、平均値 1
+    g = store.game([number(store, 3)], [number(store, -1)])
+    graph = thermograph(g)
+    assert graph.temperature == 2 and graph.mast == 1
+    # {{4 | 2} | -2}: 左の壁が折れるので包絡線と交点の計算を通る
+    h = store.game([g, store.game([number(store, 4)], [number(store, 2)])], [number(store, -2)])
+    graph = thermograph(h)
+    assert (graph.temperature, graph.mast) == (Fraction(5, 2), Fraction(1, 2))
+    for wall in (graph.left, graph.right):
+        for t, v in wall.points:
+            assert isinstance(t, Dyadic) and isinstance(v, Dyadic)
+    assert isinstance(graph.temperature, Dyadic) and isinstance(graph.mast, Dyadic)
+
+
+def test_number_thermograph():
+    store = GameStore()
+    graph = ThermographCache(store)(number(store, Fraction(3, 4)))
+    assert graph.temperature == Dyadic(-1, 2) and graph.mast == Fraction(3, 4)
@@ -0,0 +1,30 @@
+import itertools
+from fractions import Fraction
+from logic.evaluator import CGTValue, combine, sum_values
+from logic.game_store import GameStore
+
+VALUES = [CGTValue(base, ups=ups, nim=nim)
+          for base in (0, Fraction(1, 2), -1) for ups in range(-3, 4) for nim in range(4)]
+
+
+def test_value_arithmetic_matches_canonical_forms():
+    # O(1) の足し算・符号反転・勝敗クラスが、選択肢から作った標準形の計算と一致する
+    store = GameStore()
+    for v in VALUES:
+        g = store.from_value(v)
+        assert combine(v.left_options(), v.right_options()) == v
+        assert store.neg(g) == store.from_value(-v)
+        assert store.comparator.outcome(g) == v.outcome()
+    for v, w in itertools.product(VALUES, repeat=2):
+        total = store.add(store.from_value(v), store.from_value(w))
+        assert total == store.from_value(v + w)
+        assert sum_values([v, w]) == v + w
+        assert store.comparator.outcome(store.add(total, store.neg(store.from_value(w)))) == v.outcome()
+
+
+def test_value_comparison():
+    zero, up, star = CGTValue(0), CGTValue(0, ups=1), CGTValue(0, nim=1)
+    assert up > zero and not up > star and not up < star and star.compare(zero) is None
+    assert (up + star).outcome() == "N" and (up + up + star).outcome() == "L"
+    assert CGTValue(0, nim=2) + CGTValue(0, nim=3) == star
+    assert sum_values([up, None]) is None